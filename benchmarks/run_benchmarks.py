@@ -0,0 +1,205 @@
+# benchmarks/run_benchmarks.py
+from benchmarks.standin_app import StandinApp
+from framework.driver_manager import DriverManager
+from framework.http_driver import HttpDriver
+from framework.session_pool import SessionPool
+from framework.keyword_engine import KeywordEngine
+from framework.data_driver import DataDriver
+from utils.command_metrics import command_metrics
+from utils.locator_cache import get_locator_cache
+from utils.logger import get_logger
+import statistics
+import tracemalloc
+import argparse
+import json
+import time
+import sys
+import os
+
+
+DEFAULT_BASELINE_PATH = "benchmarks/baseline.json"
+DEFAULT_OUTPUT_PATH = "reports/benchmarks/latest.json"
+
+# 各指标允许的相对退化幅度
+DEFAULT_TOLERANCES = {'wall_seconds': 0.25, 'commands': 0.05, 'peak_memory_kb': 0.25}
+
+
+class BenchmarkRunner:
+    """
+    端到端基准：在本地替身应用上以无头模式运行登录场景、定位回退、数据驱动循环，以及无浏览器驱动下的登录场景，
+    统计耗时、WebDriver命令数和Python侧内存峰值，并与基线对比
+    """
+
+    def __init__(self, rounds=3, latency=0.0, ajax_delay=0.1, rows_repeat=5):
+        """
+        :param rounds: 每个基准的重复轮数，耗时取中位数
+        :param latency: 替身应用每个请求的延迟（秒）
+        :param ajax_delay: 替身应用的Ajax延迟（秒）
+        :param rows_repeat: 数据驱动基准中有效凭据数据重复的次数
+        """
+        self.logger = get_logger()
+        self.rounds = rounds
+        self.latency = latency
+        self.ajax_delay = ajax_delay
+        self.rows_repeat = rows_repeat
+        self.data_driver = DataDriver()
+        # 基准名称: (页面变体, 基准函数, 是否使用无浏览器驱动)
+        self.benchmarks = {
+            'login_flow': ('primary', self.bench_login_flow, False),
+            'locator_fallbacks': ('fallback', self.bench_login_flow, False),
+            'data_driven': ('primary', self.bench_data_driven, False),
+            'login_flow_browserless': ('primary', self.bench_login_flow, True)
+        }
+
+    def run(self, names=None):
+        """
+        运行基准
+        :param names: 只运行指定的基准，默认全部
+        :return: {基准名称: 指标}
+        """
+        # 定位策略缓存会让后续轮次越来越快，基准中关闭以保证各轮可比
+        get_locator_cache().enabled = False
+        os.environ['ATHENA_HEADLESS'] = 'true'
+
+        results = {}
+        pool = None
+        try:
+            for name, (variant, bench, browserless) in self.benchmarks.items():
+                if names and name not in names:
+                    continue
+                app = StandinApp(latency=self.latency, ajax_delay=self.ajax_delay, variant=variant).start()
+                os.environ['ATHENA_BASE_URL'] = app.base_url
+                try:
+                    if browserless:
+                        manager = DriverManager()
+                        results[name] = self._measure(name, bench, lambda: manager.build_driver(HttpDriver.name),
+                                                      lambda driver: driver.quit())
+                        continue
+                    if pool is None:
+                        started = time.perf_counter()
+                        pool = SessionPool(DriverManager(), size=1).start()
+                        results['session_start'] = {'wall_seconds': round(time.perf_counter() - started, 3)}
+                    results[name] = self._measure(name, bench, pool.checkout, pool.checkin)
+                finally:
+                    app.stop()
+        finally:
+            if pool:
+                pool.close()
+        return results
+
+    def bench_login_flow(self, engine):
+        """login_flow场景：打开登录页、填写、登录、验证欢迎信息"""
+        results = engine.execute_test_scenario(self.data_driver.get_test_scenario('login_flow'))
+        failed = [step for step in results if step['status'] != 'PASS']
+        if failed:
+            raise AssertionError(f"login_flow失败: {failed}")
+
+    def bench_data_driven(self, engine):
+        """数据驱动循环：同一会话上依次执行多行登录-退出"""
+        rows = list(self.data_driver.iter_rows(path='login_test_data.valid_credentials')) * self.rows_repeat
+        plan = KeywordEngine.compile_scenario(self.data_driver.get_test_scenario('login_flow_data_driven'),
+                                              name='login_flow_data_driven', columns=tuple(rows[0]))
+        failed = [result for result in plan.run(engine, rows) if result.status != 'PASS']
+        if failed:
+            raise AssertionError(f"数据驱动场景失败: {failed}")
+
+    def _measure(self, name, bench, acquire, release):
+        """
+        多轮运行一个基准，每轮获取一个干净的会话
+        :param acquire: 获取会话的函数（从会话池借出或新建无浏览器驱动）
+        :param release: 归还会话的函数
+        """
+        durations = []
+        commands = []
+        peak_memory = 0
+
+        for _ in range(self.rounds):
+            driver = acquire()
+            try:
+                engine = KeywordEngine(driver)
+                command_metrics.reset()
+                tracemalloc.start()
+                started = time.perf_counter()
+                bench(engine)
+                durations.append(time.perf_counter() - started)
+                peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+                commands.append(command_metrics.summary()['total_commands'])
+            finally:
+                tracemalloc.stop()
+                release(driver)
+
+        result = {
+            'wall_seconds': round(statistics.median(durations), 3),
+            'commands': round(statistics.median(commands)),
+            'peak_memory_kb': round(peak_memory / 1024)
+        }
+        self.logger.info("基准 %s: %s", name, result)
+        return result
+
+
+def compare(results, baseline, tolerances=None):
+    """
+    与基线对比
+    :return: 退化项列表 [(基准, 指标, 基线值, 当前值)]
+    """
+    tolerances = tolerances or DEFAULT_TOLERANCES
+    regressions = []
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            expected = (baseline.get(name) or {}).get(metric)
+            tolerance = tolerances.get(metric)
+            if expected is None or tolerance is None:
+                continue
+            if value > expected * (1 + tolerance):
+                regressions.append((name, metric, expected, value))
+    return regressions
+
+
+def main():
+    """命令行入口: python -m benchmarks.run_benchmarks [--update-baseline]"""
+    parser = argparse.ArgumentParser(description="端到端基准测试")
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.0, help="替身应用请求延迟（秒）")
+    parser.add_argument('--ajax-delay', type=float, default=0.1, help="替身应用Ajax延迟（秒）")
+    parser.add_argument('--rows-repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='*', help="只运行指定基准")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help="以本次结果覆盖基线")
+    args = parser.parse_args()
+
+    # 没有基线时无法判断退化，直接失败而不是静默通过
+    if not args.update_baseline and not os.path.exists(args.baseline):
+        print(f"基线不存在，使用 --update-baseline 生成: {args.baseline}")
+        return 2
+
+    runner = BenchmarkRunner(args.rounds, args.latency, args.ajax_delay, args.rows_repeat)
+    results = runner.run(args.only)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, ensure_ascii=False, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+        print(f"基线已更新: {args.baseline}")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as file:
+        baseline = json.load(file)
+
+    print(f"{'基准':<26}{'指标':<16}{'基线':>12}{'当前':>12}")
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            expected = (baseline.get(name) or {}).get(metric, '-')
+            print(f"{name:<26}{metric:<16}{expected:>12}{value:>12}")
+
+    regressions = compare(results, baseline)
+    for name, metric, expected, value in regressions:
+        print(f"性能退化: {name}.{metric} 基线 {expected}, 当前 {value}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
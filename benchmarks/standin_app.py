@@ -0,0 +1,278 @@
+# benchmarks/standin_app.py
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+from http.cookies import SimpleCookie
+from framework.data_driver import DataDriver
+import argparse
+import threading
+import secrets
+import html
+import json
+import time
+
+
+LOGIN_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Login</title></head>
+<body>
+<form id="loginForm" method="post" action="/login">
+  {username_input}
+  {password_input}
+  {login_button}
+</form>
+<div class="error-message" style="display: {error_display}">{error}</div>
+<script>
+var ajaxDelay = {ajax_delay_ms};
+document.getElementById('loginForm').addEventListener('submit', function (event) {{
+    if (!window.fetch || ajaxDelay < 0) {{ return; }}
+    event.preventDefault();
+    var form = event.target;
+    var body = new URLSearchParams(new FormData(form));
+    setTimeout(function () {{
+        fetch('/api/login', {{method: 'POST', body: body, credentials: 'same-origin'}})
+            .then(function (response) {{ return response.json(); }})
+            .then(function (result) {{
+                if (result.ok) {{
+                    window.location.href = '/dashboard';
+                }} else {{
+                    var error = document.querySelector('.error-message');
+                    error.textContent = result.error;
+                    error.style.display = 'block';
+                }}
+            }});
+    }}, ajaxDelay);
+}});
+</script>
+</body>
+</html>
+"""
+
+DASHBOARD_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Dashboard</title></head>
+<body>
+{welcome}
+<div {profile_attribute}>{username}</div>
+{logout_button}
+<div id="notifications">加载中...</div>
+<script>
+setTimeout(function () {{
+    if (!window.fetch) {{ return; }}
+    fetch('/api/notifications', {{credentials: 'same-origin'}})
+        .then(function (response) {{ return response.json(); }})
+        .then(function (result) {{
+            document.getElementById('notifications').textContent = result.count + ' 条新通知';
+        }});
+}}, {ajax_delay_ms});
+</script>
+</body>
+</html>
+"""
+
+# 页面元素的两种渲染：primary命中test_data.yaml中的首选定位策略，fallback只能被回退策略命中
+ELEMENT_VARIANTS = {
+    'primary': {
+        'username_input': '<input id="username" name="username" type="email">',
+        'password_input': '<input id="password" name="password" type="password">',
+        'login_button': '<button id="loginBtn" class="login-button" type="submit">Login</button>',
+        'welcome': '<h1 class="welcome-message">Welcome, {username}</h1>',
+        'profile_attribute': 'id="user-profile" class="user-info"',
+        'logout_button': '<form method="post" action="/logout"><button id="logout" class="logout-btn">Logout</button></form>'
+    },
+    'fallback': {
+        'username_input': '<input name="email" type="email">',
+        'password_input': '<input name="password" type="password">',
+        'login_button': '<button class="login-button" type="submit">Login</button>',
+        'welcome': '<h2 class="user-greeting">Welcome back, {username}</h2>',
+        'profile_attribute': 'class="profile-menu"',
+        'logout_button': '<form method="post" action="/logout"><button class="logout-btn">Logout</button></form>'
+    }
+}
+
+
+class StandinApp:
+    """
+    被测应用的本地替身：提供LoginPage/DashboardPage所需的全部元素，
+    支持人为的请求延迟和Ajax延迟，用于离线环境下测量框架自身开销
+    """
+
+    SESSION_COOKIE = 'athena_session'
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, ajax_delay=0.0, variant='primary', credentials=None):
+        """
+        :param host: 监听地址
+        :param port: 监听端口，0表示自动分配
+        :param latency: 每个请求的人为延迟（秒）
+        :param ajax_delay: 登录提交和仪表板通知的Ajax延迟（秒），小于0时登录表单直接提交不走Ajax
+        :param variant: 页面元素渲染方式，primary 或 fallback
+        :param credentials: {用户名: 密码}，默认取测试数据中的有效凭据
+        """
+        if variant not in ELEMENT_VARIANTS:
+            raise ValueError(f"未知的页面变体: {variant}")
+        self.latency = latency
+        self.ajax_delay = ajax_delay
+        self.elements = ELEMENT_VARIANTS[variant]
+        if credentials is None:
+            credentials = {row['username']: row['password']
+                           for row in DataDriver().iter_rows(path='login_test_data.valid_credentials')}
+        self.credentials = credentials
+        self.sessions = {}
+        self.request_count = 0
+
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """替身应用地址"""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """在后台线程中启动"""
+        self._thread = threading.Thread(target=self.server.serve_forever, name="standin-app", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服务"""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def render_login(self, error=None):
+        """渲染登录页"""
+        return LOGIN_TEMPLATE.format(
+            error=html.escape(error or ''),
+            error_display='block' if error else 'none',
+            ajax_delay_ms=int(self.ajax_delay * 1000),
+            **{key: self.elements[key] for key in ('username_input', 'password_input', 'login_button')}
+        )
+
+    def render_dashboard(self, username):
+        """渲染仪表板"""
+        escaped = html.escape(username)
+        return DASHBOARD_TEMPLATE.format(
+            welcome=self.elements['welcome'].format(username=escaped),
+            profile_attribute=self.elements['profile_attribute'],
+            username=escaped,
+            logout_button=self.elements['logout_button'],
+            ajax_delay_ms=max(int(self.ajax_delay * 1000), 0)
+        )
+
+    def authenticate(self, form):
+        """校验表单凭据，成功时返回新会话ID"""
+        username = (form.get('username') or form.get('email') or [''])[0]
+        password = (form.get('password') or [''])[0]
+        if not username or not password:
+            return None, "请输入用户名和密码"
+        if self.credentials.get(username) != password:
+            return None, "用户名或密码错误"
+        session_id = secrets.token_hex(16)
+        self.sessions[session_id] = username
+        return session_id, None
+
+    def _handler_class(self):
+        """绑定到当前实例的请求处理类"""
+        app = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                app.request_count += 1
+                self._delay()
+                path = urlsplit(self.path).path
+                if path in ('/', '/login'):
+                    self._send_html(app.render_login())
+                elif path == '/dashboard':
+                    username = self._current_user()
+                    if username is None:
+                        self._redirect('/login')
+                    else:
+                        self._send_html(app.render_dashboard(username))
+                elif path == '/api/notifications':
+                    self._send_json({'count': 3})
+                else:
+                    self.send_error(404)
+
+            def do_POST(self):
+                app.request_count += 1
+                self._delay()
+                path = urlsplit(self.path).path
+                length = int(self.headers.get('Content-Length') or 0)
+                form = parse_qs(self.rfile.read(length).decode('utf-8'), keep_blank_values=True)
+
+                if path in ('/login', '/api/login'):
+                    session_id, error = app.authenticate(form)
+                    cookie = f"{app.SESSION_COOKIE}={session_id}; Path=/; HttpOnly" if session_id else None
+                    if path == '/api/login':
+                        self._send_json({'ok': error is None, 'error': error}, cookie)
+                    elif error:
+                        self._send_html(app.render_login(error), status=401)
+                    else:
+                        self._redirect('/dashboard', cookie)
+                elif path == '/logout':
+                    cookie = SimpleCookie(self.headers.get('Cookie') or '').get(app.SESSION_COOKIE)
+                    if cookie:
+                        app.sessions.pop(cookie.value, None)
+                    self._redirect('/login', f"{app.SESSION_COOKIE}=; Path=/; Max-Age=0")
+                else:
+                    self.send_error(404)
+
+            def _delay(self):
+                if app.latency > 0:
+                    time.sleep(app.latency)
+
+            def _current_user(self):
+                cookie = SimpleCookie(self.headers.get('Cookie') or '').get(app.SESSION_COOKIE)
+                return app.sessions.get(cookie.value) if cookie else None
+
+            def _send_html(self, content, status=200):
+                self._send(status, 'text/html; charset=utf-8', content.encode('utf-8'))
+
+            def _send_json(self, data, cookie=None):
+                self._send(200, 'application/json', json.dumps(data, ensure_ascii=False).encode('utf-8'), cookie)
+
+            def _redirect(self, location, cookie=None):
+                self.send_response(303)
+                self.send_header('Location', location)
+                if cookie:
+                    self.send_header('Set-Cookie', cookie)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def _send(self, status, content_type, body, cookie=None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                if cookie:
+                    self.send_header('Set-Cookie', cookie)
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+def main():
+    """命令行入口: python -m benchmarks.standin_app --port 8000 --latency 0.05 --ajax-delay 0.3"""
+    parser = argparse.ArgumentParser(description="被测应用本地替身")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0, help="每个请求的延迟（秒）")
+    parser.add_argument('--ajax-delay', type=float, default=0.0, help="Ajax延迟（秒），小于0时不走Ajax")
+    parser.add_argument('--variant', choices=sorted(ELEMENT_VARIANTS), default='primary')
+    args = parser.parse_args()
+
+    app = StandinApp(args.host, args.port, args.latency, args.ajax_delay, args.variant)
+    print(f"替身应用已启动: {app.base_url}  (测试时设置 ATHENA_BASE_URL={app.base_url})")
+    try:
+        app.server.serve_forever()
+    except KeyboardInterrupt:
+        app.stop()
+
+
+if __name__ == "__main__":
+    main()
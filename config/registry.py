@@ -0,0 +1,213 @@
+# config/registry.py
+from selenium.webdriver.common.by import By
+import threading
+import hashlib
+import json
+import os
+import yaml
+
+
+# 定位类型 -> Selenium By
+LOCATOR_TYPES = {
+    'id': By.ID,
+    'name': By.NAME,
+    'xpath': By.XPATH,
+    'css': By.CSS_SELECTOR,
+    'class': By.CLASS_NAME,
+    'tag': By.TAG_NAME,
+    'link_text': By.LINK_TEXT,
+    'partial_link_text': By.PARTIAL_LINK_TEXT
+}
+
+# 配置文件必需的字段
+REQUIRED_CONFIG_KEYS = {
+    'browser': ('name', 'headless', 'maximize', 'implicit_wait', 'page_load_timeout'),
+    'environment': ('base_url', 'test_data_file')
+}
+
+# 环境变量 -> 配置项覆盖（如指向本地替身应用、CI中强制无头模式）
+CONFIG_ENV_OVERRIDES = {
+    'ATHENA_BASE_URL': ('environment', 'base_url', str),
+    'ATHENA_HEADLESS': ('browser', 'headless', lambda value: value.lower() in ('1', 'true', 'yes')),
+    'ATHENA_PAGE_LOAD_STRATEGY': ('browser', 'page_load_strategy', str)
+}
+
+DEFAULT_CONFIG_PATH = "config/config.yaml"
+DEFAULT_TEST_DATA_PATH = "config/test_data.yaml"
+COMPILED_CACHE_DIR = "reports/.cache/registry/"
+
+
+class CompiledStrategy(dict):
+    """预编译的定位策略：保留 {'type', 'value'} 字典形式，附带Selenium定位元组"""
+
+    __slots__ = ('selenium',)
+
+    def __init__(self, locator):
+        super().__init__(type=locator['type'], value=locator['value'])
+        self.selenium = (LOCATOR_TYPES[locator['type']], locator['value'])
+
+
+class LocatorList(list):
+    """元素key的定位策略列表，附带 页面.元素key，解析和等待时据此记录测试依赖的元素"""
+
+    def __init__(self, key, strategies):
+        super().__init__(strategies)
+        self.key = key
+
+
+class ConfigRegistry:
+    """
+    配置与定位器注册表：每个YAML文件在进程内只解析、校验一次，
+    文件mtime/大小变化时重新加载；解析结果按内容哈希以JSON缓存到磁盘，内容未变的文件在新进程中也无需重新解析
+    （缓存目录位于共享的reports下，只存放纯数据，读取时不执行任何代码）
+    """
+
+    def __init__(self, cache_dir=COMPILED_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._documents = {}
+        self._page_elements = {}
+        self._overridden = {}
+
+    def load(self, path, validator=None):
+        """
+        加载YAML文件（共享只读对象，调用方不应修改）
+        :param path: 文件路径
+        :param validator: 校验函数，首次解析后调用
+        :return: 解析后的数据
+        """
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        key = os.path.abspath(path)
+
+        with self._lock:
+            cached = self._documents.get(key)
+            if cached and cached[0] == stamp:
+                return cached[1]
+
+            with open(path, 'rb') as file:
+                content = file.read()
+            data = self._load_compiled(key, content)
+            if validator:
+                validator(data, path)
+            self._documents[key] = (stamp, data)
+            self._page_elements = {
+                cache_key: value for cache_key, value in self._page_elements.items() if cache_key[0] != key
+            }
+            return data
+
+    def load_config(self, path=DEFAULT_CONFIG_PATH):
+        """加载并校验主配置文件，应用环境变量覆盖"""
+        config = self.load(path, validate_config)
+        overrides = tuple((name, os.environ[name]) for name in CONFIG_ENV_OVERRIDES if os.environ.get(name))
+        if not overrides:
+            return config
+
+        with self._lock:
+            cached = self._overridden.get(os.path.abspath(path))
+            if cached and cached[0] is config and cached[1] == overrides:
+                return cached[2]
+            overridden = dict(config)
+            for name, value in overrides:
+                section, key, convert = CONFIG_ENV_OVERRIDES[name]
+                overridden[section] = dict(overridden.get(section) or {}, **{key: convert(value)})
+            self._overridden[os.path.abspath(path)] = (config, overrides, overridden)
+            return overridden
+
+    def load_test_data(self, path=DEFAULT_TEST_DATA_PATH):
+        """加载并校验测试数据文件"""
+        return self.load(path, validate_test_data)
+
+    def page_elements(self, page_name, path=DEFAULT_TEST_DATA_PATH):
+        """
+        获取页面的预编译定位器，同一页面的所有实例共享同一份对象
+        :param page_name: test_data.yaml中page_elements下的页面名称
+        :param path: 测试数据文件路径
+        :return: {元素key: LocatorList[CompiledStrategy, ...]}
+        """
+        data = self.load_test_data(path)
+        cache_key = (os.path.abspath(path), page_name)
+
+        with self._lock:
+            compiled = self._page_elements.get(cache_key)
+            if compiled is None:
+                page = (data.get('page_elements') or {}).get(page_name)
+                if page is None:
+                    raise KeyError(f"测试数据中未定义页面元素: {page_name}")
+                compiled = {
+                    element_key: LocatorList(f"{page_name}.{element_key}",
+                                             [CompiledStrategy(locator) for locator in locators])
+                    for element_key, locators in page.items()
+                }
+                self._page_elements[cache_key] = compiled
+            return compiled
+
+    def _load_compiled(self, key, content):
+        """按内容哈希读取磁盘缓存，未命中时解析YAML并写入缓存"""
+        digest = hashlib.sha256(content).hexdigest()
+        cache_file = os.path.join(self.cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json')
+
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as file:
+                cached = json.load(file)
+            if isinstance(cached, dict) and cached.get('hash') == digest:
+                return cached['data']
+        except (OSError, ValueError, KeyError):
+            pass
+
+        data = yaml.safe_load(content) or {}
+        try:
+            encoded = json.dumps({'hash': digest, 'data': data}, ensure_ascii=False)
+        except (TypeError, ValueError):
+            # 含日期等JSON无法表示的值，不写缓存
+            return data
+        # 非字符串键在JSON中会变成字符串，往返不一致时同样不写缓存
+        if json.loads(encoded)['data'] != data:
+            return data
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as file:
+                file.write(encoded)
+            os.replace(temp_file, cache_file)
+        except OSError:
+            pass
+        return data
+
+
+def validate_config(config, path):
+    """校验主配置文件的必需字段"""
+    for section, keys in REQUIRED_CONFIG_KEYS.items():
+        values = config.get(section)
+        if not isinstance(values, dict):
+            raise ValueError(f"配置文件 {path} 缺少配置段: {section}")
+        missing = [key for key in keys if key not in values]
+        if missing:
+            raise ValueError(f"配置文件 {path} 的 {section} 缺少字段: {missing}")
+
+
+def validate_test_data(data, path):
+    """校验测试数据中的页面元素定位数据"""
+    for page_name, elements in (data.get('page_elements') or {}).items():
+        if not isinstance(elements, dict):
+            raise ValueError(f"测试数据 {path} 中页面 {page_name} 的元素定义必须是映射")
+        for element_key, locators in elements.items():
+            if not isinstance(locators, list) or not locators:
+                raise ValueError(f"测试数据 {path} 中 {page_name}.{element_key} 必须是非空的定位策略列表")
+            for locator in locators:
+                if not isinstance(locator, dict) or locator.get('type') not in LOCATOR_TYPES or 'value' not in locator:
+                    raise ValueError(f"测试数据 {path} 中 {page_name}.{element_key} 存在无效的定位策略: {locator}")
+
+
+# 进程内共享的注册表
+registry = ConfigRegistry()
+
+
+def load_config(path=DEFAULT_CONFIG_PATH):
+    """获取主配置（进程内只解析一次）"""
+    return registry.load_config(path)
+
+
+def get_page_elements(page_name, path=DEFAULT_TEST_DATA_PATH):
+    """获取页面的预编译定位器"""
+    return registry.page_elements(page_name, path)
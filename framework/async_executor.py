@@ -0,0 +1,708 @@
+# framework/async_executor.py
+from selenium.common.exceptions import (
+    WebDriverException, TimeoutException, JavascriptException, NoSuchElementException,
+    StaleElementReferenceException, ElementNotInteractableException, InvalidSelectorException
+)
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.edge.service import Service as EdgeService
+from selenium.webdriver.common.driver_finder import DriverFinder
+from selenium.webdriver.remote.command import Command
+from framework.driver_manager import DriverManager
+from framework.keyword_engine import KeywordEngine
+from framework.scenario_compiler import ScenarioCompiler, peek_columns
+from framework.page_load import (
+    MARK_NAVIGATION_SCRIPT, NAVIGATION_TIMING_SCRIPT, page_load_strategy_for, is_stricter, page_load_stats
+)
+from pages.base_page import FILL_FORM_SCRIPT
+from utils.element_locator import ElementLocator, LOCATE_SCRIPT
+from utils.locator_cache import get_locator_cache
+from utils.element_cache import READ_ONLY_SCRIPTS
+from utils.wait_engine import (
+    WaitEngine, PAGE_READY_STATES, DOCUMENT_STATE_SCRIPT, PAGE_STATE_SCRIPT, wait_stats
+)
+from utils.command_metrics import command_metrics
+from utils.adaptive_wait import budgeted_timeout, get_poll_schedule
+from utils.logger import get_logger
+from config.registry import load_config, get_page_elements
+from urllib.parse import urlsplit
+import itertools
+import asyncio
+import json
+import time
+import os
+
+
+# W3C WebDriver协议中元素引用的键名
+ELEMENT_KEY = 'element-6066-11e4-a52f-4a1b0b2c4a1d'
+
+# W3C错误码到Selenium异常的映射，关键字和等待逻辑与同步引擎捕获相同的异常类型
+W3C_ERRORS = {
+    'no such element': NoSuchElementException,
+    'stale element reference': StaleElementReferenceException,
+    'javascript error': JavascriptException,
+    'element not interactable': ElementNotInteractableException,
+    'invalid selector': InvalidSelectorException,
+    'timeout': TimeoutException,
+    'script timeout': TimeoutException
+}
+
+# 一个驱动进程可承载多个会话的浏览器（geckodriver每个进程只支持一个会话，Firefox需使用远程端点）
+LOCAL_SERVICES = {'chrome': ChromeService, 'edge': EdgeService}
+
+# 各浏览器DevTools协议命令的厂商前缀
+CDP_VENDOR_PREFIXES = {'chrome': 'goog', 'edge': 'ms'}
+
+# 幂等的HTTP方法：请求已写出后连接断开时可以安全重发
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'})
+
+
+class AsyncHttpConnection:
+    """到WebDriver端点的HTTP/1.1长连接，基于asyncio流实现，同一连接上的请求串行发送"""
+
+    def __init__(self, url, timeout=60):
+        """
+        :param url: WebDriver端点，如 http://localhost:9515
+        :param timeout: 单个请求的超时时间（秒）
+        """
+        parsed = urlsplit(url)
+        if parsed.scheme != 'http':
+            raise ValueError(f"异步执行器只支持http协议的WebDriver端点: {url}")
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.base_path = parsed.path.rstrip('/')
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+        self._reused = False
+        self._lock = asyncio.Lock()
+
+    async def request(self, method, path, payload=None, idempotent=None):
+        """
+        发送一个JSON请求。复用的长连接断开时，只有请求尚未写出或命令幂等才重连重发一次，
+        点击、输入等非幂等命令可能已被端点执行，直接抛出连接异常
+        :param method: GET / POST / DELETE
+        :param path: 相对端点的路径
+        :param payload: 请求体，POST时为None则发送空对象
+        :param idempotent: 命令是否可安全重发，默认按HTTP方法判断
+        :return: (状态码, 解析后的响应体)
+        """
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        if payload is None and method == 'POST':
+            payload = {}
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        head = (
+            f"{method} {self.base_path}{path} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            "Accept: application/json\r\n"
+            "Content-Type: application/json;charset=UTF-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        ).encode('latin-1')
+
+        async with self._lock:
+            while True:
+                if self._writer is None:
+                    self._reader, self._writer = await asyncio.wait_for(
+                        asyncio.open_connection(self.host, self.port), self.timeout
+                    )
+                    self._reused = False
+                reused = self._reused
+                written = False
+                try:
+                    # 端点已关闭的空闲长连接在写出请求前即可发现
+                    if reused and (self._reader.at_eof() or self._writer.is_closing()):
+                        raise ConnectionResetError("WebDriver端点已关闭空闲连接")
+                    written = True
+                    self._writer.write(head + body)
+                    await self._writer.drain()
+                    status, headers, data = await asyncio.wait_for(self._read_response(), self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    await self.close()
+                    # 复用的连接失败时，请求未写出或命令幂等才重连重试一次
+                    if reused and (not written or idempotent):
+                        continue
+                    raise
+                except asyncio.TimeoutError:
+                    await self.close()
+                    raise TimeoutException(f"WebDriver命令在 {self.timeout}s 内无响应: {method} {path}")
+
+                self._reused = True
+                if headers.get('connection', '').lower() == 'close':
+                    await self.close()
+                return status, json.loads(data) if data else {}
+
+    async def _read_response(self):
+        """读取一个响应，支持Content-Length和分块传输"""
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionResetError("WebDriver端点关闭了连接")
+        status = int(status_line.split()[1])
+
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self._reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    while await self._reader.readline() not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(await self._reader.readexactly(size))
+                await self._reader.readexactly(2)
+            data = b''.join(chunks)
+        else:
+            data = await self._reader.readexactly(int(headers.get('content-length', 0)))
+        return status, headers, data
+
+    async def close(self):
+        """关闭连接"""
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+
+class AsyncSession:
+    """通过非阻塞HTTP驱动的一个WebDriver会话，只实现关键字用到的W3C命令；每个会话独占一条连接"""
+
+    def __init__(self, endpoint, browser_name, timeout=60, record_metrics=True):
+        """
+        :param endpoint: WebDriver端点
+        :param browser_name: 浏览器名称
+        :param timeout: 单条命令的超时时间（秒）
+        :param record_metrics: 是否把命令记录到command_metrics
+        """
+        self.connection = AsyncHttpConnection(endpoint, timeout)
+        self.browser_name = browser_name
+        self.record_metrics = record_metrics
+        self.session_id = None
+        self.capabilities = {}
+
+    async def start(self, capabilities):
+        """创建会话"""
+        value = await self._send(Command.NEW_SESSION, 'POST', '/session',
+                                 {'capabilities': {'alwaysMatch': capabilities, 'firstMatch': [{}]}})
+        self.session_id = value['sessionId']
+        self.capabilities = value.get('capabilities') or {}
+        return self
+
+    async def quit(self):
+        """删除会话并关闭连接"""
+        try:
+            if self.session_id:
+                await self.command(Command.QUIT, 'DELETE', '')
+        finally:
+            self.session_id = None
+            await self.connection.close()
+
+    async def command(self, command, method, path, payload=None, idempotent=None):
+        """
+        在当前会话上执行一条命令
+        :param command: 命令名称（与Selenium的命令名一致，用于指标统计）
+        :param path: 相对 /session/{id} 的路径
+        :param idempotent: 命令是否可安全重发，默认按HTTP方法判断
+        :return: 响应中的value
+        """
+        return await self._send(command, method, f"/session/{self.session_id}{path}", payload, idempotent)
+
+    async def _send(self, command, method, path, payload=None, idempotent=None):
+        """发送命令，按W3C错误码抛出对应的Selenium异常"""
+        started = time.perf_counter()
+        try:
+            status, response = await self.connection.request(method, path, payload, idempotent)
+        finally:
+            if self.record_metrics:
+                command_metrics.record(command, time.perf_counter() - started)
+
+        value = response.get('value') if isinstance(response, dict) else None
+        if status >= 400:
+            error = value.get('error', '') if isinstance(value, dict) else ''
+            message = value.get('message', '') if isinstance(value, dict) else str(response)
+            raise W3C_ERRORS.get(error, WebDriverException)(f"{error}: {message}" if error else message)
+        return value
+
+    async def get(self, url):
+        """导航到URL（按会话的页面加载策略阻塞）"""
+        await self.command(Command.GET, 'POST', '/url', {'url': url})
+
+    async def current_url(self):
+        """当前URL"""
+        return await self.command(Command.GET_CURRENT_URL, 'GET', '/url')
+
+    async def execute_script(self, script, *args):
+        """执行同步脚本，元素以W3C元素引用字典返回，可直接作为参数传回；框架内只读的定位、等待脚本可安全重发"""
+        return await self.command(Command.W3C_EXECUTE_SCRIPT, 'POST', '/execute/sync',
+                                  {'script': script, 'args': list(args)}, script in READ_ONLY_SCRIPTS)
+
+    async def execute_cdp_cmd(self, cmd, params):
+        """执行DevTools协议命令（Chromium内核）"""
+        prefix = CDP_VENDOR_PREFIXES[self.browser_name]
+        return await self.command('executeCdpCommand', 'POST', f'/{prefix}/cdp/execute', {'cmd': cmd, 'params': params})
+
+    async def click(self, element):
+        """点击元素"""
+        await self.command(Command.CLICK_ELEMENT, 'POST', f'/element/{element[ELEMENT_KEY]}/click')
+
+    async def clear(self, element):
+        """清空输入框"""
+        await self.command(Command.CLEAR_ELEMENT, 'POST', f'/element/{element[ELEMENT_KEY]}/clear')
+
+    async def send_keys(self, element, text):
+        """键盘输入"""
+        await self.command(Command.SEND_KEYS_TO_ELEMENT, 'POST', f'/element/{element[ELEMENT_KEY]}/value',
+                           {'text': str(text)})
+
+    async def text(self, element):
+        """元素可见文本"""
+        return await self.command(Command.GET_ELEMENT_TEXT, 'GET', f'/element/{element[ELEMENT_KEY]}/text')
+
+
+class AsyncConditions:
+    """异步关键字的完成条件，与WaitConditions一一对应，均为接收AsyncSession的协程函数"""
+
+    @staticmethod
+    def url_changes(old_url):
+        """URL发生变化"""
+
+        async def condition(session):
+            return await session.current_url() != old_url
+
+        return condition
+
+    @staticmethod
+    def element_visible(locator_data):
+        """任一定位策略匹配到可见元素"""
+        strategies = ElementLocator().get_script_strategies(locator_data)
+
+        async def condition(session):
+            match = await session.execute_script(LOCATE_SCRIPT, strategies, True)
+            return match[1] if match else False
+
+        return condition
+
+    @staticmethod
+    def document_ready(state='complete'):
+        """document.readyState达到指定状态（interactive 或 complete）"""
+        accepted = ('interactive', 'complete') if state == 'interactive' else ('complete',)
+
+        async def condition(session):
+            return await session.execute_script(DOCUMENT_STATE_SCRIPT) in accepted
+
+        return condition
+
+    @staticmethod
+    def page_loaded(strategy='normal'):
+        """新文档达到页面加载策略对应的就绪状态，见WaitConditions.page_loaded"""
+        accepted = PAGE_READY_STATES[strategy]
+
+        async def condition(session):
+            return await session.execute_script(PAGE_STATE_SCRIPT) in accepted
+
+        return condition
+
+    @staticmethod
+    def any_of(*conditions):
+        """任一条件满足，返回第一个满足条件的返回值"""
+
+        async def condition(session):
+            for item in conditions:
+                result = await item(session)
+                if result:
+                    return result
+            return False
+
+        return condition
+
+    @staticmethod
+    def all_of(*conditions):
+        """全部条件满足，返回各条件返回值列表"""
+
+        async def condition(session):
+            results = []
+            for item in conditions:
+                result = await item(session)
+                if not result:
+                    return False
+                results.append(result)
+            return results
+
+        return condition
+
+
+class AsyncWaitEngine(WaitEngine):
+    """WaitEngine的协程版本：超时配置、轮询间隔、等待预算和等待统计与同步引擎共用，轮询间隔内让出事件循环"""
+
+    # 最近一次poll的条件检查次数（每个会话一个引擎，会话内的关键字顺序执行）
+    polls = 0
+
+    async def poll(self, condition, timeout):
+        """
+        按自适应退避间隔轮询条件直到满足，超时时间不超过当前关键字剩余的等待预算
+        :return: 条件返回值
+        :raises TimeoutException: 超时
+        """
+        deadline = time.monotonic() + budgeted_timeout(timeout)
+        self.polls = 0
+        for interval in get_poll_schedule().intervals():
+            self.polls += 1
+            try:
+                result = await condition(self.driver)
+                if result:
+                    return result
+            except self.IGNORED_EXCEPTIONS:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutException(f"条件在 {timeout}s 内未满足")
+            await asyncio.sleep(min(interval, remaining))
+
+    async def wait_for(self, keyword, condition, timeout=None, raise_on_timeout=True):
+        """等待关键字的完成条件满足，参数与返回值同WaitEngine.wait_for"""
+        timeout = budgeted_timeout(timeout if timeout is not None else self.timeout_for(keyword))
+        legacy_sleep = (self.config.get('legacy_sleeps') or {}).get(keyword, 0)
+
+        started = time.time()
+        try:
+            result = await self.poll(condition, timeout)
+        except TimeoutException:
+            wait_stats.record(keyword, time.time() - started, legacy_sleep, False, self.polls)
+            self.logger.warning("等待完成条件超时: %s, 超时时间: %ss", keyword, timeout)
+            if raise_on_timeout:
+                raise TimeoutException(f"关键字完成条件在 {timeout}s 内未满足: {keyword}")
+            return None
+
+        elapsed = time.time() - started
+        wait_stats.record(keyword, elapsed, legacy_sleep, True, self.polls)
+        self.logger.debug("完成条件已满足: %s, 等待 %.2fs, 轮询 %s 次", keyword, elapsed, self.polls)
+        return result
+
+
+class AsyncKeywordEngine:
+    """协程版关键字引擎：关键字语义与KeywordEngine一致，定位和填表均在页面内一次脚本完成"""
+
+    # login_as依赖同步的登录快照缓存，异步执行的场景中不可用
+    KEYWORD_ARGS = {keyword: spec for keyword, spec in KeywordEngine.KEYWORD_ARGS.items() if keyword != 'login_as'}
+
+    # 元素查找默认超时时间（秒），与BasePage一致
+    ELEMENT_TIMEOUT = 10
+
+    def __init__(self, session, config_path="config/config.yaml"):
+        self.session = session
+        self.logger = get_logger()
+        self.config_path = config_path
+        self.wait_engine = AsyncWaitEngine(session, config_path)
+        self.locator = ElementLocator()
+        self.pages = {name: get_page_elements(name) for name in ('login_page', 'dashboard_page')}
+
+        # 关键字映射
+        self.keywords = {
+            'open_login_page': self.open_login_page,
+            'fill_username': self.fill_username,
+            'fill_password': self.fill_password,
+            'fill_form': self.fill_form,
+            'click_login': self.click_login,
+            'verify_login_success': self.verify_login_success,
+            'click_logout': self.click_logout,
+            'verify_dashboard_loaded': self.verify_dashboard_loaded
+        }
+
+    @classmethod
+    def compile_scenario(cls, scenario_data, name='scenario', columns=None):
+        """编译测试场景为执行计划，只接受异步引擎支持的关键字"""
+        return ScenarioCompiler(cls.KEYWORD_ARGS).compile(scenario_data, name=name, columns=columns)
+
+    async def find(self, page_name, key, visible=True, timeout=None):
+        """
+        按元素key定位元素，全部定位策略在一次脚本调用内检查，命中结果记入定位策略缓存
+        :return: W3C元素引用
+        """
+        locators = self.locator.script_candidates(
+            get_locator_cache().order(page_name, key, self.pages[page_name][key]))
+        strategies = self.locator.get_script_strategies(locators)
+
+        check = {'elapsed': 0.0}
+
+        async def located(session):
+            check_started = time.time()
+            try:
+                return await session.execute_script(LOCATE_SCRIPT, strategies, visible)
+            finally:
+                check['elapsed'] = time.time() - check_started
+
+        try:
+            index, element = await self.wait_engine.poll(located, timeout or self.ELEMENT_TIMEOUT)
+        except TimeoutException:
+            raise TimeoutException(f"无法找到元素: {page_name}.{key}")
+        self.locator.record_race((page_name, key), locators, index, check['elapsed'])
+        return element
+
+    async def fill(self, page_name, fields, keystrokes=None):
+        """批量填表，语义同BasePage.fill_form"""
+        keystrokes = set(keystrokes or [])
+        batch_keys = [key for key in fields if key not in keystrokes]
+
+        if batch_keys:
+            # 脚本返回的命中序号对应过滤后的候选策略
+            locators = [self.locator.script_candidates(
+                get_locator_cache().order(page_name, key, self.pages[page_name][key])) for key in batch_keys]
+            payload = [[self.locator.get_script_strategies(locator_data), fields[key]]
+                       for key, locator_data in zip(batch_keys, locators)]
+            matches = []
+            check = {'elapsed': 0.0}
+
+            async def all_filled(session):
+                check_started = time.time()
+                matches[:] = await session.execute_script(FILL_FORM_SCRIPT, payload)
+                check['elapsed'] = time.time() - check_started
+                return -1 not in matches
+
+            try:
+                await self.wait_engine.poll(all_filled, self.ELEMENT_TIMEOUT)
+            except TimeoutException:
+                missing = [key for key, index in zip(batch_keys, matches) if index == -1]
+                raise TimeoutException(f"批量填表未找到字段: {missing}")
+            for key, candidates, index in zip(batch_keys, locators, matches):
+                self.locator.record_race((page_name, key), candidates, index, check['elapsed'])
+
+        for key in fields:
+            if key in keystrokes:
+                element = await self.find(page_name, key, visible=False)
+                await self.session.clear(element)
+                await self.session.send_keys(element, fields[key])
+
+    async def open(self, url, keyword, ready_condition):
+        """按关键字的页面加载策略打开页面并等待就绪，语义同BasePage.open"""
+        strategy = page_load_strategy_for(keyword, self.config_path)
+        session_strategy = self.session.capabilities.get('pageLoadStrategy', 'normal')
+        stricter = is_stricter(strategy, session_strategy)
+        started = time.perf_counter()
+        if session_strategy == 'none' and stricter:
+            await self.session.execute_script(MARK_NAVIGATION_SCRIPT)
+        await self.session.get(url)
+
+        condition = AsyncConditions.all_of(AsyncConditions.page_loaded(strategy), ready_condition) \
+            if stricter else ready_condition
+        result = await self.wait_engine.wait_for(keyword, condition)
+        timing = await self.session.execute_script(NAVIGATION_TIMING_SCRIPT)
+        page_load_stats.record_navigation(keyword, strategy, time.perf_counter() - started, timing)
+        return result
+
+    async def open_login_page(self, data):
+        """打开登录页面"""
+        url = data.get('url', '/login') if data else '/login'
+        current_url = await self.session.current_url()
+        if current_url.startswith('http'):
+            base_url = current_url.rsplit('/', 1)[0]
+        else:
+            base_url = load_config(self.config_path)['environment']['base_url']
+        await self.open(base_url.rstrip('/') + url, 'open_login_page',
+                        AsyncConditions.element_visible(self.pages['login_page']['username_input']))
+        return True
+
+    async def fill_username(self, data):
+        """填写用户名"""
+        if not data or 'value' not in data:
+            raise ValueError("缺少用户名值")
+        await self.fill('login_page', {'username_input': data['value']})
+        return True
+
+    async def fill_password(self, data):
+        """填写密码"""
+        if not data or 'value' not in data:
+            raise ValueError("缺少密码值")
+        await self.fill('login_page', {'password_input': data['value']})
+        return True
+
+    async def fill_form(self, data):
+        """批量填表，data同KeywordEngine.fill_form"""
+        if not data or not data.get('fields'):
+            raise ValueError("缺少表单字段")
+        page_name = data.get('page', 'login_page')
+        if page_name not in self.pages:
+            raise ValueError(f"未知页面: {page_name}")
+        await self.fill(page_name, data['fields'], data.get('keystrokes'))
+        return True
+
+    async def click_login(self, data):
+        """点击登录"""
+        url_before = await self.session.current_url()
+        await self.session.click(await self.find('login_page', 'login_button'))
+        await self.wait_engine.wait_for('click_login', AsyncConditions.any_of(
+            AsyncConditions.url_changes(url_before),
+            AsyncConditions.element_visible(self.pages['login_page']['error_message'])
+        ), raise_on_timeout=False)
+        return True
+
+    async def verify_login_success(self, data):
+        """验证登录成功"""
+        expected_text = data.get('expected_text', 'Welcome') if data else 'Welcome'
+        result = await self.wait_engine.wait_for('verify_login_success', AsyncConditions.all_of(
+            AsyncConditions.document_ready(),
+            AsyncConditions.element_visible(self.pages['dashboard_page']['welcome_message'])
+        ), raise_on_timeout=False)
+        if not result:
+            raise AssertionError("登录后未跳转到仪表板页面")
+
+        welcome_message = await self.session.text(result[1])
+        if not welcome_message or expected_text not in welcome_message:
+            raise AssertionError(f"未找到预期的欢迎信息 '{expected_text}', 实际: {welcome_message}")
+        return True
+
+    async def click_logout(self, data):
+        """点击退出"""
+        url_before = await self.session.current_url()
+        await self.session.click(await self.find('dashboard_page', 'logout_button'))
+        await self.wait_engine.wait_for('click_logout', AsyncConditions.any_of(
+            AsyncConditions.url_changes(url_before),
+            AsyncConditions.element_visible(self.pages['login_page']['username_input'])
+        ))
+        return True
+
+    async def verify_dashboard_loaded(self, data):
+        """验证仪表板已加载"""
+        try:
+            await self.find('dashboard_page', 'welcome_message')
+        except TimeoutException:
+            raise AssertionError("仪表板页面未正确加载")
+        return True
+
+
+class AsyncScenarioExecutor:
+    """
+    asyncio多会话场景执行器：一个事件循环通过非阻塞HTTP同时驱动多个无头会话，
+    数据行按需从迭代器中取出分发给空闲会话，适合大批量数据驱动场景（每个会话一个线程的run_parallel难以扩展到几十个会话）
+    """
+
+    def __init__(self, sessions=None, browser_name=None, config_path="config/config.yaml"):
+        """
+        :param sessions: 并发会话数，默认取async_executor.sessions
+        :param browser_name: 浏览器名称，默认取browser.name
+        """
+        self.logger = get_logger()
+        self.config_path = config_path
+        self.driver_manager = DriverManager(config_path)
+        config = self.driver_manager.config
+        executor_config = config.get('async_executor') or {}
+
+        self.sessions = sessions or executor_config.get('sessions', 20)
+        self.startup_concurrency = executor_config.get('startup_concurrency', 4)
+        self.command_timeout = executor_config.get('command_timeout', 60)
+        self.headless = executor_config.get('headless', True)
+        self.remote_url = os.environ.get('ATHENA_WEBDRIVER_URL') or executor_config.get('remote_url')
+        self.browser_name = (browser_name or config['browser']['name']).lower()
+        self.record_metrics = (config.get('metrics') or {}).get('enabled', True)
+        self._browser_path = None
+
+    def run(self, scenario_data, rows, name='scenario'):
+        """
+        在多个会话上并发执行数据驱动场景
+        :param scenario_data: 场景步骤列表或AsyncKeywordEngine.compile_scenario编译的ExecutionPlan
+        :param rows: 数据行可迭代对象（可为DataDriver生成器），元素为行字典或 (行标识, 行字典)
+        :param name: 场景名称
+        :return: RowResult列表（按完成顺序）
+        """
+        if not hasattr(scenario_data, 'steps'):
+            # 按第一行的列名在启动会话前校验占位符
+            columns, rows = peek_columns(rows)
+            scenario_data = AsyncKeywordEngine.compile_scenario(scenario_data, name=name, columns=columns)
+        return asyncio.run(self.run_async(scenario_data, rows))
+
+    async def run_async(self, plan, rows):
+        """run的协程版本，可在已有事件循环中调用"""
+        source = ((item if isinstance(item, tuple) else (row_index, item)) for row_index, item in enumerate(rows))
+        # 预取至多sessions行确定会话数：数据行少于并发会话数时（包括没有长度的生成器）只启动需要的会话
+        buffered = list(itertools.islice(source, self.sessions))
+        if not buffered:
+            return []
+        workers = len(buffered)
+        source = itertools.chain(buffered, source)
+
+        loop = asyncio.get_running_loop()
+        endpoint, service = await loop.run_in_executor(None, self._start_endpoint)
+        # 各会话共享同一个行迭代器，单线程事件循环中取数据行无需加锁
+        startup = asyncio.Semaphore(self.startup_concurrency)
+
+        async def worker():
+            async with startup:
+                session = await self._open_session(endpoint)
+            try:
+                engine = AsyncKeywordEngine(session, self.config_path)
+                return [result async for result in plan.run_async(engine, source)]
+            finally:
+                try:
+                    await session.quit()
+                except Exception as e:
+                    self.logger.warning("异步会话退出失败: %s", str(e))
+
+        started = time.time()
+        try:
+            outcomes = await asyncio.gather(*(worker() for _ in range(workers)), return_exceptions=True)
+        finally:
+            if service:
+                await loop.run_in_executor(None, service.stop)
+
+        errors = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+        results = [result for outcome in outcomes if not isinstance(outcome, BaseException) for result in outcome]
+        for error in errors:
+            self.logger.error("异步会话启动失败: %s", str(error))
+        if errors and len(errors) == len(outcomes):
+            raise errors[0]
+
+        passed = sum(1 for result in results if result.status == 'PASS')
+        self.logger.info("异步执行完成: 场景 %s, %s 行, 通过 %s, 会话 %s, 耗时 %.2fs",
+                         plan.name, len(results), passed, len(outcomes) - len(errors), time.time() - started)
+        return results
+
+    def _start_endpoint(self):
+        """
+        确定WebDriver端点：配置了远程端点时直接使用，否则在本地启动一个驱动进程承载全部会话
+        :return: (端点URL, 本地Service或None)
+        """
+        if self.remote_url:
+            return self.remote_url.rstrip('/'), None
+        if self.browser_name not in LOCAL_SERVICES:
+            raise ValueError(f"异步执行器不支持在本地启动 {self.browser_name}，"
+                             f"请配置async_executor.remote_url使用远程WebDriver端点")
+
+        service = LOCAL_SERVICES[self.browser_name]()
+        finder = DriverFinder(service, self.driver_manager.build_options(self.browser_name, self.headless))
+        self._browser_path = finder.get_browser_path() or None
+        service.path = service.env_path() or finder.get_driver_path()
+        service.start()
+        self.logger.info("异步执行器驱动进程已启动: %s", service.service_url)
+        return service.service_url, service
+
+    async def _open_session(self, endpoint):
+        """创建并配置一个会话：每个会话独立生成启动选项（配置模板副本不能共用）"""
+        loop = asyncio.get_running_loop()
+        options = await loop.run_in_executor(None, self.driver_manager.build_options, self.browser_name, self.headless)
+        if self._browser_path:
+            options.binary_location = self._browser_path
+        capabilities = options.to_capabilities()
+        # 关键字都在页面内轮询，不需要隐式等待
+        capabilities['timeouts'] = {
+            'implicit': 0, 'pageLoad': self.driver_manager.config['browser']['page_load_timeout'] * 1000
+        }
+
+        started = time.perf_counter()
+        session = AsyncSession(endpoint, self.browser_name, self.command_timeout, self.record_metrics)
+        await session.start(capabilities)
+        page_load_stats.record_startup(self.browser_name, time.perf_counter() - started,
+                                       self.driver_manager._profile_template(self.browser_name) is not None)
+
+        network_profiles = self.driver_manager.network_profiles
+        if self.browser_name in CDP_VENDOR_PREFIXES:
+            for command, params in network_profiles.cdp_commands(network_profiles.resolve()):
+                await session.execute_cdp_cmd(command, params)
+        return session
@@ -0,0 +1,220 @@
+# framework/auth_state.py
+from pages.login_page import LoginPage
+from pages.dashboard_page import DashboardPage
+from utils.wait_engine import WaitEngine, WaitConditions
+from utils.logger import get_logger
+from config.registry import load_config
+from urllib.parse import urlsplit
+import threading
+import json
+import time
+
+
+# 一次性读取当前源的localStorage/sessionStorage和当前URL
+CAPTURE_STORAGE_SCRIPT = """
+function dump(storage) {
+    var data = {};
+    try {
+        for (var i = 0; i < storage.length; i++) {
+            var key = storage.key(i);
+            data[key] = storage.getItem(key);
+        }
+    } catch (e) {}
+    return data;
+}
+return {url: location.href, origin: location.origin,
+        local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+# 写入Web存储：%s 替换为 {origin, local, session} 的JSON，只在快照所属的源上生效
+RESTORE_STORAGE_SCRIPT = """
+(function (state) {
+    if (location.origin !== state.origin) { return; }
+    for (var key in state.local) { window.localStorage.setItem(key, state.local[key]); }
+    for (var key in state.session) { window.sessionStorage.setItem(key, state.session[key]); }
+})(%s);
+"""
+
+
+class AuthSnapshot:
+    """一个用户的登录状态快照"""
+
+    def __init__(self, cookies, origin, url, local_storage, session_storage):
+        self.cookies = cookies
+        self.origin = origin
+        self.url = url
+        self.local_storage = local_storage
+        self.session_storage = session_storage
+        self.captured_at = time.time()
+
+    def is_expired(self, ttl_seconds):
+        """超过TTL或任一Cookie已过期时视为失效"""
+        now = time.time()
+        if now - self.captured_at > ttl_seconds:
+            return True
+        return any(cookie.get('expiry') is not None and cookie['expiry'] <= now for cookie in self.cookies)
+
+
+class AuthStateCache:
+    """
+    登录状态缓存：每个用户只通过UI登录一次，抓取Cookie和Web存储，
+    之后的测试直接把快照恢复到新会话或会话池会话中，跳过登录页面
+    """
+
+    def __init__(self, config_path="config/config.yaml"):
+        self.logger = get_logger()
+        config = load_config(config_path)
+        auth_config = config.get('auth_state') or {}
+
+        self.enabled = auth_config.get('enabled', True)
+        self.ttl_seconds = auth_config.get('ttl_seconds', 1800)
+
+        self._lock = threading.Lock()
+        self._user_locks = {}
+        self._snapshots = {}
+
+    def login(self, driver, username, password):
+        """
+        使会话处于该用户的登录状态：有有效快照时直接恢复，否则通过UI登录并抓取快照
+        :param driver: WebDriver对象
+        :param username: 用户名
+        :param password: 密码
+        :return: True表示由快照恢复，False表示走了UI登录
+        """
+        with self._user_lock(username):
+            snapshot = self._snapshots.get(username)
+            if self.enabled and snapshot and not snapshot.is_expired(self.ttl_seconds):
+                if self.restore(driver, snapshot):
+                    self.logger.info("已恢复登录状态: %s", username)
+                    return True
+                self.logger.warning("登录状态快照已被服务端失效，重新登录: %s", username)
+
+            self._ui_login(driver, username, password)
+            if self.enabled:
+                self._snapshots[username] = self.capture(driver)
+                self.logger.info("已缓存登录状态: %s", username)
+            return False
+
+    def capture(self, driver):
+        """
+        抓取当前会话的登录状态
+        :param driver: WebDriver对象
+        :return: AuthSnapshot
+        """
+        if getattr(driver, 'supports_javascript', True):
+            storage = driver.execute_script(CAPTURE_STORAGE_SCRIPT)
+        else:
+            # 无浏览器驱动没有Web存储，登录状态只在Cookie中
+            parts = urlsplit(driver.current_url)
+            storage = {'origin': f"{parts.scheme}://{parts.netloc}", 'url': driver.current_url,
+                       'local': {}, 'session': {}}
+        return AuthSnapshot(driver.get_cookies(), storage['origin'], storage['url'],
+                            storage['local'], storage['session'])
+
+    def restore(self, driver, snapshot):
+        """
+        将快照恢复到会话中并打开登录后的页面
+        :param driver: WebDriver对象
+        :param snapshot: AuthSnapshot
+        :return: 恢复后仪表板是否可见
+        """
+        storage_state = json.dumps({
+            'origin': snapshot.origin,
+            'local': snapshot.local_storage,
+            'session': snapshot.session_storage
+        })
+
+        if hasattr(driver, 'execute_cdp_cmd'):
+            # Chromium内核：Cookie直接写入浏览器，存储在页面脚本执行前注入，只需一次导航
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setCookies', {
+                'cookies': [self._to_cdp_cookie(cookie, snapshot.origin) for cookie in snapshot.cookies]
+            })
+            script = driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+                'source': RESTORE_STORAGE_SCRIPT % storage_state
+            })
+            try:
+                driver.get(snapshot.url)
+            finally:
+                driver.execute_cdp_cmd('Page.removeScriptToEvaluateOnNewDocument', {
+                    'identifier': script['identifier']
+                })
+        else:
+            # 其他浏览器只能为当前域名写Cookie：先打开同源页面写入状态，再跳转到登录后的页面
+            driver.get(snapshot.origin)
+            for cookie in snapshot.cookies:
+                driver.add_cookie(cookie)
+            if getattr(driver, 'supports_javascript', True):
+                driver.execute_script(RESTORE_STORAGE_SCRIPT % storage_state)
+            driver.get(snapshot.url)
+
+        return WaitEngine(driver).wait_for('verify_login_success', WaitConditions.all_of(
+            WaitConditions.document_ready(),
+            WaitConditions.element_visible(DashboardPage(driver).page_elements['welcome_message'])
+        ), raise_on_timeout=False)
+
+    def invalidate(self, username=None):
+        """
+        清除快照
+        :param username: 只清除该用户，默认全部
+        """
+        with self._lock:
+            if username is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(username, None)
+
+    def _ui_login(self, driver, username, password):
+        """通过登录页面完成登录，并等待仪表板可见"""
+        login_page = LoginPage(driver)
+        login_page.open_login_page()
+        url_before = driver.current_url
+        login_page.login(username, password)
+
+        wait_engine = WaitEngine(driver)
+        wait_engine.wait_for('click_login', WaitConditions.any_of(
+            WaitConditions.url_changes(url_before),
+            WaitConditions.element_visible(login_page.page_elements['error_message'])
+        ), raise_on_timeout=False)
+        logged_in = wait_engine.wait_for('verify_login_success', WaitConditions.all_of(
+            WaitConditions.document_ready(),
+            WaitConditions.element_visible(DashboardPage(driver).page_elements['welcome_message'])
+        ), raise_on_timeout=False)
+        if not logged_in:
+            raise AssertionError(f"登录失败，无法缓存登录状态: {username}")
+
+    def _user_lock(self, username):
+        """同一用户的登录串行进行，避免并行测试重复走UI登录"""
+        with self._lock:
+            return self._user_locks.setdefault(username, threading.Lock())
+
+    @staticmethod
+    def _to_cdp_cookie(cookie, origin):
+        """Selenium Cookie格式转换为CDP Network.setCookies格式"""
+        cdp_cookie = {
+            'name': cookie['name'],
+            'value': cookie['value'],
+            'path': cookie.get('path', '/'),
+            'secure': cookie.get('secure', False),
+            'httpOnly': cookie.get('httpOnly', False)
+        }
+        if cookie.get('domain'):
+            cdp_cookie['domain'] = cookie['domain']
+        else:
+            cdp_cookie['url'] = origin
+        if cookie.get('expiry') is not None:
+            cdp_cookie['expires'] = cookie['expiry']
+        if cookie.get('sameSite') in ('Strict', 'Lax', 'None'):
+            cdp_cookie['sameSite'] = cookie['sameSite']
+        return cdp_cookie
+
+
+_auth_state_cache = None
+
+
+def get_auth_state_cache():
+    """获取进程内共享的登录状态缓存"""
+    global _auth_state_cache
+    if _auth_state_cache is None:
+        _auth_state_cache = AuthStateCache()
+    return _auth_state_cache
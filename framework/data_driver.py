@@ -1,135 +1,290 @@
-# framework/keyword_engine.py
-from utils.logger import Logger
-from pages.login_page import LoginPage
-from pages.dashboard_page import DashboardPage
-import time
-
-
-class KeywordEngine:
-    """关键字驱动引擎"""
-
-    def __init__(self, driver):
-        self.driver = driver
-        self.logger = Logger()
-        self.login_page = LoginPage(driver)
-        self.dashboard_page = DashboardPage(driver)
-
-        # 关键字映射
-        self.keywords = {
-            'open_login_page': self.open_login_page,
-            'fill_username': self.fill_username,
-            'fill_password': self.fill_password,
-            'click_login': self.click_login,
-            'verify_login_success': self.verify_login_success,
-            'click_logout': self.click_logout,
-            'verify_dashboard_loaded': self.verify_dashboard_loaded
-        }
-
-    def execute_keyword(self, keyword, data=None):
-        """
-        执行关键字
-        :param keyword: 关键字名称
-        :param data: 关键字数据
-        :return: 执行结果
-        """
-        if keyword not in self.keywords:
-            raise ValueError(f"未知关键字: {keyword}")
-
-        self.logger.info(f"执行关键字: {keyword}, 数据: {data}")
-
-        try:
-            result = self.keywords[keyword](data)
-            self.logger.info(f"关键字执行成功: {keyword}")
-            return result
-        except Exception as e:
-            self.logger.error(f"关键字执行失败: {keyword}, 错误: {str(e)}")
-            raise
-
-    def open_login_page(self, data):
-        """打开登录页面"""
-        url = data.get('url', '/login') if data else '/login'
-        self.login_page.open_login_page(url)
-        return True
-
-    def fill_username(self, data):
-        """填写用户名"""
-        if not data or 'value' not in data:
-            raise ValueError("缺少用户名值")
-        username = data['value']
-        self.login_page.enter_username(username)
-        return True
-
-    def fill_password(self, data):
-        """填写密码"""
-        if not data or 'value' not in data:
-            raise ValueError("缺少密码值")
-        password = data['value']
-        self.login_page.enter_password(password)
-        return True
-
-    def click_login(self, data):
-        """点击登录"""
-        self.login_page.click_login_button()
-        time.sleep(2)  # 等待登录处理
-        return True
-
-    def verify_login_success(self, data):
-        """验证登录成功"""
-        expected_text = data.get('expected_text', 'Welcome') if data else 'Welcome'
-
-        # 等待页面跳转
-        time.sleep(3)
-
-        # 检查是否在仪表板页面
-        is_dashboard_loaded = self.dashboard_page.verify_dashboard_loaded()
-        if not is_dashboard_loaded:
-            raise AssertionError("登录后未跳转到仪表板页面")
-
-        # 检查欢迎信息
-        welcome_message = self.dashboard_page.get_welcome_message()
-        if not welcome_message or expected_text not in welcome_message:
-            raise AssertionError(f"未找到预期的欢迎信息 '{expected_text}', 实际: {welcome_message}")
-
-        return True
-
-    def click_logout(self, data):
-        """点击退出"""
-        self.dashboard_page.click_logout()
-        time.sleep(2)
-        return True
-
-    def verify_dashboard_loaded(self, data):
-        """验证仪表板已加载"""
-        is_loaded = self.dashboard_page.verify_dashboard_loaded()
-        if not is_loaded:
-            raise AssertionError("仪表板页面未正确加载")
-        return True
-
-    def execute_test_scenario(self, scenario_data):
-        """
-        执行测试场景
-        :param scenario_data: 场景数据列表，每个元素包含action和data
-        """
-        results = []
-        for step in scenario_data:
-            action = step.get('action')
-            data = step.get('data', {})
-
-            try:
-                result = self.execute_keyword(action, data)
-                results.append({
-                    'action': action,
-                    'status': 'PASS',
-                    'result': result
-                })
-            except Exception as e:
-                results.append({
-                    'action': action,
-                    'status': 'FAIL',
-                    'error': str(e)
-                })
-                # 如果步骤失败，可以选择继续或停止
-                if not step.get('continue_on_failure', False):
+# framework/data_driver.py
+from config.registry import load_config
+from utils.logger import get_logger
+from utils.impact_analysis import dependency_recorder
+from array import array
+import itertools
+import json
+import csv
+import os
+import yaml
+
+
+# 优先使用libyaml的C实现解析
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+class DataDriver:
+    """数据驱动引擎：以生成器方式流式读取YAML/CSV/JSONL测试数据，支持过滤、切片和按worker分片"""
+
+    YAML_EXTENSIONS = ('.yaml', '.yml')
+    CSV_EXTENSIONS = ('.csv',)
+    JSONL_EXTENSIONS = ('.jsonl', '.ndjson')
+
+    def __init__(self, data_file=None, config_path="config/config.yaml"):
+        self.logger = get_logger()
+        if data_file is None:
+            data_file = load_config(config_path)['environment']['test_data_file']
+        self.data_file = data_file
+
+    def iter_rows(self, source=None, path=None, where=None, fields=None, start=0, stop=None, step=1,
+                  shard_index=None, shard_count=None):
+        """
+        流式读取测试数据行
+        :param source: 数据文件路径，默认为配置中的test_data_file
+        :param path: YAML中数据列表的路径，用点分隔，如 'login_test_data.valid_credentials'
+        :param where: 过滤条件，{列名: 值} 或接收行字典返回布尔值的函数
+        :param fields: 只保留的列名列表
+        :param start: 过滤后的起始行
+        :param stop: 过滤后的结束行（不包含）
+        :param step: 步长
+        :param shard_index: 分片序号，从0开始
+        :param shard_count: 分片总数，按原始行号取模分配，各worker只解析自己的行
+        :return: 行字典生成器
+        """
+        rows = (row for _, row in self.iter_indexed_rows(source, path, shard_index, shard_count))
+
+        if where is not None:
+            rows = filter(self._build_filter(where), rows)
+        if fields is not None:
+            rows = ({field: row.get(field) for field in fields} for row in rows)
+        if start or stop is not None or step != 1:
+            rows = itertools.islice(rows, start, stop, step)
+        return rows
+
+    def iter_indexed_rows(self, source=None, path=None, shard_index=None, shard_count=None, where=None,
+                          start_index=0):
+        """
+        流式读取 (原始行号, 行字典)，行号在分片、过滤前确定，可作为稳定的行标识
+        :param source: 数据文件路径
+        :param path: YAML中数据列表的路径
+        :param shard_index: 分片序号
+        :param shard_count: 分片总数
+        :param where: 过滤条件，同iter_rows
+        :param start_index: 从该原始行号开始读取，之前的行只跳过不解析
+        :return: (行号, 行字典) 生成器
+        """
+        rows = self._iter_indexed(source, path, shard_index, shard_count, start_index)
+        if where is not None:
+            matches = self._build_filter(where)
+            rows = ((index, row) for index, row in rows if matches(row))
+        return rows
+
+    def _iter_indexed(self, source, path, shard_index, shard_count, start_index=0):
+        """按文件格式流式读取 (原始行号, 行字典)"""
+        source = source or self.data_file
+        dependency_recorder.note('data', f"{source}:{path or ''}")
+        if shard_count:
+            if shard_index is None or not 0 <= shard_index < shard_count:
+                raise ValueError(f"无效的分片参数: {shard_index}/{shard_count}")
+            owns = lambda index: index >= start_index and index % shard_count == shard_index
+        else:
+            owns = lambda index: index >= start_index
+
+        extension = os.path.splitext(source)[1].lower()
+        if extension in self.YAML_EXTENSIONS:
+            return self._iter_yaml(source, path, owns)
+        if extension in self.CSV_EXTENSIONS:
+            return self._iter_csv(source, owns)
+        if extension in self.JSONL_EXTENSIONS:
+            return self._iter_jsonl(source, owns)
+        raise ValueError(f"不支持的数据文件格式: {source}")
+
+    def row_offsets(self, source=None):
+        """
+        扫描CSV/JSONL，记录每个数据行在文件中的位置（不解析行内容），供read_row_at按行号直接读取
+        :param source: 数据文件路径
+        :return: array，下标为原始行号；YAML文件返回None（按行号读取时使用iter_indexed_rows的start_index）
+        """
+        source = source or self.data_file
+        extension = os.path.splitext(source)[1].lower()
+        offsets = array('q')
+        if extension in self.CSV_EXTENSIONS:
+            with open(source, 'r', encoding='utf-8', newline='') as file:
+                # 通过readline读取，tell()才能给出每行（含跨行的带引号字段）的起始位置
+                reader = csv.reader(iter(file.readline, ''))
+                if next(reader, None) is None:
+                    return offsets
+                while True:
+                    offset = file.tell()
+                    if next(reader, None) is None:
+                        return offsets
+                    offsets.append(offset)
+        if extension in self.JSONL_EXTENSIONS:
+            with open(source, 'r', encoding='utf-8') as file:
+                while True:
+                    offset = file.tell()
+                    line = file.readline()
+                    if not line:
+                        return offsets
+                    if line.strip():
+                        offsets.append(offset)
+        return None
+
+    def read_row_at(self, source, offset):
+        """
+        读取row_offsets记录的位置上的数据行
+        :param source: 数据文件路径
+        :param offset: row_offsets返回的位置
+        :return: 行字典
+        """
+        source = source or self.data_file
+        if os.path.splitext(source)[1].lower() in self.CSV_EXTENSIONS:
+            with open(source, 'r', encoding='utf-8', newline='') as file:
+                header = next(csv.reader(iter(file.readline, '')))
+                file.seek(offset)
+                return dict(zip(header, next(csv.reader(iter(file.readline, '')))))
+        with open(source, 'r', encoding='utf-8') as file:
+            file.seek(offset)
+            return json.loads(file.readline())
+
+    @staticmethod
+    def worker_shard():
+        """
+        根据pytest-xdist环境变量计算当前worker的分片参数
+        :return: (shard_index, shard_count)，非并行运行时为 (None, None)
+        """
+        worker = os.environ.get('PYTEST_XDIST_WORKER', '')
+        count = os.environ.get('PYTEST_XDIST_WORKER_COUNT')
+        if not worker.startswith('gw') or not count:
+            return None, None
+        return int(worker[2:]), int(count)
+
+    def get_login_test_data(self, data_type):
+        """
+        获取登录测试数据
+        :param data_type: valid_credentials 或 invalid_credentials
+        :return: 数据行列表
+        """
+        return list(self.iter_rows(path=f"login_test_data.{data_type}"))
+
+    def get_test_scenario(self, scenario_name):
+        """
+        获取测试场景步骤
+        :param scenario_name: test_scenarios下的场景名称
+        :return: 步骤列表
+        """
+        return list(self.iter_rows(path=f"test_scenarios.{scenario_name}"))
+
+    def _build_filter(self, where):
+        """构造行过滤函数"""
+        if callable(where):
+            return where
+        return lambda row: all(row.get(key) == value for key, value in where.items())
+
+    def _iter_csv(self, source, owns):
+        """逐行读取CSV，只为属于当前分片的行构造字典"""
+        with open(source, 'r', encoding='utf-8', newline='') as file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if header is None:
+                return
+            for index, values in enumerate(reader):
+                if owns(index):
+                    yield index, dict(zip(header, values))
+
+    def _iter_jsonl(self, source, owns):
+        """逐行读取JSONL，跳过空行，只解析属于当前分片的行"""
+        with open(source, 'r', encoding='utf-8') as file:
+            index = 0
+            for line in file:
+                if not line.strip():
+                    continue
+                if owns(index):
+                    yield index, json.loads(line)
+                index += 1
+
+    def _iter_yaml(self, source, path, owns):
+        """
+        基于YAML事件流读取path指向的列表，每次只构造一行，不加载整个文件
+        （行之间不能通过锚点/别名互相引用）
+        """
+        parts = path.split('.') if path else []
+
+        with open(source, 'r', encoding='utf-8') as file:
+            events = yaml.parse(file, Loader=_YamlLoader)
+            for event in events:
+                if isinstance(event, yaml.DocumentStartEvent):
+                    break
+
+            target_event = self._seek_yaml_path(events, parts)
+            if target_event is None:
+                raise KeyError(f"数据文件 {source} 中不存在路径: {path}")
+            if not isinstance(target_event, yaml.SequenceStartEvent):
+                raise ValueError(f"数据文件 {source} 中路径 {path or '<root>'} 不是列表")
+
+            for index, row in self._iter_yaml_sequence_items(events, owns):
+                yield index, row
+
+    def _seek_yaml_path(self, events, parts):
+        """沿映射key逐级定位，返回目标节点的起始事件，路径不存在时返回None"""
+        event = next(events)
+        for part in parts:
+            if not isinstance(event, yaml.MappingStartEvent):
+                return None
+            while True:
+                key_event = next(events)
+                if isinstance(key_event, yaml.MappingEndEvent):
+                    return None
+                value_event = next(events)
+                if isinstance(key_event, yaml.ScalarEvent) and key_event.value == part:
+                    event = value_event
+                    break
+                self._skip_yaml_node(events, value_event)
+        return event
+
+    def _iter_yaml_sequence_items(self, events, owns):
+        """逐个产出目标列表中的元素，只为属于当前分片的元素构造对象"""
+        loader = _YamlLoader('')
+        index = 0
+        for event in events:
+            if isinstance(event, yaml.SequenceEndEvent):
+                return
+            if owns(index):
+                yield index, loader.construct_document(self._compose_yaml_node(loader, events, event))
+            else:
+                self._skip_yaml_node(events, event)
+            index += 1
+
+    def _compose_yaml_node(self, loader, events, start_event):
+        """由事件直接组装单个节点，标签解析规则与safe_load一致"""
+        if isinstance(start_event, yaml.ScalarEvent):
+            tag = start_event.tag
+            if tag is None or tag == '!':
+                tag = loader.resolve(yaml.ScalarNode, start_event.value, start_event.implicit)
+            return yaml.ScalarNode(tag, start_event.value, style=start_event.style)
+
+        if isinstance(start_event, yaml.SequenceStartEvent):
+            tag = start_event.tag
+            if tag is None or tag == '!':
+                tag = loader.resolve(yaml.SequenceNode, None, start_event.implicit)
+            items = []
+            for event in events:
+                if isinstance(event, yaml.SequenceEndEvent):
                     break
+                items.append(self._compose_yaml_node(loader, events, event))
+            return yaml.SequenceNode(tag, items)
+
+        if isinstance(start_event, yaml.MappingStartEvent):
+            tag = start_event.tag
+            if tag is None or tag == '!':
+                tag = loader.resolve(yaml.MappingNode, None, start_event.implicit)
+            pairs = []
+            for event in events:
+                if isinstance(event, yaml.MappingEndEvent):
+                    break
+                key = self._compose_yaml_node(loader, events, event)
+                pairs.append((key, self._compose_yaml_node(loader, events, next(events))))
+            return yaml.MappingNode(tag, pairs)
+
+        raise ValueError(f"数据行中不支持的YAML结构（如跨行的锚点/别名）: {start_event}")
 
-        return results
\ No newline at end of file
+    def _skip_yaml_node(self, events, start_event):
+        """跳过一个完整节点"""
+        depth = 1 if isinstance(start_event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)) else 0
+        while depth:
+            event = next(events)
+            if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+                depth += 1
+            elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+                depth -= 1
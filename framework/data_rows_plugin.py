@@ -0,0 +1,110 @@
+# framework/data_rows_plugin.py
+from framework.data_driver import DataDriver
+from utils.impact_analysis import dependency_recorder
+from collections import namedtuple
+import re
+
+
+# 测试项参数：只保存数据行的位置，行内容在测试执行时才读取
+DataRowRef = namedtuple('DataRowRef', ['source', 'path', 'index'])
+
+# 行标识中保留的字符，其余替换为下划线
+ROW_ID_PATTERN = re.compile(r'[^\w@.\-]+')
+
+
+class RowCursor:
+    """
+    按行号读取单个数据集的数据行：CSV/JSONL首次读取时记录各行的文件位置，之后按位置直接读取；
+    YAML顺序读取时复用同一个流，乱序（如--history-order、分片）时从目标行重新打开流，之前的行只跳过不解析
+    """
+
+    def __init__(self, data_driver, source, path):
+        self.data_driver = data_driver
+        self.source = source
+        self.path = path
+        self._offsets = data_driver.row_offsets(source)
+        self._rows = None
+        self._position = -1
+
+    def get(self, index):
+        """
+        读取原始行号为index的数据行
+        :param index: iter_indexed_rows返回的行号
+        :return: 行字典
+        """
+        if self._offsets is not None:
+            if not 0 <= index < len(self._offsets):
+                raise LookupError(f"数据行不存在: {self.source or '默认数据文件'} 第 {index} 行")
+            return self.data_driver.read_row_at(self.source, self._offsets[index])
+
+        if self._rows is None or index <= self._position:
+            self._rows = self.data_driver.iter_indexed_rows(self.source, self.path, start_index=index)
+            self._position = index - 1
+        for row_index, row in self._rows:
+            self._position = row_index
+            if row_index == index:
+                return row
+        self._rows = None
+        raise LookupError(f"数据行不存在: {self.source or '默认数据文件'}:{self.path} 第 {index} 行")
+
+
+class DataRowsPlugin:
+    """
+    pytest插件：把 @pytest.mark.data_rows 标记的测试按DataDriver数据集展开为逐行的测试项。
+    收集阶段只流式读取一遍数据集生成行标识，行内容由data_row fixture在执行时按需读取；
+    每行都是独立的测试项，可单独选择（-k）、重试、报告，并参与分片和pytest-xdist分发
+    """
+
+    MARKER = 'data_rows'
+    FIXTURE = 'data_row'
+
+    def __init__(self, data_driver=None):
+        self.data_driver = data_driver or DataDriver()
+        self._cursors = {}
+
+    def pytest_generate_tests(self, metafunc):
+        """
+        为标记了data_rows的测试生成参数：
+        @pytest.mark.data_rows(path='login_test_data.valid_credentials', id_field='username', where={...}, source=None)
+        """
+        marker = metafunc.definition.get_closest_marker(self.MARKER)
+        if marker is None:
+            return
+        if self.FIXTURE not in metafunc.fixturenames:
+            raise ValueError(f"{metafunc.definition.nodeid}: 标记了data_rows的测试必须使用 {self.FIXTURE} fixture")
+
+        path = marker.kwargs.get('path') or (marker.args[0] if marker.args else None)
+        source = marker.kwargs.get('source')
+        id_field = marker.kwargs.get('id_field')
+        where = marker.kwargs.get('where')
+
+        refs = []
+        ids = []
+        seen = set()
+        for index, row in self.data_driver.iter_indexed_rows(source, path, where=where):
+            row_id = self.row_id(path, index, row, id_field)
+            if row_id in seen:
+                row_id = f"{row_id}-{index}"
+            seen.add(row_id)
+            refs.append(DataRowRef(source, path, index))
+            ids.append(row_id)
+
+        metafunc.parametrize(self.FIXTURE, refs, ids=ids, indirect=True)
+
+    @staticmethod
+    def row_id(path, index, row, id_field=None):
+        """
+        稳定的行标识：数据集名-行号，指定id_field时为数据集名-该列的值（插入新行不影响已有行的标识）
+        :return: 如 valid_credentials-0、valid_credentials-admin@example.com
+        """
+        dataset = (path or 'rows').rsplit('.', 1)[-1]
+        value = ROW_ID_PATTERN.sub('_', str(row.get(id_field) or '')).strip('_') if id_field else ''
+        return f"{dataset}-{value or index}"
+
+    def load(self, ref):
+        """读取测试项对应的数据行，每个测试项都记录对数据集的依赖（数据流只在首次读取时打开）"""
+        dependency_recorder.note('data', f"{ref.source or self.data_driver.data_file}:{ref.path or ''}")
+        key = (ref.source, ref.path)
+        if key not in self._cursors:
+            self._cursors[key] = RowCursor(self.data_driver, ref.source, ref.path)
+        return self._cursors[key].get(ref.index)
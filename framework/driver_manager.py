@@ -4,8 +4,13 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from selenium.webdriver.edge.options import Options as EdgeOptions
 from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
-from utils.logger import Logger
-import yaml
+from framework.http_driver import HttpDriver
+from framework.network_profiles import get_network_profiles
+from framework.page_load import ProfileTemplate, page_load_stats, session_strategy
+from utils.command_metrics import command_metrics
+from utils.logger import get_logger
+from config.registry import load_config
+import time
 import os
 
 
@@ -13,38 +18,109 @@ class DriverManager:
     """WebDriver管理器"""
 
     def __init__(self, config_path="config/config.yaml"):
-        self.logger = Logger()
+        self.logger = get_logger()
         self.config = self._load_config(config_path)
+        self.network_profiles = get_network_profiles()
         self.driver = None
 
     def _load_config(self, config_path):
-        """加载配置文件"""
-        with open(config_path, 'r', encoding='utf-8') as file:
-            config = yaml.safe_load(file)
-        return config
+        """加载配置文件（注册表缓存，进程内只解析一次）"""
+        return load_config(config_path)
 
     def create_driver(self):
         """创建WebDriver实例"""
-        browser_name = self.config['browser']['name'].lower()
+        self.driver = self.build_driver()
+        return self.driver
 
+    def build_driver(self, browser_name=None):
+        """
+        创建并配置一个新的WebDriver实例（不绑定到self.driver，供会话池使用）
+        :param browser_name: 浏览器名称，默认取配置中的browser.name；http为不执行JavaScript的无浏览器驱动
+        :return: WebDriver对象
+        """
+        browser_name = (browser_name or self.config['browser']['name']).lower()
+        metrics_enabled = (self.config.get('metrics') or {}).get('enabled', True)
+
+        if browser_name == HttpDriver.name:
+            driver = HttpDriver(self.config['browser']['page_load_timeout'], record_metrics=metrics_enabled)
+            self.logger.info("WebDriver创建成功: %s", browser_name)
+            return driver
+
+        started = time.perf_counter()
         if browser_name == 'chrome':
-            self.driver = self._create_chrome_driver()
+            driver = self._create_chrome_driver()
         elif browser_name == 'firefox':
-            self.driver = self._create_firefox_driver()
+            driver = self._create_firefox_driver()
         elif browser_name == 'edge':
-            self.driver = self._create_edge_driver()
+            driver = self._create_edge_driver()
         else:
             raise ValueError(f"不支持的浏览器: {browser_name}")
-
-        self._configure_driver()
-        self.logger.info(f"WebDriver创建成功: {browser_name}")
-        return self.driver
-
-    def _create_chrome_driver(self):
-        """创建Chrome驱动"""
+        page_load_stats.record_startup(browser_name, time.perf_counter() - started,
+                                       self._profile_template(browser_name) is not None)
+
+        if metrics_enabled:
+            command_metrics.instrument(driver)
+
+        self._configure_driver(driver)
+        self.network_profiles.apply(driver)
+        self.logger.info("WebDriver创建成功: %s", browser_name)
+        return driver
+
+    def page_load_strategy(self):
+        """
+        会话的页面加载策略：normal等待全部子资源，eager在DOMContentLoaded后返回，none在导航开始后立即返回。
+        取套件默认与各关键字策略中最宽松的一个，更严格的关键字在BasePage.open中显式等待
+        """
+        return session_strategy()
+
+    def _profile_template(self, browser_name):
+        """Chromium内核且启用配置模板时返回该浏览器的模板"""
+        template_config = self.config['browser'].get('profile_template') or {}
+        if browser_name not in ('chrome', 'edge') or not template_config.get('enabled', False):
+            return None
+        return ProfileTemplate(os.path.join(template_config.get('path', "reports/.cache/browser_profile"), browser_name),
+                               template_config.get('max_age_days', 7))
+
+    def _configure_chromium(self, options, browser_name, options_class, driver_class):
+        """Chromium内核通用的启动参数，启用配置模板时使用模板的副本作为用户数据目录"""
+        startup_flags = self.config['browser'].get('startup_flags') or []
+        for flag in startup_flags:
+            options.add_argument(flag)
+
+        template = self._profile_template(browser_name)
+        if template:
+            def build(path):
+                template_options = options_class()
+                template_options.add_argument('--headless=new')
+                for flag in startup_flags:
+                    template_options.add_argument(flag)
+                template_options.add_argument(f'--user-data-dir={os.path.abspath(path)}')
+                driver_class(options=template_options).quit()
+
+            options.add_argument(f'--user-data-dir={template.clone(build)}')
+
+    def build_options(self, browser_name, headless=None):
+        """
+        生成浏览器启动选项（页面加载策略、启动参数、配置模板、网络配置）
+        :param browser_name: chrome / firefox / edge
+        :param headless: 是否无头，默认取配置中的browser.headless
+        :return: 浏览器Options对象
+        """
+        headless = self.config['browser']['headless'] if headless is None else headless
+        if browser_name == 'chrome':
+            return self._chrome_options(headless)
+        if browser_name == 'firefox':
+            return self._firefox_options(headless)
+        if browser_name == 'edge':
+            return self._edge_options(headless)
+        raise ValueError(f"不支持的浏览器: {browser_name}")
+
+    def _chrome_options(self, headless):
+        """Chrome启动选项"""
         options = Options()
+        options.page_load_strategy = self.page_load_strategy()
 
-        if self.config['browser']['headless']:
+        if headless:
             options.add_argument('--headless')
 
         if self.config['browser']['maximize']:
@@ -59,22 +135,27 @@ class DriverManager:
         # options.add_experimental_option('useAutomationExtension', False)
         # options.add_experimental_option("excludeSwitches", ["enable-automation"])
 
-        return webdriver.Chrome(options=options)
+        self._configure_chromium(options, 'chrome', Options, webdriver.Chrome)
+        self.network_profiles.configure_options(options, 'chrome')
+        return options
 
-    def _create_firefox_driver(self):
-        """创建Firefox驱动"""
+    def _firefox_options(self, headless):
+        """Firefox启动选项"""
         options = FirefoxOptions()
+        options.page_load_strategy = self.page_load_strategy()
 
-        if self.config['browser']['headless']:
+        if headless:
             options.add_argument('--headless')
 
-        return webdriver.Firefox(options=options)
+        self.network_profiles.configure_options(options, 'firefox')
+        return options
 
-    def _create_edge_driver(self):
-        """创建Edge驱动"""
+    def _edge_options(self, headless):
+        """Edge启动选项"""
         options = EdgeOptions()
+        options.page_load_strategy = self.page_load_strategy()
 
-        if self.config['browser']['headless']:
+        if headless:
             options.add_argument('--headless')
 
         if self.config['browser']['maximize']:
@@ -82,19 +163,37 @@ class DriverManager:
 
         options.add_argument('--window-size=1920,1080')
 
-        return webdriver.Edge(options=options)
+        self._configure_chromium(options, 'edge', EdgeOptions, webdriver.Edge)
+        self.network_profiles.configure_options(options, 'edge')
+        return options
+
+    def _create_chrome_driver(self):
+        """创建Chrome驱动"""
+        return webdriver.Chrome(options=self.build_options('chrome'))
+
+    def _create_firefox_driver(self):
+        """创建Firefox驱动"""
+        return webdriver.Firefox(options=self.build_options('firefox'))
+
+    def _create_edge_driver(self):
+        """创建Edge驱动"""
+        return webdriver.Edge(options=self.build_options('edge'))
 
-    def _configure_driver(self):
+    def _configure_driver(self, driver):
         """配置驱动参数"""
-        # 设置隐式等待
+        # 隐式等待会叠加到每次显式等待的探测上，全部等待由等待引擎负责，固定为0
         implicit_wait = self.config['browser']['implicit_wait']
-        self.driver.implicitly_wait(implicit_wait)
+        if implicit_wait:
+            self.logger.warning("browser.implicit_wait=%ss 已忽略，隐式等待固定为0，等待时间由wait_engine配置决定",
+                                implicit_wait)
+        driver.implicitly_wait(0)
 
         # 设置页面加载超时
         page_load_timeout = self.config['browser']['page_load_timeout']
-        self.driver.set_page_load_timeout(page_load_timeout)
+        driver.set_page_load_timeout(page_load_timeout)
 
-        self.logger.info(f"Driver配置完成 - 隐式等待: {implicit_wait}s, 页面加载超时: {page_load_timeout}s")
+        self.logger.info("Driver配置完成 - 页面加载超时: %ss, 页面加载策略: %s",
+                         page_load_timeout, self.page_load_strategy())
 
     def quit_driver(self):
         """退出驱动"""
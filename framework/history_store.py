@@ -0,0 +1,144 @@
+# framework/history_store.py
+from utils.logger import get_logger
+from config.registry import load_config
+from collections import namedtuple
+from contextlib import contextmanager
+import sqlite3
+import time
+import os
+
+
+# 单个测试的历史统计：最近一次是否失败、失败概率（近期加权）、结果翻转率、平均耗时、历史运行次数
+HistoryStats = namedtuple('HistoryStats', ['last_failed', 'failure_probability', 'flakiness', 'duration', 'runs'])
+
+
+class HistoryStore:
+    """
+    本地测试历史库（SQLite）：按pytest节点ID记录每次运行的结果和耗时，
+    用于估算失败概率和不稳定程度，并据此把最可能失败的测试排在前面
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS results (
+        nodeid TEXT NOT NULL,
+        run_at REAL NOT NULL,
+        outcome TEXT NOT NULL,
+        duration REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS results_nodeid ON results (nodeid, run_at);
+    """
+
+    def __init__(self, config_path="config/config.yaml"):
+        self.logger = get_logger()
+        config = load_config(config_path)
+        history_config = config.get('history') or {}
+
+        self.enabled = history_config.get('enabled', True)
+        self.path = history_config.get('path', "reports/.cache/history.sqlite3")
+        self.window = history_config.get('window', 20)
+        self.decay = history_config.get('decay', 0.7)
+        self.new_test_probability = history_config.get('new_test_probability', 0.3)
+        self.ttl_seconds = history_config.get('ttl_days', 30) * 24 * 3600
+        self.max_failures = history_config.get('max_failures', 0)
+        self.default_duration = (config.get('sharding') or {}).get('default_duration', 5.0)
+        # 本次运行中各测试的阶段结果 {节点ID: [是否失败, 是否跳过, 累计耗时]}
+        self._current = {}
+        self._pending = []
+
+    def record(self, report):
+        """
+        记录一个测试阶段（setup/call/teardown）的报告，teardown到达时汇总为该测试本次的结果；
+        跳过的测试不计入历史
+        :param report: pytest TestReport
+        """
+        if not self.enabled:
+            return
+        state = self._current.setdefault(report.nodeid, [False, False, 0.0])
+        state[0] = state[0] or report.failed
+        state[1] = state[1] or report.skipped
+        state[2] += report.duration
+        if report.when != 'teardown':
+            return
+
+        failed, skipped, duration = self._current.pop(report.nodeid)
+        if failed or not skipped:
+            self._pending.append((report.nodeid, time.time(), 'failed' if failed else 'passed', round(duration, 3)))
+
+    def flush(self):
+        """将本次运行的结果写入历史库，并清理过期记录"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        try:
+            with self._connect() as connection:
+                connection.executemany("INSERT INTO results VALUES (?, ?, ?, ?)", pending)
+                connection.execute("DELETE FROM results WHERE run_at < ?", (time.time() - self.ttl_seconds,))
+        except sqlite3.Error as e:
+            self.logger.warning("测试历史库写入失败: %s", str(e))
+
+    def stats(self, nodeids=None):
+        """
+        读取各测试最近window次运行的统计
+        :param nodeids: 只统计这些测试，默认为全部
+        :return: {节点ID: HistoryStats}
+        """
+        if not os.path.exists(self.path):
+            return {}
+        wanted = set(nodeids) if nodeids is not None else None
+        outcomes = {}
+        try:
+            with self._connect() as connection:
+                rows = connection.execute(
+                    "SELECT nodeid, outcome, duration FROM results ORDER BY nodeid, run_at DESC")
+                for nodeid, outcome, duration in rows:
+                    if wanted is not None and nodeid not in wanted:
+                        continue
+                    recent = outcomes.setdefault(nodeid, [])
+                    if len(recent) < self.window:
+                        recent.append((outcome == 'failed', duration))
+        except sqlite3.Error as e:
+            self.logger.warning("测试历史库读取失败: %s", str(e))
+            return {}
+        return {nodeid: self._summarize(recent) for nodeid, recent in outcomes.items()}
+
+    def _summarize(self, recent):
+        """由最近的结果（新到旧）计算统计：失败概率按衰减系数加权，越近的结果权重越大"""
+        weights = [self.decay ** index for index in range(len(recent))]
+        failure_probability = sum(weight for weight, (failed, _) in zip(weights, recent) if failed) / sum(weights)
+        flips = sum(1 for newer, older in zip(recent, recent[1:]) if newer[0] != older[0])
+        flakiness = flips / (len(recent) - 1) if len(recent) > 1 else 0.0
+        duration = sum(duration for _, duration in recent) / len(recent)
+        return HistoryStats(recent[0][0], round(failure_probability, 3), round(flakiness, 3), round(duration, 3),
+                         len(recent))
+
+    def prioritize(self, nodeids):
+        """
+        失败优先排序：最近一次失败的测试最先（耗时短的在前），
+        其余按 失败概率/预估耗时 降序，即单位时间内最可能发现失败的测试在前；无历史的新测试使用new_test_probability
+        :param nodeids: 收集到的测试节点ID（顺序作为同分时的次序）
+        :return: (排序后的节点ID列表, {节点ID: HistoryStats})
+        """
+        stats = self.stats(nodeids)
+        position = {nodeid: index for index, nodeid in enumerate(nodeids)}
+
+        def priority(nodeid):
+            entry = stats.get(nodeid)
+            if entry is None:
+                return (1, -self.new_test_probability / self.default_duration, position[nodeid])
+            if entry.last_failed:
+                return (0, entry.duration, position[nodeid])
+            return (1, -entry.failure_probability / max(entry.duration, 0.1), position[nodeid])
+
+        return sorted(nodeids, key=priority), stats
+
+    @contextmanager
+    def _connect(self):
+        """打开历史库（不存在时创建），正常退出时提交；多个pytest-xdist worker并发写入时由SQLite加锁"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=10)
+        try:
+            connection.executescript(self.SCHEMA)
+            with connection:
+                yield connection
+        finally:
+            connection.close()
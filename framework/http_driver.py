@@ -0,0 +1,1000 @@
+# framework/http_driver.py
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.common.exceptions import (
+    WebDriverException, NoSuchElementException, InvalidSelectorException, StaleElementReferenceException
+)
+from urllib.parse import urljoin, urlsplit, urlencode
+from html.parser import HTMLParser
+from http.cookiejar import CookieJar, Cookie
+from utils.command_metrics import command_metrics
+from utils.logger import get_logger
+import urllib.request
+import urllib.error
+import uuid
+import time
+import re
+
+
+# 无结束标签的元素
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr'
+])
+
+# 始终不可见的元素
+HIDDEN_ELEMENTS = frozenset(['head', 'script', 'style', 'template', 'title', 'meta', 'link', 'noscript'])
+
+# 取可见文本时不补空格的行内元素
+INLINE_ELEMENTS = frozenset(['a', 'abbr', 'b', 'code', 'em', 'i', 'label', 'small', 'span', 'strong', 'sub', 'sup'])
+
+# 遇到这些开始标签时隐式关闭同名的未闭合元素
+IMPLICIT_CLOSE = frozenset(['p', 'li', 'option', 'tr', 'td', 'th', 'dt', 'dd'])
+
+# send_keys中的回车键（Keys.RETURN / Keys.ENTER）会提交所在表单
+SUBMIT_KEYS = ('\ue006', '\ue007', '\n')
+
+# WebDriver特殊按键码位区间，输入时忽略
+SPECIAL_KEY_PATTERN = re.compile('[\ue000-\ue0ff]')
+
+
+class Node:
+    """HTML元素节点，文本子节点以字符串保存在children中"""
+
+    __slots__ = ('tag', 'attrs', 'children', 'parent', 'value', 'checked', 'selected')
+
+    def __init__(self, tag, attrs=None, parent=None):
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.children = []
+        self.parent = parent
+        # 表单控件的当前状态，与HTML属性（初始值）分开保存
+        self.value = None
+        self.checked = 'checked' in self.attrs
+        self.selected = 'selected' in self.attrs
+
+    def elements(self):
+        """子元素节点"""
+        return [child for child in self.children if isinstance(child, Node)]
+
+    def iter_descendants(self):
+        """按文档顺序遍历全部后代元素"""
+        stack = list(reversed(self.elements()))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.elements()))
+
+    def ancestors(self):
+        """由近及远遍历祖先元素"""
+        node = self.parent
+        while node is not None:
+            yield node
+            node = node.parent
+
+    def text_content(self):
+        """全部后代文本"""
+        parts = []
+        for child in self.children:
+            parts.append(child.text_content() if isinstance(child, Node) else child)
+        return ''.join(parts)
+
+    def own_texts(self):
+        """直接子文本节点"""
+        return [child for child in self.children if not isinstance(child, Node)]
+
+    def classes(self):
+        """class属性拆分后的列表"""
+        return (self.attrs.get('class') or '').split()
+
+    def closest(self, tag):
+        """最近的指定标签祖先元素"""
+        for node in self.ancestors():
+            if node.tag == tag:
+                return node
+        return None
+
+    def is_rendered(self):
+        """按标签、hidden属性和内联样式判断自身是否会被渲染（外部样式表不解析）"""
+        if self.tag in HIDDEN_ELEMENTS or 'hidden' in self.attrs:
+            return False
+        if self.tag == 'input' and (self.attrs.get('type') or '').lower() == 'hidden':
+            return False
+        style = (self.attrs.get('style') or '').replace(' ', '').lower()
+        return 'display:none' not in style and 'visibility:hidden' not in style
+
+
+class DocumentParser(HTMLParser):
+    """将HTML解析为Node树，容忍未闭合的标签"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node('#document')
+        self._current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        if tag in IMPLICIT_CLOSE and self._current.tag == tag:
+            self._current = self._current.parent
+        node = Node(tag, {name: ('' if value is None else value) for name, value in attrs}, self._current)
+        self._current.children.append(node)
+        if tag not in VOID_ELEMENTS:
+            self._current = node
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self._current = self._current.parent
+
+    def handle_endtag(self, tag):
+        # 向上查找匹配的开始标签，找不到时忽略多余的结束标签
+        node = self._current
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        if node is not self.root:
+            self._current = node.parent
+
+    def handle_data(self, data):
+        self._current.children.append(data)
+
+
+def parse_html(source):
+    """
+    解析HTML
+    :param source: HTML文本
+    :return: 文档根节点
+    """
+    parser = DocumentParser()
+    parser.feed(source)
+    parser.close()
+    for node in parser.root.iter_descendants():
+        if node.tag == 'textarea':
+            node.value = node.text_content()
+    return parser.root
+
+
+# ---------------------------------------------------------------- CSS选择器
+
+CSS_TOKEN_PATTERN = re.compile(r"""
+    (?P<combinator>\s*[>+~]\s*|\s+)
+  | (?P<tag>\*|[a-zA-Z][\w-]*)
+  | \#(?P<id>[\w-]+)
+  | \.(?P<class>[\w-]+)
+  | \[\s*(?P<attr>[\w-]+)\s*(?:(?P<op>[~^$*|]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[\w-]+))\s*)?\]
+  | :(?P<pseudo>first-child|last-child|checked|disabled|enabled)
+""", re.VERBOSE)
+
+
+def _compile_css(selector):
+    """
+    将CSS选择器编译为 [[(组合符, 简单选择器列表), ...], ...]（逗号分隔的每组一项）
+    支持标签、#id、.class、属性选择器、后代/子元素/相邻兄弟组合符及少量伪类
+    """
+    groups = []
+    for group in selector.split(','):
+        group = group.strip()
+        if not group:
+            raise InvalidSelectorException(f"无效的CSS选择器: {selector}")
+        steps = []
+        combinator = None
+        simple = []
+        position = 0
+        while position < len(group):
+            match = CSS_TOKEN_PATTERN.match(group, position)
+            if not match:
+                raise InvalidSelectorException(f"不支持的CSS选择器: {selector}")
+            position = match.end()
+            if match.group('combinator') is not None:
+                if not simple:
+                    raise InvalidSelectorException(f"无效的CSS选择器: {selector}")
+                steps.append((combinator, simple))
+                combinator, simple = match.group('combinator').strip() or ' ', []
+            elif match.group('tag'):
+                simple.append(('tag', match.group('tag').lower()))
+            elif match.group('id'):
+                simple.append(('id', match.group('id')))
+            elif match.group('class'):
+                simple.append(('class', match.group('class')))
+            elif match.group('attr'):
+                value = next((match.group(name) for name in ('dq', 'sq', 'bare') if match.group(name) is not None), None)
+                simple.append(('attr', (match.group('attr').lower(), match.group('op'), value)))
+            else:
+                simple.append(('pseudo', match.group('pseudo')))
+        if not simple:
+            raise InvalidSelectorException(f"无效的CSS选择器: {selector}")
+        steps.append((combinator, simple))
+        groups.append(steps)
+    return groups
+
+
+def _match_attribute(node, name, op, expected):
+    """属性选择器匹配"""
+    if name not in node.attrs:
+        return False
+    actual = node.attrs[name]
+    if op is None:
+        return True
+    if op == '=':
+        return actual == expected
+    if op == '~=':
+        return expected in actual.split()
+    if op == '^=':
+        return bool(expected) and actual.startswith(expected)
+    if op == '$=':
+        return bool(expected) and actual.endswith(expected)
+    if op == '*=':
+        return bool(expected) and expected in actual
+    return actual == expected or actual.startswith(expected + '-')
+
+
+def _match_simple(node, simple):
+    """节点是否满足全部简单选择器"""
+    for kind, value in simple:
+        if kind == 'tag':
+            if value != '*' and node.tag != value:
+                return False
+        elif kind == 'id':
+            if node.attrs.get('id') != value:
+                return False
+        elif kind == 'class':
+            if value not in node.classes():
+                return False
+        elif kind == 'attr':
+            if not _match_attribute(node, *value):
+                return False
+        elif value == 'first-child':
+            if node.parent is None or node.parent.elements()[0] is not node:
+                return False
+        elif value == 'last-child':
+            if node.parent is None or node.parent.elements()[-1] is not node:
+                return False
+        elif value == 'checked':
+            if not (node.checked or node.selected):
+                return False
+        elif (value == 'disabled') != ('disabled' in node.attrs):
+            return False
+    return True
+
+
+def _match_steps(node, steps, index):
+    """从右向左匹配组合符链"""
+    combinator, simple = steps[index]
+    if not _match_simple(node, simple):
+        return False
+    if index == 0:
+        return True
+
+    if combinator == '>':
+        parent = node.parent
+        return parent is not None and _match_steps(parent, steps, index - 1)
+    if combinator in ('+', '~'):
+        siblings = node.parent.elements() if node.parent is not None else []
+        previous = siblings[:siblings.index(node)]
+        if combinator == '+':
+            previous = previous[-1:]
+        return any(_match_steps(sibling, steps, index - 1) for sibling in previous)
+    return any(_match_steps(ancestor, steps, index - 1) for ancestor in node.ancestors())
+
+
+def select_css(scope, selector):
+    """
+    在scope的后代中按CSS选择器查找（与querySelectorAll相同，选择器在整个文档上匹配）
+    :return: 按文档顺序排列的节点列表
+    """
+    groups = _compile_css(selector)
+    return [node for node in scope.iter_descendants()
+            if any(_match_steps(node, steps, len(steps) - 1) for steps in groups)]
+
+
+# ---------------------------------------------------------------- XPath子集
+
+XPATH_TOKEN_PATTERN = re.compile(r"""\s*(
+    //|/|\.\.|\.|\[|\]|\(|\)|,|!=|<=|>=|=|<|>|@|\*|\|
+  | "[^"]*"|'[^']*'
+  | \d+(?:\.\d+)?
+  | [A-Za-z_][\w-]*(?:::)?
+)""", re.VERBOSE)
+
+
+class XPathParser:
+    """
+    XPath 1.0子集：child/descendant路径、谓词中的属性、text()、位置下标、
+    and/or/not、比较运算以及contains/starts-with/normalize-space/string-length函数
+    """
+
+    FUNCTIONS = ('contains', 'starts-with', 'normalize-space', 'not', 'text', 'string', 'string-length',
+                 'position', 'last', 'translate')
+
+    def __init__(self, expression):
+        self.expression = expression
+        self.tokens = []
+        position = 0
+        expression = expression.strip()
+        while position < len(expression):
+            match = XPATH_TOKEN_PATTERN.match(expression, position)
+            if not match or match.end() == position:
+                raise InvalidSelectorException(f"不支持的XPath: {self.expression}")
+            self.tokens.append(match.group(1))
+            position = match.end()
+        self.index = 0
+
+    def peek(self, offset=0):
+        position = self.index + offset
+        return self.tokens[position] if position < len(self.tokens) else None
+
+    def take(self, expected=None):
+        token = self.peek()
+        if token is None or (expected is not None and token != expected):
+            raise InvalidSelectorException(f"不支持的XPath: {self.expression}")
+        self.index += 1
+        return token
+
+    def parse(self):
+        """解析为 [路径, ...]（'|' 分隔的并集）"""
+        paths = [self.parse_path()]
+        while self.peek() == '|':
+            self.take()
+            paths.append(self.parse_path())
+        if self.peek() is not None:
+            raise InvalidSelectorException(f"不支持的XPath: {self.expression}")
+        return paths
+
+    def parse_path(self):
+        """路径: (是否从文档根开始, [(轴, 名称, [谓词])])"""
+        absolute = self.peek() in ('/', '//')
+        steps = []
+        axis = 'child'
+        if self.peek() == '//':
+            self.take()
+            axis = 'descendant'
+        elif self.peek() == '/':
+            self.take()
+        while True:
+            token = self.take()
+            if token == '.':
+                steps.append(('self', '*', []))
+            elif token == '..':
+                steps.append(('parent', '*', []))
+            else:
+                if token.endswith('::'):
+                    raise InvalidSelectorException(f"不支持的XPath轴: {self.expression}")
+                if token != '*' and not re.match(r'[A-Za-z_]', token):
+                    raise InvalidSelectorException(f"不支持的XPath: {self.expression}")
+                predicates = []
+                while self.peek() == '[':
+                    self.take()
+                    predicates.append(self.parse_or())
+                    self.take(']')
+                steps.append((axis, token.lower(), predicates))
+            if self.peek() == '//':
+                self.take()
+                axis = 'descendant'
+            elif self.peek() == '/':
+                self.take()
+                axis = 'child'
+            else:
+                return absolute, steps
+
+    def parse_or(self):
+        left = self.parse_and()
+        while self.peek() == 'or':
+            self.take()
+            left = ('or', left, self.parse_and())
+        return left
+
+    def parse_and(self):
+        left = self.parse_comparison()
+        while self.peek() == 'and':
+            self.take()
+            left = ('and', left, self.parse_comparison())
+        return left
+
+    def parse_comparison(self):
+        left = self.parse_primary()
+        while self.peek() in ('=', '!=', '<', '>', '<=', '>='):
+            operator = self.take()
+            left = ('compare', operator, left, self.parse_primary())
+        return left
+
+    def parse_primary(self):
+        token = self.take()
+        if token == '(':
+            expression = self.parse_or()
+            self.take(')')
+            return expression
+        if token == '@':
+            return ('attr', self.take().lower())
+        if token[0] in ('"', "'"):
+            return ('literal', token[1:-1])
+        if token[0].isdigit():
+            return ('number', float(token))
+        if token == '.':
+            return ('self',)
+        if token in self.FUNCTIONS and self.peek() == '(':
+            self.take('(')
+            arguments = []
+            while self.peek() != ')':
+                arguments.append(self.parse_or())
+                if self.peek() == ',':
+                    self.take()
+            self.take(')')
+            return ('call', token, arguments)
+        raise InvalidSelectorException(f"不支持的XPath: {self.expression}")
+
+
+def _string_value(value):
+    """XPath值转字符串（节点集取第一个）"""
+    if isinstance(value, list):
+        return value[0] if value else ''
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else str(value)
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return value
+
+
+def _evaluate(expression, node, position, size):
+    """计算谓词表达式"""
+    kind = expression[0]
+    if kind == 'literal' or kind == 'number':
+        return expression[1]
+    if kind == 'attr':
+        return [node.attrs[expression[1]]] if expression[1] in node.attrs else []
+    if kind == 'self':
+        return [node.text_content()]
+    if kind == 'or':
+        return bool(_evaluate(expression[1], node, position, size)) or \
+            bool(_evaluate(expression[2], node, position, size))
+    if kind == 'and':
+        return bool(_evaluate(expression[1], node, position, size)) and \
+            bool(_evaluate(expression[2], node, position, size))
+    if kind == 'compare':
+        return _compare(expression[1], _evaluate(expression[2], node, position, size),
+                        _evaluate(expression[3], node, position, size))
+
+    name, arguments = expression[1], [_evaluate(argument, node, position, size) for argument in expression[2]]
+    if name == 'text':
+        return node.own_texts()
+    if name == 'position':
+        return float(position)
+    if name == 'last':
+        return float(size)
+    if name == 'not':
+        return not bool(arguments[0])
+    strings = [_string_value(argument) for argument in arguments] or [node.text_content()]
+    if name == 'contains':
+        return strings[1] in strings[0]
+    if name == 'starts-with':
+        return strings[0].startswith(strings[1])
+    if name == 'normalize-space':
+        return ' '.join(strings[0].split())
+    if name == 'string':
+        return strings[0]
+    if name == 'string-length':
+        return float(len(strings[0]))
+    if name == 'translate':
+        table = {ord(source): (strings[2][i] if i < len(strings[2]) else None)
+                 for i, source in enumerate(strings[1])}
+        return strings[0].translate(table)
+    raise InvalidSelectorException(f"不支持的XPath函数: {name}")
+
+
+def _compare(operator, left, right):
+    """XPath比较：节点集与值比较时任一节点满足即为真"""
+    lefts = left if isinstance(left, list) else [left]
+    rights = right if isinstance(right, list) else [right]
+    for a in lefts:
+        for b in rights:
+            if isinstance(a, float) or isinstance(b, float) or operator not in ('=', '!='):
+                try:
+                    a_value, b_value = float(a), float(b)
+                except (TypeError, ValueError):
+                    continue
+            else:
+                a_value, b_value = _string_value(a), _string_value(b)
+            if ((operator == '=' and a_value == b_value) or (operator == '!=' and a_value != b_value)
+                    or (operator == '<' and a_value < b_value) or (operator == '>' and a_value > b_value)
+                    or (operator == '<=' and a_value <= b_value) or (operator == '>=' and a_value >= b_value)):
+                return True
+    return False
+
+
+def _apply_step(nodes, step):
+    """对上下文节点集执行一步定位"""
+    axis, name, predicates = step
+    result = []
+    seen = set()
+    for context in nodes:
+        if axis == 'self':
+            candidates = [context]
+        elif axis == 'parent':
+            candidates = [context.parent] if context.parent is not None else []
+        elif axis == 'child':
+            candidates = context.elements()
+        else:
+            candidates = list(context.iter_descendants())
+        candidates = [node for node in candidates if name == '*' or node.tag == name]
+        for predicate in predicates:
+            size = len(candidates)
+            filtered = []
+            for position, node in enumerate(candidates, 1):
+                value = _evaluate(predicate, node, position, size)
+                if (value == position) if isinstance(value, float) else bool(value):
+                    filtered.append(node)
+            candidates = filtered
+        for node in candidates:
+            if id(node) not in seen:
+                seen.add(id(node))
+                result.append(node)
+    return result
+
+
+def select_xpath(scope, expression):
+    """
+    在scope中按XPath查找元素
+    :return: 节点列表
+    """
+    root = scope
+    while root.parent is not None:
+        root = root.parent
+    result = []
+    for absolute, steps in XPathParser(expression).parse():
+        nodes = [root if absolute else scope]
+        for step in steps:
+            nodes = _apply_step(nodes, step)
+        result.extend(node for node in nodes if node not in result)
+    return result
+
+
+# ---------------------------------------------------------------- 元素与驱动
+
+class HttpElement(WebElement):
+    """HttpDriver的元素，实现BasePage和ElementLocator用到的WebElement接口"""
+
+    def __init__(self, driver, node):
+        self._parent = driver
+        self._id = f"http-{id(node)}"
+        self.node = node
+        self._document = driver.document
+
+    def _execute(self, command, params=None):
+        raise WebDriverException(f"HttpDriver不支持该元素操作: {command}")
+
+    def _check(self):
+        """页面跳转后旧页面的元素失效"""
+        if self._document is not self._parent.document:
+            raise StaleElementReferenceException(f"元素已失效: <{self.node.tag}>")
+        return self.node
+
+    @property
+    def tag_name(self):
+        return self._check().tag
+
+    @property
+    def text(self):
+        """可见文本，空白折叠"""
+        node = self._check()
+        if not self.is_displayed():
+            return ''
+        return ' '.join(_visible_text(node).split())
+
+    def get_attribute(self, name):
+        node = self._check()
+        if name == 'value':
+            return _control_value(node)
+        if name in ('checked', 'selected'):
+            return 'true' if getattr(node, name) else None
+        return node.attrs.get(name)
+
+    def get_dom_attribute(self, name):
+        return self._check().attrs.get(name)
+
+    def get_property(self, name):
+        node = self._check()
+        if name == 'value':
+            return _control_value(node)
+        if name in ('checked', 'selected'):
+            return getattr(node, name)
+        if name == 'textContent':
+            return node.text_content()
+        return node.attrs.get(name)
+
+    def is_displayed(self):
+        node = self._check()
+        return node.is_rendered() and all(ancestor.is_rendered() for ancestor in node.ancestors()
+                                          if ancestor.parent is not None)
+
+    def is_enabled(self):
+        node = self._check()
+        if 'disabled' in node.attrs:
+            return False
+        fieldset = node.closest('fieldset')
+        return fieldset is None or 'disabled' not in fieldset.attrs
+
+    def is_selected(self):
+        node = self._check()
+        return node.checked or node.selected
+
+    def clear(self):
+        node = self._check()
+        if node.tag in ('input', 'textarea'):
+            node.value = ''
+
+    def send_keys(self, *value):
+        node = self._check()
+        text = ''.join(str(part) for part in value)
+        submit = any(key in text for key in SUBMIT_KEYS)
+        for key in SUBMIT_KEYS:
+            text = text.replace(key, '')
+        text = SPECIAL_KEY_PATTERN.sub('', text)
+        if node.tag in ('input', 'textarea'):
+            node.value = _control_value(node) + text
+        if submit:
+            self.submit()
+
+    def click(self):
+        """点击：链接跳转、提交按钮提交表单、复选框/单选框/选项切换状态，其余元素无效果"""
+        node = self._check()
+        if not self.is_displayed():
+            raise WebDriverException(f"元素不可见，无法点击: <{node.tag}>")
+        input_type = (node.attrs.get('type') or '').lower()
+
+        if node.tag == 'a' and 'href' in node.attrs:
+            self._parent.get(urljoin(self._parent.current_url, node.attrs['href']))
+        elif (node.tag == 'button' and input_type in ('', 'submit')) or \
+                (node.tag == 'input' and input_type in ('submit', 'image')):
+            form = _form_of(node)
+            if form is not None and self.is_enabled():
+                self._parent.submit_form(form, node)
+        elif node.tag == 'input' and input_type == 'checkbox':
+            node.checked = not node.checked
+        elif node.tag == 'input' and input_type == 'radio':
+            form = _form_of(node) or _document_root(node)
+            for other in form.iter_descendants():
+                if other.tag == 'input' and other.attrs.get('name') == node.attrs.get('name'):
+                    other.checked = False
+            node.checked = True
+        elif node.tag == 'option':
+            select = node.closest('select')
+            if select is not None and 'multiple' not in select.attrs:
+                for option in select.iter_descendants():
+                    option.selected = False
+            node.selected = not node.selected if select is not None and 'multiple' in select.attrs else True
+        else:
+            self._parent.logger.debug("HttpDriver点击无效果（需要JavaScript）: <%s>", node.tag)
+
+    def submit(self):
+        node = self._check()
+        form = node if node.tag == 'form' else _form_of(node)
+        if form is None:
+            raise WebDriverException("元素不在表单中，无法提交")
+        self._parent.submit_form(form)
+
+    def find_element(self, by=By.ID, value=None):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"无法找到元素: {by}={value}")
+        return elements[0]
+
+    def find_elements(self, by=By.ID, value=None):
+        return [HttpElement(self._parent, node) for node in _query(self._check(), by, value)]
+
+    def value_of_css_property(self, property_name):
+        for declaration in (self._check().attrs.get('style') or '').split(';'):
+            name, _, value = declaration.partition(':')
+            if name.strip().lower() == property_name.lower():
+                return value.strip()
+        return ''
+
+    def screenshot_as_png(self):
+        raise WebDriverException("HttpDriver不支持截图")
+
+
+def _visible_text(node):
+    """可见后代文本，块级元素前后补空格"""
+    parts = []
+    for child in node.children:
+        if not isinstance(child, Node):
+            parts.append(child)
+        elif child.is_rendered():
+            text = _visible_text(child)
+            parts.append(text if child.tag in INLINE_ELEMENTS else f" {text} ")
+    return ''.join(parts)
+
+
+def _control_value(node):
+    """表单控件当前值"""
+    if node.tag == 'select':
+        selected = [option for option in node.iter_descendants() if option.tag == 'option' and option.selected]
+        options = [option for option in node.iter_descendants() if option.tag == 'option']
+        option = (selected or options or [None])[0]
+        return _option_value(option) if option is not None else ''
+    if node.value is not None:
+        return node.value
+    if node.tag == 'input':
+        value = node.attrs.get('value')
+        if value is None and (node.attrs.get('type') or '').lower() in ('checkbox', 'radio'):
+            return 'on'
+        return value or ''
+    return node.attrs.get('value')
+
+
+def _option_value(option):
+    """option的提交值"""
+    return option.attrs['value'] if 'value' in option.attrs else ' '.join(option.text_content().split())
+
+
+def _form_of(node):
+    """元素所属的表单（form属性或最近的form祖先）"""
+    form_id = node.attrs.get('form')
+    if form_id:
+        for candidate in _document_root(node).iter_descendants():
+            if candidate.tag == 'form' and candidate.attrs.get('id') == form_id:
+                return candidate
+    return node.closest('form')
+
+
+def _document_root(node):
+    """节点所在文档的根"""
+    while node.parent is not None:
+        node = node.parent
+    return node
+
+
+def _query(scope, by, value):
+    """按Selenium定位方式查找后代节点"""
+    if by == By.ID:
+        return [node for node in scope.iter_descendants() if node.attrs.get('id') == value]
+    if by == By.NAME:
+        return [node for node in scope.iter_descendants() if node.attrs.get('name') == value]
+    if by == By.CLASS_NAME:
+        return [node for node in scope.iter_descendants() if value in node.classes()]
+    if by == By.TAG_NAME:
+        return [node for node in scope.iter_descendants() if node.tag == value.lower()]
+    if by == By.CSS_SELECTOR:
+        return select_css(scope, value)
+    if by == By.XPATH:
+        return select_xpath(scope, value)
+    if by in (By.LINK_TEXT, By.PARTIAL_LINK_TEXT):
+        links = [node for node in scope.iter_descendants() if node.tag == 'a']
+        if by == By.LINK_TEXT:
+            return [node for node in links if ' '.join(node.text_content().split()) == value]
+        return [node for node in links if value in node.text_content()]
+    raise InvalidSelectorException(f"不支持的定位方式: {by}")
+
+
+# 页面内定位脚本的策略类型到Selenium定位方式的映射
+STRATEGY_TYPES = {
+    'id': By.ID, 'name': By.NAME, 'css': By.CSS_SELECTOR, 'xpath': By.XPATH, 'class': By.CLASS_NAME,
+    'tag': By.TAG_NAME, 'link_text': By.LINK_TEXT, 'partial_link_text': By.PARTIAL_LINK_TEXT
+}
+
+
+class HttpDriver:
+    """
+    无浏览器驱动：用HTTP客户端请求页面、用HTML解析器构建DOM，实现BasePage、ElementLocator
+    和关键字用到的WebDriver接口子集（导航、查找元素、输入、点击链接和提交表单、文本、Cookie）。
+    不执行JavaScript，适用于服务端渲染页面上的检查（表单校验信息、欢迎文字等）
+    """
+
+    name = 'http'
+    supports_javascript = False
+
+    def __init__(self, timeout=30, user_agent="Athena-HttpDriver/1.0", record_metrics=True):
+        """
+        :param timeout: 请求超时（秒）
+        :param user_agent: User-Agent请求头
+        :param record_metrics: 是否将每个HTTP请求记入WebDriver命令级指标
+        """
+        self.logger = get_logger()
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.record_metrics = record_metrics
+        self.session_id = uuid.uuid4().hex
+        self.cookie_jar = CookieJar()
+        self._opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookie_jar))
+        self.current_url = 'about:blank'
+        self.page_source = '<html><head></head><body></body></html>'
+        self.status_code = None
+        self.document = parse_html(self.page_source)
+        self._history = []
+        self._forward = []
+
+    # ------------------------------------------------------------ 导航
+
+    def get(self, url):
+        """打开页面"""
+        self._navigate('GET', url)
+
+    def back(self):
+        """后退"""
+        if self._history:
+            self._forward.append(self.current_url)
+            self._load('GET', self._history.pop())
+
+    def forward(self):
+        """前进"""
+        if self._forward:
+            self._history.append(self.current_url)
+            self._load('GET', self._forward.pop())
+
+    def refresh(self):
+        """刷新"""
+        if self.current_url.startswith('http'):
+            self._load('GET', self.current_url)
+
+    @property
+    def title(self):
+        titles = [node for node in self.document.iter_descendants() if node.tag == 'title']
+        return ' '.join(titles[0].text_content().split()) if titles else ''
+
+    def submit_form(self, form, submitter=None):
+        """
+        按HTML规则序列化并提交表单
+        :param form: form节点
+        :param submitter: 触发提交的按钮节点，有name时一并提交
+        """
+        fields = []
+        for node in form.iter_descendants():
+            name = node.attrs.get('name')
+            if not name or 'disabled' in node.attrs:
+                continue
+            input_type = (node.attrs.get('type') or '').lower()
+            if node.tag == 'input':
+                if input_type in ('checkbox', 'radio'):
+                    if node.checked:
+                        fields.append((name, _control_value(node)))
+                elif input_type in ('submit', 'image', 'button', 'reset'):
+                    if node is submitter:
+                        fields.append((name, node.attrs.get('value', '')))
+                elif input_type != 'file':
+                    fields.append((name, _control_value(node)))
+            elif node.tag == 'textarea':
+                fields.append((name, _control_value(node)))
+            elif node.tag == 'select':
+                options = [option for option in node.iter_descendants() if option.tag == 'option']
+                selected = [option for option in options if option.selected]
+                if not selected and options and 'multiple' not in node.attrs:
+                    selected = options[:1]
+                fields.extend((name, _option_value(option)) for option in selected)
+            elif node.tag == 'button' and node is submitter:
+                fields.append((name, node.attrs.get('value', '')))
+
+        action = urljoin(self.current_url, (submitter.attrs.get('formaction') if submitter is not None else None)
+                         or form.attrs.get('action') or self.current_url)
+        method = ((submitter.attrs.get('formmethod') if submitter is not None else None)
+                  or form.attrs.get('method') or 'get').upper()
+        body = urlencode(fields)
+        if method == 'POST':
+            self._navigate('POST', action, body.encode('utf-8'))
+        else:
+            self._navigate('GET', urlsplit(action)._replace(query=body, fragment='').geturl())
+
+    def _navigate(self, method, url, data=None):
+        """导航并记录历史"""
+        if self.current_url.startswith('http'):
+            self._history.append(self.current_url)
+        self._forward = []
+        self._load(method, url, data)
+
+    def _load(self, method, url, data=None):
+        """发送请求并解析响应为当前页面，重定向由urllib处理（303转为GET）"""
+        url = urljoin(self.current_url, url) if self.current_url.startswith('http') else url
+        request = urllib.request.Request(url, data=data, method=method, headers={'User-Agent': self.user_agent})
+        if data is not None:
+            request.add_header('Content-Type', 'application/x-www-form-urlencoded')
+
+        started = time.perf_counter()
+        try:
+            response = self._opener.open(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            # 浏览器同样会渲染4xx/5xx的响应页面
+            response = e
+        except urllib.error.URLError as e:
+            raise WebDriverException(f"页面请求失败: {url} ({e.reason})")
+        try:
+            content = response.read()
+            charset = response.headers.get_content_charset() or 'utf-8'
+            self.status_code = response.status if hasattr(response, 'status') else response.code
+            self.current_url = response.geturl()
+        finally:
+            response.close()
+            if self.record_metrics:
+                command_metrics.record(f"http:{method}", time.perf_counter() - started)
+
+        self.page_source = content.decode(charset, errors='replace')
+        self.document = parse_html(self.page_source)
+        self.logger.debug("HttpDriver %s %s -> %s", method, url, self.status_code)
+
+    # ------------------------------------------------------------ 查找元素
+
+    def find_element(self, by=By.ID, value=None):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"无法找到元素: {by}={value}")
+        return elements[0]
+
+    def find_elements(self, by=By.ID, value=None):
+        return [HttpElement(self, node) for node in _query(self.document, by, value)]
+
+    def locate(self, strategies, require_visible=False):
+        """
+        与页面内定位脚本LOCATE_SCRIPT的locate函数语义相同：按顺序尝试全部策略
+        :param strategies: [[type, value], ...]
+        :param require_visible: 是否要求元素可见
+        :return: [策略序号, 元素] 或 None
+        """
+        for index, (locator_type, value) in enumerate(strategies):
+            try:
+                elements = self.find_elements(STRATEGY_TYPES[locator_type], value)
+            except (KeyError, InvalidSelectorException):
+                continue
+            for element in elements:
+                if not require_visible or element.is_displayed():
+                    return [index, element]
+        return None
+
+    def execute_script(self, script, *args):
+        raise WebDriverException("HttpDriver不执行JavaScript")
+
+    execute_async_script = execute_script
+
+    # ------------------------------------------------------------ Cookie
+
+    def get_cookies(self):
+        """当前Cookie（与WebDriver返回格式一致）"""
+        cookies = []
+        for cookie in self.cookie_jar:
+            entry = {'name': cookie.name, 'value': cookie.value, 'domain': cookie.domain, 'path': cookie.path,
+                     'secure': cookie.secure, 'httpOnly': cookie.has_nonstandard_attr('HttpOnly')}
+            if cookie.expires:
+                entry['expiry'] = cookie.expires
+            cookies.append(entry)
+        return cookies
+
+    def get_cookie(self, name):
+        return next((cookie for cookie in self.get_cookies() if cookie['name'] == name), None)
+
+    def add_cookie(self, cookie_dict):
+        """写入Cookie，未指定domain时使用当前页面域名"""
+        domain = cookie_dict.get('domain') or urlsplit(self.current_url).hostname
+        if not domain:
+            raise WebDriverException("添加Cookie前需先打开页面")
+        self.cookie_jar.set_cookie(Cookie(
+            0, cookie_dict['name'], cookie_dict['value'], None, False, domain, bool(cookie_dict.get('domain')),
+            domain.startswith('.'), cookie_dict.get('path', '/'), True, bool(cookie_dict.get('secure')),
+            cookie_dict.get('expiry'), False, None, None,
+            {'HttpOnly': None} if cookie_dict.get('httpOnly') else {}
+        ))
+
+    def delete_cookie(self, name):
+        for cookie in [cookie for cookie in self.cookie_jar if cookie.name == name]:
+            self.cookie_jar.clear(cookie.domain, cookie.path, cookie.name)
+
+    def delete_all_cookies(self):
+        self.cookie_jar.clear()
+
+    # ------------------------------------------------------------ 会话
+
+    @property
+    def window_handles(self):
+        return [self.session_id]
+
+    @property
+    def current_window_handle(self):
+        return self.session_id
+
+    def implicitly_wait(self, time_to_wait):
+        """页面在get返回时已完整解析，隐式等待无意义"""
+
+    def set_page_load_timeout(self, time_to_wait):
+        self.timeout = time_to_wait
+
+    def get_screenshot_as_png(self):
+        raise WebDriverException("HttpDriver不支持截图")
+
+    def close(self):
+        self.quit()
+
+    def quit(self):
+        """结束会话"""
+        self.cookie_jar.clear()
+        self._opener.close()
@@ -1,16 +1,34 @@
 # framework/keyword_engine.py
-from utils.logger import Logger
+from utils.logger import get_logger
 from pages.login_page import LoginPage
 from pages.dashboard_page import DashboardPage
-import time
+from utils.wait_engine import WaitEngine, WaitConditions
+from utils.command_metrics import keyword_scope
+from utils.adaptive_wait import wait_budget
+from framework.scenario_compiler import ScenarioCompiler, peek_columns
+from framework.auth_state import get_auth_state_cache
 
 
 class KeywordEngine:
     """关键字驱动引擎"""
 
+    # 关键字参数声明，场景编译时据此校验步骤数据
+    KEYWORD_ARGS = {
+        'open_login_page': {'optional': ('url',)},
+        'fill_username': {'required': ('value',)},
+        'fill_password': {'required': ('value',)},
+        'fill_form': {'required': ('fields',), 'optional': ('page', 'keystrokes')},
+        'click_login': {},
+        'login_as': {'required': ('username', 'password')},
+        'verify_login_success': {'optional': ('expected_text',)},
+        'click_logout': {},
+        'verify_dashboard_loaded': {}
+    }
+
     def __init__(self, driver):
         self.driver = driver
-        self.logger = Logger()
+        self.logger = get_logger()
+        self.wait_engine = WaitEngine(driver)
         self.login_page = LoginPage(driver)
         self.dashboard_page = DashboardPage(driver)
 
@@ -19,7 +37,9 @@ class KeywordEngine:
             'open_login_page': self.open_login_page,
             'fill_username': self.fill_username,
             'fill_password': self.fill_password,
+            'fill_form': self.fill_form,
             'click_login': self.click_login,
+            'login_as': self.login_as,
             'verify_login_success': self.verify_login_success,
             'click_logout': self.click_logout,
             'verify_dashboard_loaded': self.verify_dashboard_loaded
@@ -35,14 +55,15 @@ class KeywordEngine:
         if keyword not in self.keywords:
             raise ValueError(f"未知关键字: {keyword}")
 
-        self.logger.info(f"执行关键字: {keyword}, 数据: {data}")
+        self.logger.info("执行关键字: %s, 数据: %s", keyword, data)
 
         try:
-            result = self.keywords[keyword](data)
-            self.logger.info(f"关键字执行成功: {keyword}")
+            with keyword_scope(keyword), wait_budget(keyword):
+                result = self.keywords[keyword](data)
+            self.logger.info("关键字执行成功: %s", keyword)
             return result
         except Exception as e:
-            self.logger.error(f"关键字执行失败: {keyword}, 错误: {str(e)}")
+            self.logger.error("关键字执行失败: %s, 错误: %s", keyword, str(e))
             raise
 
     def open_login_page(self, data):
@@ -67,18 +88,47 @@ class KeywordEngine:
         self.login_page.enter_password(password)
         return True
 
+    def fill_form(self, data):
+        """
+        批量填表
+        data: {'fields': {元素key: 值}, 'page': 页面名称（默认login_page）, 'keystrokes': [需真实键入的元素key]}
+        """
+        if not data or not data.get('fields'):
+            raise ValueError("缺少表单字段")
+        pages = {'login_page': self.login_page, 'dashboard_page': self.dashboard_page}
+        page_name = data.get('page', 'login_page')
+        if page_name not in pages:
+            raise ValueError(f"未知页面: {page_name}")
+        pages[page_name].fill_form(data['fields'], keystrokes=data.get('keystrokes'))
+        return True
+
     def click_login(self, data):
         """点击登录"""
+        url_before = self.driver.current_url
         self.login_page.click_login_button()
-        time.sleep(2)  # 等待登录处理
+        # 登录处理完成：成功时页面跳转，失败时出现错误提示
+        self.wait_engine.wait_for('click_login', WaitConditions.any_of(
+            WaitConditions.url_changes(url_before),
+            WaitConditions.element_visible(self.login_page.page_elements['error_message'])
+        ), raise_on_timeout=False)
+        return True
+
+    def login_as(self, data):
+        """以指定用户进入登录状态：优先恢复缓存的登录快照，不覆盖登录流程本身的测试"""
+        if not data or 'username' not in data or 'password' not in data:
+            raise ValueError("缺少用户名或密码")
+        get_auth_state_cache().login(self.driver, data['username'], data['password'])
         return True
 
     def verify_login_success(self, data):
         """验证登录成功"""
         expected_text = data.get('expected_text', 'Welcome') if data else 'Welcome'
 
-        # 等待页面跳转
-        time.sleep(3)
+        # 等待跳转后的页面加载完成且欢迎信息可见，超时交由下方断言处理
+        self.wait_engine.wait_for('verify_login_success', WaitConditions.all_of(
+            WaitConditions.document_ready(),
+            WaitConditions.element_visible(self.dashboard_page.page_elements['welcome_message'])
+        ), raise_on_timeout=False)
 
         # 检查是否在仪表板页面
         is_dashboard_loaded = self.dashboard_page.verify_dashboard_loaded()
@@ -94,8 +144,13 @@ class KeywordEngine:
 
     def click_logout(self, data):
         """点击退出"""
+        url_before = self.driver.current_url
         self.dashboard_page.click_logout()
-        time.sleep(2)
+        # 退出完成：页面跳转或回到登录表单
+        self.wait_engine.wait_for('click_logout', WaitConditions.any_of(
+            WaitConditions.url_changes(url_before),
+            WaitConditions.element_visible(self.login_page.page_elements['username_input'])
+        ))
         return True
 
     def verify_dashboard_loaded(self, data):
@@ -105,31 +160,38 @@ class KeywordEngine:
             raise AssertionError("仪表板页面未正确加载")
         return True
 
-    def execute_test_scenario(self, scenario_data):
+    @classmethod
+    def compile_scenario(cls, scenario_data, name='scenario', columns=None):
         """
-        执行测试场景
+        编译测试场景为执行计划，未知关键字、缺少参数、无法绑定的占位符在此处直接报错
         :param scenario_data: 场景数据列表，每个元素包含action和data
+        :param name: 场景名称
+        :param columns: 数据行列名，data中可用 ${列名} 引用
+        :return: ExecutionPlan
+        """
+        return ScenarioCompiler(cls.KEYWORD_ARGS).compile(scenario_data, name=name, columns=columns)
+
+    def execute_test_scenario(self, scenario_data, row=None):
+        """
+        执行测试场景
+        :param scenario_data: 场景数据列表（每个元素包含action和data），或已编译的ExecutionPlan
+        :param row: 绑定占位符的数据行
+        """
+        plan = scenario_data if hasattr(scenario_data, 'execute') else self.compile_scenario(
+            scenario_data, columns=tuple(row or ())
+        )
+        return plan.execute(self, row)
+
+    def run_scenario_rows(self, scenario_data, rows, name='scenario'):
+        """
+        在当前会话上对多行数据执行同一场景
+        :param scenario_data: 场景数据列表或已编译的ExecutionPlan
+        :param rows: 数据行可迭代对象，如 DataDriver.iter_rows(...)
+        :param name: 场景名称
+        :return: RowResult列表
         """
-        results = []
-        for step in scenario_data:
-            action = step.get('action')
-            data = step.get('data', {})
-
-            try:
-                result = self.execute_keyword(action, data)
-                results.append({
-                    'action': action,
-                    'status': 'PASS',
-                    'result': result
-                })
-            except Exception as e:
-                results.append({
-                    'action': action,
-                    'status': 'FAIL',
-                    'error': str(e)
-                })
-                # 如果步骤失败，可以选择继续或停止
-                if not step.get('continue_on_failure', False):
-                    break
-
-        return results
\ No newline at end of file
+        if not hasattr(scenario_data, 'run'):
+            # 按第一行的列名在执行前校验占位符
+            columns, rows = peek_columns(rows)
+            scenario_data = self.compile_scenario(scenario_data, name=name, columns=columns)
+        return list(scenario_data.run(self, rows))
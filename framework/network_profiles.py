@@ -0,0 +1,250 @@
+# framework/network_profiles.py
+from utils.logger import get_logger
+from config.registry import load_config
+import threading
+import json
+import os
+
+
+# 资源类型到URL模式的映射：CDP的Network.setBlockedURLs只接受URL通配模式
+RESOURCE_TYPE_PATTERNS = {
+    'image': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico', '*.bmp'],
+    'font': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot'],
+    'media': ['*.mp4', '*.webm', '*.ogg', '*.mp3', '*.wav', '*.m4a', '*.mov'],
+    'stylesheet': ['*.css'],
+    'script': ['*.js']
+}
+
+# Firefox没有按URL屏蔽的接口，只能通过首选项按资源类型屏蔽
+FIREFOX_TYPE_PREFERENCES = {
+    'image': {'permissions.default.image': 2},
+    'font': {'browser.display.use_document_fonts': 0, 'gfx.downloadable_fonts.enabled': False},
+    'media': {'media.autoplay.default': 5, 'media.preload.default': 0}
+}
+
+# 不限速时emulateNetworkConditions的参数
+NO_THROTTLE = {'offline': False, 'latency': 0, 'downloadThroughput': -1, 'uploadThroughput': -1}
+
+# 各浏览器开启性能日志的capability名称
+LOGGING_PREFS_CAPABILITIES = {'chrome': 'goog:loggingPrefs', 'edge': 'ms:loggingPrefs'}
+
+
+class NetworkStats:
+    """运行级网络统计：各配置下的页面加载次数、被屏蔽的请求数和估算节省的流量"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profiles = {}
+
+    def record(self, profile, page_loads, blocked, estimated_bytes):
+        """
+        记录一个会话一段时间内的网络统计
+        :param profile: 网络配置名称
+        :param page_loads: 页面（文档）加载次数
+        :param blocked: {资源类型: 被屏蔽的请求数}
+        :param estimated_bytes: {资源类型: 平均大小估算}
+        """
+        with self._lock:
+            stats = self._profiles.setdefault(profile, {'page_loads': 0, 'blocked_requests': 0,
+                                                        'avoided_bytes': 0, 'resource_types': {}})
+            stats['page_loads'] += page_loads
+            for resource_type, count in blocked.items():
+                size = estimated_bytes.get(resource_type, estimated_bytes.get('other', 0))
+                stats['blocked_requests'] += count
+                stats['avoided_bytes'] += count * size
+                type_stats = stats['resource_types'].setdefault(resource_type, {'requests': 0, 'avoided_bytes': 0})
+                type_stats['requests'] += count
+                type_stats['avoided_bytes'] += count * size
+
+    def summary(self):
+        """
+        汇总网络统计
+        :return: 各配置的明细及每次页面加载平均避免的请求数和流量
+        """
+        with self._lock:
+            profiles = json.loads(json.dumps(self._profiles))
+        for stats in profiles.values():
+            page_loads = max(stats['page_loads'], 1)
+            stats['blocked_requests_per_page'] = round(stats['blocked_requests'] / page_loads, 2)
+            stats['avoided_kb_per_page'] = round(stats['avoided_bytes'] / page_loads / 1024, 1)
+        return {
+            'total_blocked_requests': sum(stats['blocked_requests'] for stats in profiles.values()),
+            'total_avoided_bytes': sum(stats['avoided_bytes'] for stats in profiles.values()),
+            'profiles': profiles
+        }
+
+    def write(self, path):
+        """写出JSON统计文件"""
+        summary = self.summary()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(summary, file, ensure_ascii=False, indent=2)
+        return summary
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._profiles = {}
+
+
+# 运行级统计实例
+network_stats = NetworkStats()
+
+
+class NetworkProfiles:
+    """
+    声明式网络配置：按测试套件屏蔽图片、字体、统计脚本等与测试无关的资源，并可模拟弱网。
+    Chromium内核通过DevTools协议在会话上随时切换，Firefox只能在启动时按资源类型屏蔽
+    """
+
+    def __init__(self, config_path="config/config.yaml"):
+        self.logger = get_logger()
+        network_config = load_config(config_path).get('network') or {}
+        self.profiles = network_config.get('profiles') or {}
+        self.default_profile = os.environ.get('ATHENA_NETWORK_PROFILE') or network_config.get('profile', 'default')
+        self.collect_stats = network_config.get('collect_stats', True)
+        self.stats_path = network_config.get('stats_path', "reports/network_stats.json")
+        self.estimated_bytes = network_config.get('estimated_bytes') or {}
+
+    def resolve(self, name=None):
+        """
+        解析网络配置，合并extends继承的配置
+        :param name: 配置名称，默认取当前套件的默认配置
+        :return: {'block_resource_types', 'block_url_patterns', 'throttle'}
+        """
+        name = name or self.default_profile
+        chain = []
+        while name:
+            if name in chain:
+                raise ValueError(f"网络配置循环继承: {' -> '.join(chain + [name])}")
+            if name not in self.profiles:
+                if name == 'default':
+                    break
+                raise ValueError(f"未知的网络配置: {name}")
+            chain.append(name)
+            name = (self.profiles[name] or {}).get('extends')
+
+        resolved = {'block_resource_types': [], 'block_url_patterns': [], 'throttle': None}
+        for profile_name in reversed(chain):
+            profile = self.profiles[profile_name] or {}
+            for key in ('block_resource_types', 'block_url_patterns'):
+                resolved[key] = resolved[key] + [value for value in profile.get(key) or [] if value not in resolved[key]]
+            if 'throttle' in profile:
+                resolved['throttle'] = profile['throttle']
+        return resolved
+
+    def blocked_patterns(self, profile):
+        """配置中的资源类型和URL模式合并为URL通配模式列表"""
+        patterns = []
+        for resource_type in profile['block_resource_types']:
+            if resource_type not in RESOURCE_TYPE_PATTERNS:
+                raise ValueError(f"不支持的资源类型: {resource_type}")
+            patterns.extend(RESOURCE_TYPE_PATTERNS[resource_type])
+        return patterns + profile['block_url_patterns']
+
+    def cdp_commands(self, profile):
+        """
+        启用网络配置所需的DevTools协议命令
+        :param profile: resolve返回的配置
+        :return: [(命令, 参数), ...]
+        """
+        throttle = profile['throttle']
+        return [
+            ('Network.enable', {}),
+            ('Network.setBlockedURLs', {'urls': self.blocked_patterns(profile)}),
+            ('Network.emulateNetworkConditions', {
+                'offline': False,
+                'latency': throttle.get('latency_ms', 0),
+                'downloadThroughput': throttle.get('download_kbps', 0) * 1024 / 8 or -1,
+                'uploadThroughput': throttle.get('upload_kbps', 0) * 1024 / 8 or -1
+            } if throttle else NO_THROTTLE)
+        ]
+
+    def configure_options(self, options, browser_name):
+        """
+        启动前配置浏览器选项：Chromium内核开启网络性能日志用于统计，Firefox写入屏蔽首选项
+        :param options: 浏览器Options对象
+        :param browser_name: 浏览器名称
+        """
+        if browser_name in LOGGING_PREFS_CAPABILITIES:
+            if self.collect_stats:
+                options.set_capability(LOGGING_PREFS_CAPABILITIES[browser_name], {'performance': 'ALL'})
+                options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+            return
+
+        if browser_name == 'firefox':
+            profile = self.resolve()
+            for resource_type in profile['block_resource_types']:
+                for key, value in (FIREFOX_TYPE_PREFERENCES.get(resource_type) or {}).items():
+                    options.set_preference(key, value)
+            ignored = [resource_type for resource_type in profile['block_resource_types']
+                       if resource_type not in FIREFOX_TYPE_PREFERENCES]
+            if profile['block_url_patterns']:
+                ignored.append('block_url_patterns')
+            if profile['throttle']:
+                ignored.append('throttle')
+            if ignored:
+                self.logger.warning("Firefox不支持以下网络配置项，已忽略: %s", ignored)
+
+    def apply(self, driver, name=None):
+        """
+        在会话上启用网络配置，与会话当前配置相同时不重复下发
+        :param driver: WebDriver对象
+        :param name: 配置名称，默认取当前套件的默认配置
+        :return: 实际生效的配置名称
+        """
+        name = name or self.default_profile
+        if getattr(driver, '_athena_network_profile', None) == name:
+            return name
+        profile = self.resolve(name)
+
+        if hasattr(driver, 'execute_cdp_cmd'):
+            for command, params in self.cdp_commands(profile):
+                driver.execute_cdp_cmd(command, params)
+        elif name != self.default_profile:
+            self.logger.warning("当前浏览器不支持在会话中切换网络配置，忽略: %s", name)
+            return getattr(driver, '_athena_network_profile', self.default_profile)
+
+        driver._athena_network_profile = name
+        self.logger.info("网络配置已启用: %s, 屏蔽 %s 个URL模式, 限速: %s",
+                         name, len(self.blocked_patterns(profile)), profile['throttle'] or '无')
+        return name
+
+    def collect(self, driver):
+        """
+        读取会话的网络性能日志，统计自上次读取以来的页面加载次数和被屏蔽的请求
+        :param driver: WebDriver对象
+        """
+        if not self.collect_stats or not hasattr(driver, 'get_log'):
+            return
+        try:
+            entries = driver.get_log('performance')
+        except Exception as e:
+            self.logger.debug("读取网络性能日志失败: %s", str(e))
+            return
+
+        page_loads = 0
+        blocked = {}
+        for entry in entries:
+            message = json.loads(entry['message'])['message']
+            params = message.get('params') or {}
+            if message['method'] == 'Network.requestWillBeSent' and params.get('type') == 'Document':
+                page_loads += 1
+            elif message['method'] == 'Network.loadingFailed' and params.get('blockedReason'):
+                resource_type = (params.get('type') or 'other').lower()
+                blocked[resource_type] = blocked.get(resource_type, 0) + 1
+
+        if page_loads or blocked:
+            network_stats.record(getattr(driver, '_athena_network_profile', self.default_profile),
+                                 page_loads, blocked, self.estimated_bytes)
+
+
+_network_profiles = None
+
+
+def get_network_profiles():
+    """获取进程内共享的网络配置"""
+    global _network_profiles
+    if _network_profiles is None:
+        _network_profiles = NetworkProfiles()
+    return _network_profiles
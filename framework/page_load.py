@@ -0,0 +1,218 @@
+# framework/page_load.py
+from utils.locator_cache import _FileLock
+from utils.logger import get_logger
+from config.registry import load_config
+import threading
+import tempfile
+import atexit
+import shutil
+import json
+import time
+import os
+
+
+# 从严格到宽松
+PAGE_LOAD_STRATEGIES = ('normal', 'eager', 'none')
+
+# none策略下driver.get在导航开始后即返回：导航前在旧页面打标记，新文档中标记不存在，据此区分新旧页面（包括导航到相同URL）
+MARK_NAVIGATION_SCRIPT = "window.__athenaNavigating = true;"
+
+# 读取当前文档的导航计时（毫秒，相对导航开始），未完成的阶段为0
+NAVIGATION_TIMING_SCRIPT = """
+var entry = window.performance && performance.getEntriesByType
+    ? performance.getEntriesByType('navigation')[0] : null;
+if (!entry) { return null; }
+return {
+    dom_interactive: entry.domInteractive,
+    dom_content_loaded: entry.domContentLoadedEventEnd,
+    load: entry.loadEventEnd
+};
+"""
+
+# 生成模板时跳过的浏览器运行时锁文件
+PROFILE_LOCK_FILES = ('Singleton*', 'lockfile', '*.lock', 'LOCK')
+
+
+def page_load_strategy_for(keyword=None, config_path="config/config.yaml"):
+    """
+    获取关键字的页面加载策略，未单独配置时取套件默认策略
+    :param keyword: 关键字名称
+    :return: normal / eager / none
+    """
+    browser_config = load_config(config_path)['browser']
+    strategy = (browser_config.get('keyword_page_load_strategies') or {}).get(keyword) \
+        or browser_config.get('page_load_strategy', 'normal')
+    if strategy not in PAGE_LOAD_STRATEGIES:
+        raise ValueError(f"无效的页面加载策略: {strategy}，可选值: {PAGE_LOAD_STRATEGIES}")
+    return strategy
+
+
+def session_strategy(config_path="config/config.yaml"):
+    """
+    会话创建时使用的页面加载策略：套件默认策略与各关键字策略中最宽松的一个。
+    driver.get是唯一的导航方式，不会多等任何关键字不需要的子资源；要求更严格的关键字在导航后显式等待
+    :return: normal / eager / none
+    """
+    browser_config = load_config(config_path)['browser']
+    strategies = [page_load_strategy_for(None, config_path)]
+    strategies += [page_load_strategy_for(keyword, config_path)
+                   for keyword in browser_config.get('keyword_page_load_strategies') or {}]
+    return max(strategies, key=PAGE_LOAD_STRATEGIES.index)
+
+
+def is_stricter(strategy, than):
+    """strategy是否比than等待更多的页面加载阶段"""
+    return PAGE_LOAD_STRATEGIES.index(strategy) < PAGE_LOAD_STRATEGIES.index(than)
+
+
+def session_page_load_strategy(driver):
+    """会话创建时的页面加载策略"""
+    capabilities = getattr(driver, 'capabilities', None) or {}
+    return capabilities.get('pageLoadStrategy', 'normal')
+
+
+class PageLoadStats:
+    """运行级启动与页面加载统计：浏览器启动耗时、各关键字的就绪耗时和导航计时"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._startups = {}
+        self._navigations = {}
+
+    def record_startup(self, browser_name, elapsed, profile_template=False):
+        """记录一次浏览器启动"""
+        with self._lock:
+            stats = self._startups.setdefault(browser_name, {
+                'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0, 'profile_template': profile_template
+            })
+            stats['count'] += 1
+            stats['total_seconds'] += elapsed
+            stats['max_seconds'] = max(stats['max_seconds'], elapsed)
+
+    def record_navigation(self, keyword, strategy, elapsed, timing=None):
+        """
+        记录一次页面加载
+        :param keyword: 关键字名称
+        :param strategy: 本次使用的页面加载策略
+        :param elapsed: 从发起导航到就绪条件满足的耗时（秒）
+        :param timing: 导航计时 {'dom_interactive', 'dom_content_loaded', 'load'}（毫秒）
+        """
+        with self._lock:
+            stats = self._navigations.setdefault(f"{keyword}[{strategy}]", {
+                'count': 0, 'ready_seconds': 0.0, 'max_ready_seconds': 0.0,
+                'timed': 0, 'dom_interactive_ms': 0.0, 'load_ms': 0.0
+            })
+            stats['count'] += 1
+            stats['ready_seconds'] += elapsed
+            stats['max_ready_seconds'] = max(stats['max_ready_seconds'], elapsed)
+            if timing and timing.get('dom_interactive'):
+                stats['timed'] += 1
+                stats['dom_interactive_ms'] += timing['dom_interactive']
+                stats['load_ms'] += timing.get('load') or 0
+
+    def summary(self):
+        """
+        汇总统计
+        :return: 各浏览器平均启动耗时，各关键字平均就绪耗时与平均可交互时间（domInteractive）
+        """
+        with self._lock:
+            startups = {
+                name: {
+                    'count': stats['count'],
+                    'avg_seconds': round(stats['total_seconds'] / stats['count'], 3),
+                    'max_seconds': round(stats['max_seconds'], 3),
+                    'profile_template': stats['profile_template']
+                }
+                for name, stats in self._startups.items()
+            }
+            navigations = {
+                name: {
+                    'count': stats['count'],
+                    'avg_ready_seconds': round(stats['ready_seconds'] / stats['count'], 3),
+                    'max_ready_seconds': round(stats['max_ready_seconds'], 3),
+                    'avg_time_to_interactive_ms': round(stats['dom_interactive_ms'] / stats['timed'], 1)
+                    if stats['timed'] else None,
+                    'avg_load_ms': round(stats['load_ms'] / stats['timed'], 1) if stats['timed'] else None
+                }
+                for name, stats in self._navigations.items()
+            }
+        return {'startup': startups, 'navigations': navigations}
+
+    def write(self, path):
+        """写出JSON统计文件"""
+        summary = self.summary()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(summary, file, ensure_ascii=False, indent=2)
+        return summary
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._startups = {}
+            self._navigations = {}
+
+
+# 运行级统计实例
+page_load_stats = PageLoadStats()
+
+
+class ProfileTemplate:
+    """
+    预先生成的浏览器用户数据目录模板：首次运行的初始化工作只做一次，
+    之后每个会话复制一份模板启动（同一用户数据目录不能被多个浏览器同时使用）
+    """
+
+    MARKER_FILE = ".athena_template"
+
+    # 本进程复制出的会话目录，退出时删除
+    _clones = []
+
+    def __init__(self, path, max_age_days=7):
+        """
+        :param path: 模板目录
+        :param max_age_days: 模板有效期（天），过期后重新生成，以跟上浏览器版本
+        """
+        self.logger = get_logger()
+        self.path = path
+        self.max_age_seconds = max_age_days * 24 * 3600
+
+    def is_valid(self):
+        """模板是否存在且未过期"""
+        try:
+            with open(os.path.join(self.path, self.MARKER_FILE), 'r', encoding='utf-8') as file:
+                created = float(file.read().strip())
+        except (OSError, ValueError):
+            return False
+        return time.time() - created < self.max_age_seconds
+
+    def clone(self, build):
+        """
+        复制一份模板供新会话使用，模板缺失或过期时先生成
+        :param build: build(目录)，在该目录中启动并正常退出一次浏览器
+        :return: 会话专用的用户数据目录
+        """
+        with _FileLock(f"{self.path}.lock", 300):
+            if not self.is_valid():
+                started = time.time()
+                shutil.rmtree(self.path, ignore_errors=True)
+                os.makedirs(self.path)
+                build(self.path)
+                with open(os.path.join(self.path, self.MARKER_FILE), 'w', encoding='utf-8') as file:
+                    file.write(str(time.time()))
+                self.logger.info("浏览器配置模板已生成: %s, 耗时 %.2fs", self.path, time.time() - started)
+
+            target = tempfile.mkdtemp(prefix="athena-profile-")
+            shutil.copytree(self.path, target, dirs_exist_ok=True,
+                            ignore=shutil.ignore_patterns(self.MARKER_FILE, *PROFILE_LOCK_FILES))
+        ProfileTemplate._clones.append(target)
+        return target
+
+    @classmethod
+    def cleanup(cls):
+        """删除本进程复制出的会话目录"""
+        while cls._clones:
+            shutil.rmtree(cls._clones.pop(), ignore_errors=True)
+
+
+atexit.register(ProfileTemplate.cleanup)
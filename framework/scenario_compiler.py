@@ -0,0 +1,317 @@
+# framework/scenario_compiler.py
+from concurrent.futures import ThreadPoolExecutor
+from collections import namedtuple
+from contextlib import contextmanager
+from utils.command_metrics import keyword_scope
+from utils.adaptive_wait import wait_budget
+from utils.logger import get_logger
+from utils.report_generator import get_report_generator
+import itertools
+import threading
+import time
+import re
+
+
+# 占位符 ${列名}，绑定到DataDriver数据行中的列
+PLACEHOLDER_PATTERN = re.compile(r'\$\{(\w+)\}')
+
+# 单行执行结果：行标识、PASS/FAIL、失败步骤序号、错误信息、耗时（秒）
+RowResult = namedtuple('RowResult', ['row_id', 'status', 'failed_step', 'error', 'duration'])
+
+
+class ScenarioCompileError(ValueError):
+    """场景编译失败：未知关键字、缺少参数或占位符无法绑定"""
+
+
+class CompiledStep:
+    """编译后的单个步骤：关键字已解析，参数已校验，占位符位置已记录"""
+
+    __slots__ = ('index', 'keyword', 'data', 'bindings', 'continue_on_failure')
+
+    def __init__(self, index, keyword, data, bindings, continue_on_failure):
+        self.index = index
+        self.keyword = keyword
+        self.data = data
+        self.bindings = bindings
+        self.continue_on_failure = continue_on_failure
+
+    def bind(self, row):
+        """按数据行生成步骤参数，无占位符的步骤直接复用静态参数"""
+        if not self.bindings:
+            return self.data
+        return _substitute(self.data, row)
+
+
+class RowExecution:
+    """
+    单行数据执行过程中的记录：占位符列校验、逐步骤计时与报告、首个失败步骤和最终RowResult，
+    同步与异步执行共用，调用方只负责调用（或await）关键字方法
+    """
+
+    def __init__(self, plan, row_id, row):
+        self.plan = plan
+        self.row_id = row_id
+        self.row = row
+        self.started = time.time()
+        self.failed_step = None
+        self.error = None
+        self.stopped = False
+        self.unbound = plan._unbound_columns(row)
+
+    @contextmanager
+    def step(self, step):
+        """执行一个步骤：启用关键字归属和等待预算，记录结果；步骤异常在此吞掉，不继续执行时置stopped"""
+        started = time.time()
+        try:
+            with keyword_scope(step.keyword), wait_budget(step.keyword):
+                yield
+            self.plan.report.record_step(self.plan.name, step.keyword, 'PASS', time.time() - started, self.row_id)
+        except Exception as e:
+            self.plan.report.record_step(self.plan.name, step.keyword, 'FAIL', time.time() - started,
+                                         self.row_id, str(e))
+            if self.failed_step is None:
+                self.failed_step, self.error = step.index, f"{step.keyword}: {e}"
+            if not step.continue_on_failure:
+                self.stopped = True
+
+    def result(self):
+        """紧凑的行结果；缺少占位符列的行不执行任何步骤，直接记为失败"""
+        if self.unbound:
+            error = f"数据行缺少占位符列 {self.unbound}"
+            self.plan.logger.error("场景 %s 数据行 %s 失败: %s", self.plan.name, self.row_id, error)
+            return RowResult(self.row_id, 'FAIL', None, error, 0.0)
+        status = 'PASS' if self.failed_step is None else 'FAIL'
+        if self.error:
+            self.plan.logger.error("场景 %s 数据行 %s 失败, 步骤 %s: %s",
+                                   self.plan.name, self.row_id, self.failed_step + 1, self.error)
+        return RowResult(self.row_id, status, self.failed_step, self.error, round(time.time() - self.started, 3))
+
+
+class ExecutionPlan:
+    """场景执行计划：编译一次，可在多个数据行、多个会话上重复执行"""
+
+    def __init__(self, name, steps, columns):
+        self.name = name
+        self.steps = steps
+        self.columns = columns
+        self.logger = get_logger()
+        self.report = get_report_generator()
+
+    def execute(self, engine, row=None):
+        """
+        在一个关键字引擎上执行一行数据，返回逐步骤结果（execute_test_scenario的返回格式）
+        :param engine: KeywordEngine实例
+        :param row: 数据行，场景无占位符时可为None
+        :return: [{'action', 'status', 'result'/'error'}, ...]
+        """
+        results = []
+        for step, handler in zip(self.steps, self._handlers(engine)):
+            started = time.time()
+            try:
+                with keyword_scope(step.keyword), wait_budget(step.keyword):
+                    result = handler(step.bind(row or {}))
+                self.report.record_step(self.name, step.keyword, 'PASS', time.time() - started)
+                results.append({'action': step.keyword, 'status': 'PASS', 'result': result})
+            except Exception as e:
+                self.logger.error("场景 %s 步骤 %s 失败: %s, 错误: %s", self.name, step.index + 1, step.keyword, e)
+                self.report.record_step(self.name, step.keyword, 'FAIL', time.time() - started, error=str(e))
+                results.append({'action': step.keyword, 'status': 'FAIL', 'error': str(e)})
+                if not step.continue_on_failure:
+                    break
+        return results
+
+    def run(self, engine, rows):
+        """
+        在一个关键字引擎上依次执行多行数据
+        :param engine: KeywordEngine实例
+        :param rows: 数据行可迭代对象（可为DataDriver生成器），元素为行字典或 (行标识, 行字典)
+        :return: RowResult生成器
+        """
+        handlers = self._handlers(engine)
+        for row_index, item in enumerate(rows):
+            row_id, row = item if isinstance(item, tuple) else (row_index, item)
+            yield self._run_row(handlers, row_id, row)
+
+    async def run_async(self, engine, rows):
+        """
+        run的协程版本，关键字为协程（AsyncKeywordEngine）；多个协程可共享同一个rows迭代器按需取行，
+        此时元素应为 (行标识, 行字典)，行标识不随各协程的取行顺序变化
+        :param engine: AsyncKeywordEngine实例
+        :param rows: 数据行可迭代对象，元素为行字典或 (行标识, 行字典)
+        :return: RowResult异步生成器
+        """
+        handlers = self._handlers(engine)
+        for row_index, item in enumerate(rows):
+            row_id, row = item if isinstance(item, tuple) else (row_index, item)
+            execution = RowExecution(self, row_id, row)
+            if not execution.unbound:
+                for step, handler in zip(self.steps, handlers):
+                    with execution.step(step):
+                        await handler(step.bind(row))
+                    if execution.stopped:
+                        break
+            yield execution.result()
+
+    def run_parallel(self, session_pool, rows, engine_factory, workers=None):
+        """
+        将数据行分发到会话池的多个会话上并行执行，数据行按需从迭代器中取出，不预先加载
+        :param session_pool: SessionPool实例
+        :param rows: 数据行可迭代对象
+        :param engine_factory: 由driver创建关键字引擎的函数，如 KeywordEngine
+        :param workers: 并行会话数，默认为会话池大小
+        :return: RowResult列表（按完成顺序）
+        """
+        workers = workers or session_pool.size
+        source = iter(rows)
+        source_lock = threading.Lock()
+        counter = [0]
+
+        def next_row():
+            with source_lock:
+                item = next(source, None)
+                if item is None:
+                    return None
+                row_index = counter[0]
+                counter[0] += 1
+            return item if isinstance(item, tuple) else (row_index, item)
+
+        def worker():
+            driver = session_pool.checkout()
+            try:
+                handlers = self._handlers(engine_factory(driver))
+                results = []
+                while True:
+                    item = next_row()
+                    if item is None:
+                        return results
+                    results.append(self._run_row(handlers, item[0], item[1]))
+            finally:
+                session_pool.checkin(driver)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(worker) for _ in range(workers)]
+            return [result for future in futures for result in future.result()]
+
+    def _unbound_columns(self, row):
+        """数据行中缺少的占位符列（编译时按第一行校验，列不一致的后续行在执行前拒绝）"""
+        return [column for column in self.columns if column not in row]
+
+    def _handlers(self, engine):
+        """一次性解析出各步骤对应的关键字方法"""
+        return [engine.keywords[step.keyword] for step in self.steps]
+
+    def _run_row(self, handlers, row_id, row):
+        """执行单行数据，只保留紧凑的结果"""
+        execution = RowExecution(self, row_id, row)
+        if not execution.unbound:
+            for step, handler in zip(self.steps, handlers):
+                with execution.step(step):
+                    handler(step.bind(row))
+                if execution.stopped:
+                    break
+        return execution.result()
+
+
+class ScenarioCompiler:
+    """场景编译器：校验关键字和参数，记录占位符，生成可复用的执行计划"""
+
+    def __init__(self, keyword_args):
+        """
+        :param keyword_args: 关键字参数声明 {关键字: {'required': (...), 'optional': (...)}}
+        """
+        self.keyword_args = keyword_args
+
+    def compile(self, scenario_data, name='scenario', columns=None):
+        """
+        编译场景
+        :param scenario_data: 场景步骤列表，每个元素包含action和data
+        :param name: 场景名称，用于日志和错误信息
+        :param columns: 数据行的列名，提供时校验所有占位符均可绑定
+        :return: ExecutionPlan
+        """
+        errors = []
+        steps = []
+        placeholders = set()
+
+        for index, step in enumerate(scenario_data or []):
+            keyword = step.get('action') if isinstance(step, dict) else None
+            data = step.get('data') or {} if isinstance(step, dict) else {}
+            prefix = f"场景 {name} 第 {index + 1} 步"
+
+            if keyword not in self.keyword_args:
+                errors.append(f"{prefix}: 未知关键字 {keyword!r}")
+                continue
+            if not isinstance(data, dict):
+                errors.append(f"{prefix} ({keyword}): data必须是字典")
+                continue
+
+            spec = self.keyword_args[keyword]
+            required = spec.get('required', ())
+            allowed = set(required) | set(spec.get('optional', ()))
+            missing = [arg for arg in required if arg not in data]
+            unknown = [arg for arg in data if arg not in allowed]
+            if missing:
+                errors.append(f"{prefix} ({keyword}): 缺少参数 {missing}")
+            if unknown:
+                errors.append(f"{prefix} ({keyword}): 未知参数 {unknown}")
+
+            bindings = _find_placeholders(data)
+            placeholders.update(bindings)
+            steps.append(CompiledStep(index, keyword, data, tuple(sorted(bindings)),
+                                      step.get('continue_on_failure', False)))
+
+        if columns is not None:
+            unbound = sorted(placeholders - set(columns))
+            if unbound:
+                errors.append(f"场景 {name}: 占位符无法绑定到数据列 {unbound}，可用列: {sorted(columns)}")
+
+        if not steps and not errors:
+            errors.append(f"场景 {name}: 没有任何步骤")
+        if errors:
+            raise ScenarioCompileError("\n".join(errors))
+
+        return ExecutionPlan(name, tuple(steps), tuple(sorted(placeholders)))
+
+
+def peek_columns(rows):
+    """
+    取第一个数据行的列名，用于编译时校验占位符
+    :param rows: 数据行可迭代对象，元素为行字典或 (行标识, 行字典)
+    :return: (列名, 数据行)；生成器的第一行会放回，数据行为空时列名为None
+    """
+    if isinstance(rows, (list, tuple)):
+        first = rows[0] if rows else None
+    else:
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is not None:
+            rows = itertools.chain([first], rows)
+    if first is None:
+        return None, rows
+    row = first[1] if isinstance(first, tuple) else first
+    return tuple(row), rows
+
+
+def _find_placeholders(value):
+    """收集参数中出现的全部占位符列名"""
+    if isinstance(value, str):
+        return set(PLACEHOLDER_PATTERN.findall(value))
+    if isinstance(value, dict):
+        return set().union(*(_find_placeholders(item) for item in value.values())) if value else set()
+    if isinstance(value, (list, tuple)):
+        return set().union(*(_find_placeholders(item) for item in value)) if value else set()
+    return set()
+
+
+def _substitute(value, row):
+    """替换占位符：整个值为单个占位符时保留原始类型，否则按字符串插值"""
+    if isinstance(value, str):
+        match = PLACEHOLDER_PATTERN.fullmatch(value)
+        if match:
+            return row[match.group(1)]
+        return PLACEHOLDER_PATTERN.sub(lambda m: str(row[m.group(1)]), value)
+    if isinstance(value, dict):
+        return {key: _substitute(item, row) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_substitute(item, row) for item in value]
+    return value
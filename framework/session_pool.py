@@ -0,0 +1,280 @@
+# framework/session_pool.py
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from collections import Counter
+from selenium.webdriver.remote.command import Command
+from framework.driver_manager import DriverManager
+from utils.video_recorder import VideoRecorder
+from utils.logger import get_logger
+import itertools
+import threading
+import time
+
+
+def url_origin(url):
+    """URL的源（scheme://host[:port]），非http(s)地址返回None"""
+    parts = urlsplit(url or '')
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def track_origins(driver):
+    """
+    获取会话访问过的源集合，首次调用时包装命令执行器，记录导航地址和观察到的当前URL的源；
+    不经过命令执行器的驱动（HttpDriver）只能在重置时读取当前URL
+    :param driver: WebDriver实例
+    :return: set
+    """
+    origins = getattr(driver, '_athena_origins', None)
+    if origins is not None:
+        return origins
+
+    origins = set()
+    executor = getattr(driver, 'command_executor', None)
+    if executor is not None:
+        original_execute = executor.execute
+
+        def execute(command, params):
+            response = original_execute(command, params)
+            if command == Command.GET:
+                origins.add(url_origin((params or {}).get('url')))
+            elif command == Command.GET_CURRENT_URL:
+                origins.add(url_origin((response or {}).get('value')))
+            return response
+
+        executor.execute = execute
+    driver._athena_origins = origins
+    return origins
+
+
+class PooledSession:
+    """池化的浏览器会话"""
+
+    def __init__(self, driver, browser_name):
+        self.driver = driver
+        self.browser_name = browser_name
+        self.uses = 0
+        self.created_at = time.time()
+
+
+class SessionPool:
+    """WebDriver会话池：预启动浏览器，测试借出/归还，归还时快速重置状态而不是重启浏览器"""
+
+    # 关闭多余窗口、清理存储后统一回到的空白页
+    RESET_URL = "about:blank"
+
+    # 支持通过DevTools协议按源清理存储、清理全部Cookie的浏览器
+    CDP_BROWSERS = ('chrome', 'edge')
+
+    # Storage.clearDataForOrigin清理的存储类型（Cookie由Storage.clearCookies统一清理）
+    CDP_STORAGE_TYPES = "local_storage,indexeddb,websql,service_workers,cache_storage,file_systems"
+
+    def __init__(self, driver_manager=None, size=None, browsers=None, max_uses=None):
+        self.logger = get_logger()
+        self.driver_manager = driver_manager or DriverManager()
+
+        pool_config = self.driver_manager.config.get('session_pool') or {}
+        self.size = size or pool_config.get('size', 1)
+        self.browsers = browsers or pool_config.get('browsers') or [self.driver_manager.config['browser']['name']]
+        self.max_uses = max_uses or pool_config.get('max_uses', 50)
+        self.checkout_timeout = pool_config.get('checkout_timeout', 60)
+
+        self._idle = []
+        self._busy = {}
+        self._pending = Counter()
+        self._closed = False
+        self._condition = threading.Condition()
+        self._slots = itertools.cycle([name.lower() for name in self.browsers])
+
+    def start(self):
+        """并行预启动全部会话"""
+        browser_names = [next(self._slots) for _ in range(self.size)]
+        started = time.time()
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            sessions = list(executor.map(self._launch, browser_names))
+
+        with self._condition:
+            self._idle.extend(sessions)
+            self._condition.notify_all()
+
+        self.logger.info("会话池预启动完成: %s 个会话 %s, 耗时 %.2fs",
+                         len(sessions), browser_names, time.time() - started)
+        return self
+
+    def checkout(self, browser_name=None, timeout=None):
+        """
+        借出一个空闲会话
+        :param browser_name: 指定浏览器类型，默认任意
+        :param timeout: 等待空闲会话的超时时间
+        :return: WebDriver对象
+        """
+        timeout = timeout if timeout is not None else self.checkout_timeout
+        browser_name = browser_name.lower() if browser_name else None
+        deadline = time.time() + timeout
+
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("会话池已关闭")
+
+                session = self._take_idle(browser_name)
+                if session:
+                    break
+
+                # 池中没有该类型的会话且也没有正在启动的会话时，按需启动一个
+                if not self._has_browser(browser_name):
+                    launch_name = browser_name or next(self._slots)
+                    self._pending[launch_name] += 1
+                    self._condition.release()
+                    try:
+                        session = self._launch(launch_name)
+                    finally:
+                        self._condition.acquire()
+                        self._pending[launch_name] -= 1
+                    break
+
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise TimeoutError(f"等待空闲浏览器会话超时: {timeout}s")
+                self._condition.wait(remaining)
+
+            session.uses += 1
+            self._busy[id(session.driver)] = session
+
+        self.logger.info("借出会话: %s (第 %s 次使用)", session.browser_name, session.uses)
+        return session.driver
+
+    def checkin(self, driver):
+        """
+        归还会话，重置浏览器状态；达到复用上限或重置失败时回收并重建
+        :param driver: checkout返回的WebDriver对象
+        """
+        with self._condition:
+            session = self._busy.pop(id(driver), None)
+        if session is None:
+            raise ValueError("归还的会话不属于该会话池")
+
+        if session.uses >= self.max_uses:
+            self.logger.info("会话已达到复用上限 %s 次，回收重建: %s", self.max_uses, session.browser_name)
+            self._replace(session)
+            return
+
+        try:
+            self.reset_session(driver, session.browser_name)
+        except Exception as e:
+            self.logger.warning("会话重置失败，回收重建: %s, 错误: %s", session.browser_name, str(e))
+            self._replace(session)
+            return
+
+        with self._condition:
+            if self._closed:
+                self._quit(session)
+                return
+            self._idle.append(session)
+            self._condition.notify_all()
+
+    def reset_session(self, driver, browser_name=None):
+        """
+        完整重置会话状态：全部窗口、会话访问过的所有源的Web存储和全部域名Cookie，最后停在空白页
+        :param driver: WebDriver对象
+        :param browser_name: 浏览器类型，用于选择存储和Cookie的清理方式
+        """
+        origins = track_origins(driver)
+        origins.add(url_origin(driver.current_url))
+        origins.discard(None)
+
+        if browser_name in self.CDP_BROWSERS and hasattr(driver, 'execute_cdp_cmd'):
+            # 按源清理localStorage、IndexedDB等持久存储，Storage.clearCookies清理全部域名Cookie
+            for origin in sorted(origins):
+                driver.execute_cdp_cmd('Storage.clearDataForOrigin',
+                                       {'origin': origin, 'storageTypes': self.CDP_STORAGE_TYPES})
+            driver.execute_cdp_cmd('Storage.clearCookies', {})
+        else:
+            # 没有DevTools协议时逐个回到访问过的源，清理该源的存储和Cookie
+            # （delete_all_cookies只清理当前域名，about:blank等页面无存储，访问会抛异常）
+            for origin in sorted(origins):
+                driver.get(f"{origin}/")
+                driver.execute_script("try { window.localStorage.clear(); } catch (e) {}")
+                driver.delete_all_cookies()
+
+        # sessionStorage按标签页保存，在新标签页中打开空白页并关闭其余全部窗口，清理所有源的sessionStorage
+        handles = driver.window_handles
+        driver.switch_to.new_window('tab')
+        fresh_handle = driver.current_window_handle
+        for handle in handles:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(fresh_handle)
+        driver.get(self.RESET_URL)
+        origins.clear()
+
+    def close(self):
+        """关闭会话池并退出所有浏览器"""
+        with self._condition:
+            self._closed = True
+            sessions = self._idle + list(self._busy.values())
+            self._idle = []
+            self._busy = {}
+            self._condition.notify_all()
+
+        for session in sessions:
+            self._quit(session)
+        self.logger.info("会话池已关闭，退出 %s 个会话", len(sessions))
+
+    def _launch(self, browser_name):
+        """启动一个新会话"""
+        started = time.time()
+        driver = self.driver_manager.build_driver(browser_name)
+        track_origins(driver)
+        self.logger.info("会话启动完成: %s, 耗时 %.2fs", browser_name, time.time() - started)
+        return PooledSession(driver, browser_name)
+
+    def _replace(self, session):
+        """退出旧会话并在后台启动同类型的新会话，避免阻塞当前测试的收尾"""
+        self._quit(session)
+
+        with self._condition:
+            if self._closed:
+                return
+            self._pending[session.browser_name] += 1
+
+        def launch():
+            try:
+                new_session = self._launch(session.browser_name)
+            except Exception as e:
+                self.logger.error("重建会话失败: %s, 错误: %s", session.browser_name, str(e))
+                new_session = None
+
+            with self._condition:
+                self._pending[session.browser_name] -= 1
+                if new_session and self._closed:
+                    self._quit(new_session)
+                elif new_session:
+                    self._idle.append(new_session)
+                self._condition.notify_all()
+
+        threading.Thread(target=launch, name="session-pool-replace", daemon=True).start()
+
+    def _take_idle(self, browser_name):
+        """从空闲列表中取出匹配的会话"""
+        for index, session in enumerate(self._idle):
+            if browser_name is None or session.browser_name == browser_name:
+                return self._idle.pop(index)
+        return None
+
+    def _has_browser(self, browser_name):
+        """池中（空闲、借出或启动中）是否存在该类型的会话，browser_name为None时匹配任意类型"""
+        if any(count > 0 for name, count in self._pending.items() if browser_name is None or name == browser_name):
+            return True
+        sessions = self._idle + list(self._busy.values())
+        return any(browser_name is None or session.browser_name == browser_name for session in sessions)
+
+    def _quit(self, session):
+        """退出浏览器，忽略已失效会话的异常"""
+        VideoRecorder.detach(session.driver)
+        try:
+            session.driver.quit()
+        except Exception as e:
+            self.logger.warning("退出会话异常: %s, 错误: %s", session.browser_name, str(e))
@@ -0,0 +1,158 @@
+# framework/shard_scheduler.py
+from utils.locator_cache import _FileLock
+from utils.logger import get_logger
+from config.registry import load_config
+import statistics
+import glob
+import shutil
+import heapq
+import json
+import time
+import os
+
+
+class DurationStore:
+    """
+    历史耗时库：按pytest节点ID记录测试耗时（指数滑动平均），多个分片结束时合并写入同一文件
+    """
+
+    VERSION = 1
+
+    def __init__(self, config_path="config/config.yaml"):
+        self.logger = get_logger()
+        config = load_config(config_path)
+        sharding_config = config.get('sharding') or {}
+
+        self.path = sharding_config.get('durations_path', "reports/.cache/durations.json")
+        self.smoothing = sharding_config.get('smoothing', 0.3)
+        self.ttl_seconds = sharding_config.get('ttl_days', 30) * 24 * 3600
+        self.default_duration = sharding_config.get('default_duration', 5.0)
+        self._pending = {}
+
+    def load(self, run_id=None):
+        """
+        读取历史耗时
+        :param run_id: 运行ID；指定时同一次运行的所有分片读取同一份快照，
+                       避免先结束的分片写入新耗时后，后启动的分片算出不同的分配结果
+        :return: {节点ID: 平均耗时}
+        """
+        path = self.path
+        if run_id:
+            path = f"{self.path}.{run_id}"
+            with _FileLock(f"{self.path}.lock", 10):
+                if not os.path.exists(path):
+                    self._remove_stale_snapshots()
+                    if os.path.exists(self.path):
+                        shutil.copyfile(self.path, path)
+                    else:
+                        self._write({}, path)
+        return {nodeid: entry[0] for nodeid, entry in self._read(path).items()}
+
+    def record(self, nodeid, duration):
+        """累计一个测试本次运行的耗时（setup、call、teardown分别累加）"""
+        self._pending[nodeid] = self._pending.get(nodeid, 0.0) + duration
+
+    def flush(self):
+        """将本次运行的耗时合并写入耗时库"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        now = time.time()
+
+        try:
+            with _FileLock(f"{self.path}.lock", 10):
+                entries = self._read(self.path)
+                for nodeid, duration in pending.items():
+                    entry = entries.get(nodeid)
+                    if entry:
+                        average = entry[0] + self.smoothing * (duration - entry[0])
+                        entries[nodeid] = [round(average, 3), entry[1] + 1, now]
+                    else:
+                        entries[nodeid] = [round(duration, 3), 1, now]
+                deadline = now - self.ttl_seconds
+                self._write({key: entry for key, entry in entries.items() if entry[2] >= deadline}, self.path)
+        except OSError as e:
+            self.logger.warning("测试耗时库写入失败: %s", str(e))
+
+    def _remove_stale_snapshots(self):
+        """清理一天前的运行快照"""
+        deadline = time.time() - 24 * 3600
+        for path in glob.glob(f"{glob.escape(self.path)}.*"):
+            if path.endswith(('.lock', '.tmp')):
+                continue
+            try:
+                if os.path.getmtime(path) < deadline:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def _read(self, path):
+        """读取耗时文件，不存在或版本不符时返回空"""
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+        if data.get('version') != self.VERSION:
+            return {}
+        return data.get('durations', {})
+
+    def _write(self, entries, path):
+        """原子写入耗时文件"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({'version': self.VERSION, 'durations': entries}, file)
+        os.replace(temp_path, path)
+
+
+class ShardScheduler:
+    """按历史耗时做最长优先（LPT）装箱，把测试均衡地分配到N个分片"""
+
+    def __init__(self, durations, default_duration=5.0):
+        """
+        :param durations: {节点ID: 平均耗时}
+        :param default_duration: 没有任何历史数据时的预估耗时（秒）
+        """
+        self.durations = durations
+        self.default_duration = default_duration
+
+    def estimate(self, nodeids):
+        """
+        预估各测试耗时：无历史记录的测试取同文件已知测试的中位数，再退回全局中位数
+        :return: {节点ID: 预估耗时}
+        """
+        known = [self.durations[nodeid] for nodeid in nodeids if nodeid in self.durations]
+        fallback = statistics.median(known) if known else self.default_duration
+
+        by_file = {}
+        for nodeid in nodeids:
+            if nodeid in self.durations:
+                by_file.setdefault(nodeid.split('::', 1)[0], []).append(self.durations[nodeid])
+        file_medians = {name: statistics.median(values) for name, values in by_file.items()}
+
+        return {
+            nodeid: self.durations.get(nodeid, file_medians.get(nodeid.split('::', 1)[0], fallback))
+            for nodeid in nodeids
+        }
+
+    def assign(self, nodeids, shard_count):
+        """
+        LPT分配：按预估耗时降序，依次放入当前总耗时最小的分片；
+        相同输入在各分片上得到相同结果
+        :param nodeids: 收集到的测试节点ID
+        :param shard_count: 分片数
+        :return: ({节点ID: 分片序号}, [各分片预估总耗时])
+        """
+        estimates = self.estimate(nodeids)
+        ordered = sorted(nodeids, key=lambda nodeid: (-estimates[nodeid], nodeid))
+
+        shards = [(0.0, index) for index in range(shard_count)]
+        assignment = {}
+        loads = [0.0] * shard_count
+        for nodeid in ordered:
+            load, index = heapq.heappop(shards)
+            assignment[nodeid] = index
+            loads[index] = load + estimates[nodeid]
+            heapq.heappush(shards, (loads[index], index))
+        return assignment, loads
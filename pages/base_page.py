@@ -1,108 +1,322 @@
 # pages/base_page.py
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from utils.element_locator import ElementLocator
-from utils.logger import Logger
+from selenium.common.exceptions import (
+    TimeoutException, NoSuchElementException, StaleElementReferenceException,
+    ElementClickInterceptedException, ElementNotInteractableException
+)
+from utils.element_locator import ElementLocator, LOCATOR_JS_FUNCTIONS
+from utils.locator_cache import get_locator_cache
+from utils.element_cache import ElementCache, track_page_state
+from utils.adaptive_wait import AdaptiveWait
+from utils.wait_engine import WaitEngine, WaitConditions
+from utils.command_metrics import track_page_method
+from utils.impact_analysis import dependency_recorder
+from utils.artifact_writer import get_artifact_writer
+from utils.logger import get_logger
+from config.registry import load_config, get_page_elements
+from framework.page_load import (
+    MARK_NAVIGATION_SCRIPT, NAVIGATION_TIMING_SCRIPT, page_load_strategy_for, session_page_load_strategy, is_stricter,
+    page_load_stats
+)
 import time
-import os
+
+
+# 批量填表脚本：一次往返内定位全部字段并赋值，触发input/change事件
+# arguments[0]: [[[[type, value], ...], value], ...]
+# 返回每个字段命中的策略序号，有字段未找到时返回-1且不填写任何字段
+FILL_FORM_SCRIPT = LOCATOR_JS_FUNCTIONS + """
+var fields = arguments[0], matches = [], elements = [];
+for (var i = 0; i < fields.length; i++) {
+    var match = locate(fields[i][0], false);
+    matches.push(match ? match[0] : -1);
+    elements.push(match ? match[1] : null);
+}
+if (matches.indexOf(-1) !== -1) { return matches; }
+function fire(el, type) { el.dispatchEvent(new Event(type, {bubbles: true})); }
+function setValue(el, value) {
+    var tag = el.tagName.toLowerCase(), type = (el.type || '').toLowerCase();
+    fire(el, 'focus');
+    if (type === 'checkbox' || type === 'radio') {
+        var checked = type === 'radio' && typeof value === 'string'
+            ? el.value === value : (value === true || value === 'true' || value === 1);
+        if (el.checked !== checked) { el.click(); }
+    } else if (tag === 'select') {
+        var values = Array.isArray(value) ? value.map(String) : [String(value)];
+        toArray(el.options).forEach(function (option) {
+            option.selected = values.indexOf(option.value) !== -1 || values.indexOf(option.text) !== -1;
+        });
+        fire(el, 'input');
+        fire(el, 'change');
+    } else if (el.isContentEditable) {
+        el.textContent = value == null ? '' : String(value);
+        fire(el, 'input');
+    } else {
+        // 通过原型上的setter赋值，React等框架的受控组件才能感知到变化
+        var proto = tag === 'textarea' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+        Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value == null ? '' : String(value));
+        fire(el, 'input');
+        fire(el, 'change');
+    }
+    fire(el, 'blur');
+}
+for (var j = 0; j < elements.length; j++) { setValue(elements[j], fields[j][1]); }
+return matches;
+"""
 
 
 class BasePage:
     """页面对象基类，封装通用页面操作"""
 
+    # 页面名称，与test_data.yaml中page_elements的分组一致，定位器从注册表加载
+    page_name = None
+
+    # 元素操作可重试的瞬时异常
+    RETRYABLE_EXCEPTIONS = (
+        StaleElementReferenceException, ElementClickInterceptedException, ElementNotInteractableException
+    )
+
     def __init__(self, driver):
         self.driver = driver
-        self.wait = WebDriverWait(driver, 10)
+        # 同一页面的所有实例共享注册表中的预编译定位器
+        self.page_elements = get_page_elements(self.page_name) if self.page_name else {}
+        self.wait = AdaptiveWait(driver, 10)
         self.locator = ElementLocator()
-        self.logger = Logger()
+        self.wait_engine = WaitEngine(driver)
+        # 按元素key缓存已定位的元素，导航或文档变化后自动失效
+        self.element_cache = ElementCache(driver, self.page_name or type(self).__name__)
+        self.logger = get_logger()
+        # 元素操作遇到失效、被遮挡等瞬时异常时的最多尝试次数
+        self.retry_attempts = max(1, (load_config().get('element_locator') or {}).get('retry_attempts', 3))
+
+    def get_base_url(self, config_path="config/config.yaml"):
+        """读取配置中的被测应用地址"""
+        return load_config(config_path)['environment']['base_url']
+
+    @track_page_method
+    def open(self, url, keyword, ready_condition=None):
+        """
+        按关键字的页面加载策略打开页面，等待页面就绪与ready_condition同时满足，并记录加载耗时。
+        会话使用最宽松的策略，driver.get（受page_load_timeout约束）返回后，策略更严格的关键字再显式等待
+        :param url: 完整URL
+        :param keyword: 关键字名称（读取页面加载策略、超时配置和统计）
+        :param ready_condition: 页面可操作的完成条件，如关键元素可见
+        :return: 完成条件的返回值
+        """
+        strategy = page_load_strategy_for(keyword)
+        session_strategy = session_page_load_strategy(self.driver)
+        supports_javascript = getattr(self.driver, 'supports_javascript', True)
 
+        started = time.perf_counter()
+        # 不经过命令执行器的驱动（HttpDriver）无法被跟踪，显式标记同一会话上各页面的缓存元素作废
+        track_page_state(self.driver).navigated()
+        if session_strategy == 'none' and supports_javascript and is_stricter(strategy, session_strategy):
+            self.driver.execute_script(MARK_NAVIGATION_SCRIPT)
+        self.driver.get(url)
+
+        condition = ready_condition
+        if supports_javascript and is_stricter(strategy, session_strategy):
+            loaded = WaitConditions.page_loaded(strategy)
+            condition = WaitConditions.all_of(loaded, ready_condition) if ready_condition else loaded
+        result = self.wait_engine.wait_for(keyword, condition) if condition else None
+
+        timing = self.driver.execute_script(NAVIGATION_TIMING_SCRIPT) if supports_javascript else None
+        page_load_stats.record_navigation(keyword, strategy, time.perf_counter() - started, timing)
+        return result
+
+    def resolve_locator(self, locator_data):
+        """
+        解析定位参数，元素key从page_elements中取出定位数据
+        :param locator_data: 元素key或定位数据
+        :return: (定位数据, 定位策略缓存key)，直接传入定位数据时缓存key为None
+        """
+        if isinstance(locator_data, str):
+            locator_list = self.page_elements[locator_data]
+            dependency_recorder.note_locator(locator_list)
+            return locator_list, (self.page_name or type(self).__name__, locator_data)
+        dependency_recorder.note_locator(locator_data)
+        return locator_data, None
+
+    @track_page_method
     def find_element(self, locator_data, timeout=10):
         """
         智能查找元素，支持多种定位策略
-        :param locator_data: 定位数据列表
+        :param locator_data: 元素key或定位数据列表
         :param timeout: 超时时间
         :return: WebElement对象
         """
-        return self.locator.find_element(self.driver, locator_data, timeout)
+        locator_data, cache_key = self.resolve_locator(locator_data)
+        if cache_key:
+            element = self.element_cache.get(cache_key[1])
+            if element is not None:
+                return element
+        element = self.locator.find_element(self.driver, locator_data, timeout, cache_key=cache_key)
+        if cache_key:
+            self.element_cache.put(cache_key[1], element)
+        return element
 
+    def with_element(self, locator_data, action, timeout=10, visible=False):
+        """
+        定位元素并执行操作，遇到元素失效、被遮挡等瞬时异常时重新定位后重试，
+        最多尝试element_locator.retry_attempts次，总耗时受关键字等待预算约束
+        :param locator_data: 元素key或定位数据
+        :param action: action(element)
+        :param visible: 是否要求元素可见
+        :return: action的返回值
+        """
+        find = self.wait_for_element_visible if visible else self.find_element
+        _, cache_key = self.resolve_locator(locator_data)
+        for attempt in range(1, self.retry_attempts + 1):
+            try:
+                return action(find(locator_data, timeout))
+            except self.RETRYABLE_EXCEPTIONS as e:
+                if attempt == self.retry_attempts:
+                    raise
+                if cache_key:
+                    self.element_cache.invalidate(cache_key[1])
+                self.logger.warning("元素操作失败，第 %s 次重试: %s, 错误: %s", attempt, locator_data, type(e).__name__)
+
+    @track_page_method
     def find_elements(self, locator_data, timeout=10):
         """
         智能查找多个元素
-        :param locator_data: 定位数据列表
+        :param locator_data: 元素key或定位数据列表
         :param timeout: 超时时间
         :return: WebElement对象列表
         """
+        locator_data, _ = self.resolve_locator(locator_data)
         return self.locator.find_elements(self.driver, locator_data, timeout)
 
+    @track_page_method
     def click_element(self, locator_data, timeout=10):
         """点击元素"""
         try:
-            element = self.wait.until(
-                EC.element_to_be_clickable(self.locator.get_selenium_locator(locator_data))
-            )
-            element.click()
-            self.logger.info(f"成功点击元素: {locator_data}")
+            self.with_element(locator_data, lambda element: AdaptiveWait(self.driver, timeout).until(
+                EC.element_to_be_clickable(element)
+            ).click(), timeout)
+            self.logger.info("成功点击元素: %s", locator_data)
         except TimeoutException:
-            self.logger.error(f"点击元素超时: {locator_data}")
+            self.logger.error("点击元素超时: %s", locator_data)
             raise
 
+    @track_page_method
     def input_text(self, locator_data, text, timeout=10):
         """输入文本"""
-        try:
-            element = self.wait.until(
-                EC.presence_of_element_located(self.locator.get_selenium_locator(locator_data))
-            )
+        def enter(element):
             element.clear()
             element.send_keys(text)
-            self.logger.info(f"成功输入文本 '{text}' 到元素: {locator_data}")
+
+        try:
+            self.with_element(locator_data, enter, timeout)
+            self.logger.info("成功输入文本 '%s' 到元素: %s", text, locator_data)
         except TimeoutException:
-            self.logger.error(f"输入文本超时: {locator_data}")
+            self.logger.error("输入文本超时: %s", locator_data)
             raise
 
+    @track_page_method
+    def fill_form(self, fields, keystrokes=None, timeout=10):
+        """
+        批量填表：一次WebDriver往返内定位全部字段并赋值，触发input/change事件
+        :param fields: {元素key: 值}，复选框/单选框传布尔值，下拉框传选项值或文本
+        :param keystrokes: 需要真实键盘输入的元素key列表（如依赖keydown事件的字段），逐个send_keys
+        :param timeout: 等待全部字段出现的超时时间
+        """
+        keystrokes = set(keystrokes or [])
+        if not getattr(self.driver, 'supports_javascript', True):
+            # 不支持JavaScript的驱动逐个字段输入
+            keystrokes = set(fields)
+        batch_keys = [key for key in fields if key not in keystrokes]
+
+        if batch_keys:
+            locators = {}
+            payload = []
+            for key in batch_keys:
+                locator_data, cache_key = self.resolve_locator(key)
+                if not isinstance(locator_data, list):
+                    locator_data = [locator_data]
+                if cache_key:
+                    locator_data = get_locator_cache().order(cache_key[0], cache_key[1], locator_data)
+                # 脚本返回的命中序号对应过滤后的候选策略
+                candidates = self.locator.script_candidates(locator_data)
+                locators[key] = (candidates, cache_key)
+                payload.append([self.locator.get_script_strategies(candidates), fields[key]])
+
+            matches = []
+            check = {'elapsed': 0.0}
+
+            def all_filled(driver):
+                check_started = time.time()
+                matches[:] = driver.execute_script(FILL_FORM_SCRIPT, payload)
+                check['elapsed'] = time.time() - check_started
+                return -1 not in matches
+
+            started = time.time()
+            try:
+                AdaptiveWait(self.driver, timeout).until(all_filled)
+            except TimeoutException:
+                missing = [key for key, index in zip(batch_keys, matches) if index == -1]
+                self.logger.error("批量填表超时，未找到字段: %s", missing)
+                raise TimeoutException(f"批量填表未找到字段: {missing}")
+
+            elapsed = time.time() - started
+            for key, index in zip(batch_keys, matches):
+                candidates, cache_key = locators[key]
+                self.locator.record_race(cache_key, candidates, index, check['elapsed'])
+            self.logger.info("批量填表完成: %s 个字段, 耗时 %.2fs", len(batch_keys), elapsed)
+
+        for key in fields:
+            if key in keystrokes:
+                self.input_text(key, fields[key], timeout)
+
+    @track_page_method
     def get_text(self, locator_data, timeout=10):
         """获取元素文本"""
         try:
-            element = self.wait.until(
-                EC.presence_of_element_located(self.locator.get_selenium_locator(locator_data))
-            )
-            text = element.text
-            self.logger.info(f"获取元素文本成功: {text}")
+            text = self.with_element(locator_data, lambda element: element.text, timeout)
+            self.logger.info("获取元素文本成功: %s", text)
             return text
         except TimeoutException:
-            self.logger.error(f"获取元素文本超时: {locator_data}")
+            self.logger.error("获取元素文本超时: %s", locator_data)
             raise
 
+    @track_page_method
     def wait_for_element_visible(self, locator_data, timeout=10):
         """等待元素可见"""
         try:
-            element = self.wait.until(
-                EC.visibility_of_element_located(self.locator.get_selenium_locator(locator_data))
-            )
-            self.logger.info(f"元素已可见: {locator_data}")
+            locator_list, cache_key = self.resolve_locator(locator_data)
+            element = self.element_cache.get(cache_key[1], visible=True) if cache_key else None
+            if element is None:
+                element = self.locator.race_find_element(
+                    self.driver, locator_list, timeout, visible=True, cache_key=cache_key
+                )
+                if cache_key:
+                    self.element_cache.put(cache_key[1], element)
+            self.logger.info("元素已可见: %s", locator_data)
             return element
         except TimeoutException:
-            self.logger.error(f"等待元素可见超时: {locator_data}")
+            self.logger.error("等待元素可见超时: %s", locator_data)
             raise
 
-    def take_screenshot(self, filename):
-        """截图"""
-        screenshot_dir = "reports/screenshots/"
-        os.makedirs(screenshot_dir, exist_ok=True)
-        filepath = os.path.join(screenshot_dir, f"{filename}.png")
-        self.driver.save_screenshot(filepath)
-        self.logger.info(f"截图已保存: {filepath}")
-        return filepath
+    @track_page_method
+    def take_screenshot(self, filename, attach_name=None):
+        """
+        截图，压缩和写入由后台线程完成
+        :param filename: 文件名（不含扩展名）
+        :param attach_name: Allure附件名称，为None时不附加到报告
+        :return: 截图文件路径
+        """
+        return get_artifact_writer().submit_screenshot(self.driver.get_screenshot_as_png(), filename, attach_name)
 
+    @track_page_method
     def scroll_to_element(self, locator_data):
         """滚动到元素"""
         element = self.find_element(locator_data)
         self.driver.execute_script("arguments[0].scrollIntoView();", element)
-        self.logger.info(f"已滚动到元素: {locator_data}")
+        self.logger.info("已滚动到元素: %s", locator_data)
 
+    @track_page_method
     def execute_js(self, script, *args):
         """执行JavaScript"""
         result = self.driver.execute_script(script, *args)
-        self.logger.info(f"执行JS成功: {script}")
+        self.logger.info("执行JS成功: %s", script)
         return result
\ No newline at end of file
@@ -1,54 +1,39 @@
 # pages/dashboard_page.py
 from pages.base_page import BasePage
+from utils.command_metrics import track_page_method
 
 
 class DashboardPage(BasePage):
     """仪表板页面对象"""
 
-    def __init__(self, driver):
-        super().__init__(driver)
-        self.page_elements = {
-            'welcome_message': [
-                {'type': 'xpath', 'value': "//h1[contains(text(), 'Welcome')]"},
-                {'type': 'css', 'value': '.welcome-message'},
-                {'type': 'class', 'value': 'user-greeting'}
-            ],
-            'logout_button': [
-                {'type': 'id', 'value': 'logout'},
-                {'type': 'css', 'value': "button.logout-btn"},
-                {'type': 'xpath', 'value': "//a[contains(text(), 'Logout') or contains(text(), '退出')]"}
-            ],
-            'user_profile': [
-                {'type': 'id', 'value': 'user-profile'},
-                {'type': 'css', 'value': '.user-info'},
-                {'type': 'class', 'value': 'profile-menu'}
-            ]
-        }
+    page_name = "dashboard_page"
 
+    @track_page_method
     def get_welcome_message(self):
         """获取欢迎信息"""
         try:
-            message_element = self.find_element(self.page_elements['welcome_message'])
-            return message_element.text
+            return self.get_text('welcome_message')
         except:
             return None
 
+    @track_page_method
     def click_logout(self):
         """点击退出登录"""
-        self.click_element(self.page_elements['logout_button'])
+        self.click_element('logout_button')
 
+    @track_page_method
     def verify_dashboard_loaded(self):
         """验证仪表板页面已加载"""
         try:
-            self.wait_for_element_visible(self.page_elements['welcome_message'])
+            self.wait_for_element_visible('welcome_message')
             return True
         except:
             return False
 
+    @track_page_method
     def get_user_profile_info(self):
         """获取用户资料信息"""
         try:
-            profile_element = self.find_element(self.page_elements['user_profile'])
-            return profile_element.text
+            return self.get_text('user_profile')
         except:
             return None
\ No newline at end of file
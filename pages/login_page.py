@@ -1,69 +1,59 @@
 # pages/login_page.py
 from pages.base_page import BasePage
+from utils.command_metrics import track_page_method
 from selenium.webdriver.common.by import By
-import time
+from utils.wait_engine import WaitConditions
 
 
 class LoginPage(BasePage):
     """登录页面对象"""
 
-    def __init__(self, driver):
-        super().__init__(driver)
-        self.page_elements = {
-            'username_input': [
-                {'type': 'id', 'value': 'username'},
-                {'type': 'name', 'value': 'email'},
-                {'type': 'css', 'value': "input[type='email']"}
-            ],
-            'password_input': [
-                {'type': 'id', 'value': 'password'},
-                {'type': 'name', 'value': 'password'},
-                {'type': 'css', 'value': "input[type='password']"}
-            ],
-            'login_button': [
-                {'type': 'id', 'value': 'loginBtn'},
-                {'type': 'xpath', 'value': "//button[contains(text(), 'Login')]"},
-                {'type': 'css', 'value': "button.login-button"}
-            ],
-            'error_message': [
-                {'type': 'class', 'value': 'error-message'},
-                {'type': 'xpath', 'value': "//div[@class='alert alert-danger']"}
-            ]
-        }
+    page_name = "login_page"
 
+    @track_page_method
     def open_login_page(self, url="/login"):
         """打开登录页面"""
-        full_url = self.driver.current_url.rsplit('/', 1)[0] + url
-        self.driver.get(full_url)
-        self.logger.info(f"打开登录页面: {full_url}")
-        time.sleep(1)  # 等待页面加载
-
+        current_url = self.driver.current_url
+        # 新会话或会话池重置后停留在about:blank，此时使用配置中的base_url
+        if current_url.startswith('http'):
+            base_url = current_url.rsplit('/', 1)[0]
+        else:
+            base_url = self.get_base_url()
+        full_url = base_url.rstrip('/') + url
+        # 按页面加载策略等待文档就绪且登录表单可见
+        self.open(full_url, 'open_login_page', WaitConditions.element_visible(self.page_elements['username_input']))
+        self.logger.info("打开登录页面: %s", full_url)
+
+    @track_page_method
     def enter_username(self, username):
         """输入用户名"""
-        self.input_text(self.page_elements['username_input'], username)
+        self.input_text('username_input', username)
 
+    @track_page_method
     def enter_password(self, password):
         """输入密码"""
-        self.input_text(self.page_elements['password_input'], password)
+        self.input_text('password_input', password)
 
+    @track_page_method
     def click_login_button(self):
         """点击登录按钮"""
-        self.click_element(self.page_elements['login_button'])
+        self.click_element('login_button')
 
+    @track_page_method
     def login(self, username, password):
         """完整登录流程"""
-        self.enter_username(username)
-        self.enter_password(password)
+        self.fill_form({'username_input': username, 'password_input': password})
         self.click_login_button()
 
+    @track_page_method
     def get_error_message(self):
         """获取错误信息"""
         try:
-            error_element = self.find_element(self.page_elements['error_message'])
-            return error_element.text
+            return self.get_text('error_message')
         except:
             return None
 
+    @track_page_method
     def is_login_successful(self):
         """检查是否登录成功（通过URL变化判断）"""
         current_url = self.driver.current_url
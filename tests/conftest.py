@@ -1,12 +1,60 @@
 # tests/conftest.py
 import pytest
 from framework.driver_manager import DriverManager
+from framework.session_pool import SessionPool
 from framework.keyword_engine import KeywordEngine
 from framework.data_driver import DataDriver
-from utils.logger import Logger
+from framework.data_rows_plugin import DataRowsPlugin
+from framework.auth_state import get_auth_state_cache
+from framework.http_driver import HttpDriver
+from framework.network_profiles import get_network_profiles, network_stats
+from framework.page_load import PAGE_LOAD_STRATEGIES, page_load_stats
+from framework.shard_scheduler import DurationStore, ShardScheduler
+from framework.history_store import HistoryStore
+from utils.impact_analysis import ImpactIndex, dependency_recorder, git_changed_files
+from utils.logger import get_logger
+from utils.wait_engine import wait_stats
+from utils.element_cache import element_cache_stats
+from utils.command_metrics import command_metrics
+from utils.artifact_writer import get_artifact_writer
+from utils.video_recorder import get_video_recorder
+from utils.report_generator import get_report_generator
 import allure
+import json
 import os
 
+logger = get_logger()
+
+# 当前进程是否记录原生报告和测试耗时（pytest-xdist主进程为False）
+record_results = True
+duration_store = None
+history_store = None
+impact_index = None
+
+# 数据行展开插件的注册名
+DATA_ROWS_PLUGIN = 'athena_data_rows'
+
+
+def pytest_addoption(parser):
+    """分片参数：各执行节点使用相同的分片数和不同的分片序号；改动选择参数：只运行受改动影响的测试"""
+    parser.addoption("--shard-index", type=int, default=int(os.environ.get('ATHENA_SHARD_INDEX', 0)),
+                     help="当前分片序号，从0开始")
+    parser.addoption("--shard-count", type=int, default=int(os.environ.get('ATHENA_SHARD_COUNT', 1)),
+                     help="分片总数，按历史耗时均衡分配测试")
+    parser.addoption("--changed-since", default=None,
+                     help="git基线（如 origin/main），只运行受基线之后改动影响的测试")
+    parser.addoption("--changed-files", default=None,
+                     help="改动的文件，逗号分隔")
+    parser.addoption("--changed-locators", default=None,
+                     help="改动的元素key，逗号分隔，如 login_page.username_input")
+    parser.addoption("--network-profile", default=None,
+                     help="本次运行默认的网络配置（config.yaml中network.profiles的名称）")
+    parser.addoption("--history-order", action="store_true",
+                     default=os.environ.get('ATHENA_HISTORY_ORDER', '').lower() in ('1', 'true'),
+                     help="按本地历史库失败优先排序：最近失败、失败概率高且耗时短的测试先运行，可配合 --maxfail=N")
+    parser.addoption("--page-load-strategy", default=None, choices=PAGE_LOAD_STRATEGIES,
+                     help="本次运行默认的页面加载策略，覆盖config.yaml中的browser.page_load_strategy")
+
 
 @pytest.fixture(scope="session")
 def driver_manager():
@@ -16,13 +64,111 @@ def driver_manager():
     manager.quit_driver()
 
 
+@pytest.fixture(scope="session", autouse=True)
+def wait_report(driver_manager):
+    """运行结束时输出等待引擎统计，展示相对固定sleep节省的时间"""
+    yield
+    stats_path = (driver_manager.config.get('wait_engine') or {}).get('stats_path', "reports/wait_stats.json")
+    summary = wait_stats.write(stats_path)
+    logger.info("等待引擎统计 - 实际等待: %ss, 原固定等待: %ss, 节省: %ss", summary['total_waited_seconds'],
+                summary['total_legacy_seconds'], summary['total_saved_seconds'])
+    allure.attach(json.dumps(summary, ensure_ascii=False, indent=2), name="Wait Engine Summary",
+                  attachment_type=allure.attachment_type.JSON)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def command_metrics_report(driver_manager):
+    """运行结束时输出WebDriver命令级指标（命令次数、p50/p95/p99延迟）"""
+    yield
+    metrics_config = driver_manager.config.get('metrics') or {}
+    if not metrics_config.get('enabled', True):
+        return
+    summary = command_metrics.write(metrics_config.get('output_path', "reports/command_metrics.json"))
+    chattiest = ", ".join(f"{name}({stats['count']})" for name, stats in command_metrics.chattiest('keyword', 5))
+    logger.info("WebDriver命令统计 - 总数: %s, 命令最多的关键字: %s", summary['total_commands'], chattiest)
+    allure.attach(json.dumps(summary, ensure_ascii=False, indent=2), name="WebDriver Command Metrics",
+                  attachment_type=allure.attachment_type.JSON)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def element_cache_report(driver_manager):
+    """运行结束时输出元素句柄缓存统计（命中率、节省的定位命令数）"""
+    yield
+    cache_config = driver_manager.config.get('element_cache') or {}
+    if not cache_config.get('enabled', True):
+        return
+    summary = element_cache_stats.write(cache_config.get('stats_path', "reports/element_cache_stats.json"))
+    logger.info("元素缓存统计 - 命中: %s, 校验后命中: %s, 未命中: %s, 重新定位: %s, 节省定位命令: %s",
+                summary['hits'], summary['validated_hits'], summary['misses'], summary['re_resolved'],
+                summary['saved_find_commands'])
+
+
+@pytest.fixture(scope="session", autouse=True)
+def page_load_report(driver_manager):
+    """运行结束时输出浏览器启动耗时和各关键字的页面就绪耗时、可交互时间"""
+    yield
+    summary = page_load_stats.write(driver_manager.config['browser'].get('stats_path', "reports/page_load_stats.json"))
+    for name, stats in summary['startup'].items():
+        logger.info("浏览器启动 %s - 次数: %s, 平均: %ss, 配置模板: %s", name, stats['count'], stats['avg_seconds'],
+                    stats['profile_template'])
+    for name, stats in summary['navigations'].items():
+        logger.info("页面加载 %s - 次数: %s, 平均就绪: %ss, 平均可交互: %sms", name, stats['count'],
+                    stats['avg_ready_seconds'], stats['avg_time_to_interactive_ms'])
+    allure.attach(json.dumps(summary, ensure_ascii=False, indent=2), name="Page Load Summary",
+                  attachment_type=allure.attachment_type.JSON)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def network_report():
+    """运行结束时输出网络统计：被屏蔽的请求数和估算节省的流量"""
+    yield
+    profiles = get_network_profiles()
+    if not profiles.collect_stats:
+        return
+    summary = network_stats.write(profiles.stats_path)
+    for name, stats in summary['profiles'].items():
+        logger.info("网络配置 %s - 页面加载: %s, 屏蔽请求: %s (每页 %s), 估算节省: %sKB/页", name, stats['page_loads'],
+                    stats['blocked_requests'], stats['blocked_requests_per_page'], stats['avoided_kb_per_page'])
+    allure.attach(json.dumps(summary, ensure_ascii=False, indent=2), name="Network Profile Summary",
+                  attachment_type=allure.attachment_type.JSON)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def artifact_writer():
+    """失败产物后台写入器，运行结束时等待剩余截图写完"""
+    writer = get_artifact_writer()
+    yield writer
+    writer.close()
+
+
+@pytest.fixture(scope="session")
+def session_pool(driver_manager):
+    """预启动的WebDriver会话池fixture"""
+    pool = SessionPool(driver_manager).start()
+    yield pool
+    pool.close()
+
+
 @pytest.fixture(scope="function")
-def driver(driver_manager):
-    """WebDriver fixture，每个测试函数使用"""
-    driver = driver_manager.get_driver()
+def driver(request, driver_manager):
+    """WebDriver fixture，每个测试函数从会话池借出一个会话；标记browserless的测试使用无浏览器驱动"""
+    if request.node.get_closest_marker('browserless'):
+        driver = driver_manager.build_driver(HttpDriver.name)
+        yield driver
+        driver.quit()
+        return
+
+    # 会话池按需启动，只运行browserless测试时不启动浏览器
+    session_pool = request.getfixturevalue('session_pool')
+    driver = session_pool.checkout()
+    # 标记network_profile的测试切换网络配置，其余测试使用本次运行的默认配置
+    marker = request.node.get_closest_marker('network_profile')
+    network_profiles = get_network_profiles()
+    network_profiles.apply(driver, marker.args[0] if marker else None)
     yield driver
-    # 测试结束后清理
-    driver.delete_all_cookies()
+    network_profiles.collect(driver)
+    # 测试结束后归还，重置全部源的Cookie、存储和窗口
+    session_pool.checkin(driver)
 
 
 @pytest.fixture(scope="function")
@@ -37,25 +183,61 @@ def data_driver():
     return DataDriver()
 
 
+@pytest.fixture(scope="function")
+def data_row(request):
+    """data_rows标记展开的单行测试数据，执行时才从数据集中读取"""
+    return request.config.pluginmanager.get_plugin(DATA_ROWS_PLUGIN).load(request.param)
+
+
+@pytest.fixture(scope="session")
+def auth_state():
+    """登录状态缓存fixture，同一用户在整个运行中只走一次UI登录"""
+    return get_auth_state_cache()
+
+
+@pytest.fixture(scope="function")
+def logged_in_driver(driver, auth_state, data_driver):
+    """已登录的WebDriver fixture，恢复缓存的登录状态，供不测试登录流程本身的用例使用"""
+    credentials = data_driver.get_login_test_data('valid_credentials')[0]
+    auth_state.login(driver, credentials['username'], credentials['password'])
+    return driver
+
+
 @pytest.fixture(autouse=True)
-def setup_test(request, driver):
-    """自动执行的测试设置"""
+def setup_test(request):
+    """自动执行的测试设置，标记unit的测试不借出WebDriver会话"""
     # 在测试开始前执行
     test_name = request.node.name
-    Logger().info(f"开始执行测试: {test_name}")
+    logger.info("开始执行测试: %s", test_name)
+    if request.node.get_closest_marker('unit'):
+        yield
+        logger.info("测试执行完成: %s", test_name)
+        return
+
+    driver = request.getfixturevalue('driver')
+    # 失败录像：帧只保存在内存环形缓冲中，测试失败时才写出
+    video = None if isinstance(driver, HttpDriver) else get_video_recorder().attach(driver)
+    if video:
+        video.begin_test()
 
     yield  # 测试执行
 
     # 在测试结束后执行
-    if request.node.rep_call.failed:
-        # 如果测试失败，截图
-        screenshot_path = os.path.join("reports", "screenshots", f"{test_name}_failure.png")
-        os.makedirs(os.path.dirname(screenshot_path), exist_ok=True)
-        driver.save_screenshot(screenshot_path)
-        Logger().error(f"测试失败，截图已保存: {screenshot_path}")
-        allure.attach.file(screenshot_path, name="Failure Screenshot", attachment_type=allure.attachment_type.PNG)
+    if request.node.rep_call.failed and isinstance(driver, HttpDriver):
+        # 无浏览器驱动无法截图，附加页面源码
+        allure.attach(driver.page_source, name="Failure Page Source", attachment_type=allure.attachment_type.HTML)
+    elif request.node.rep_call.failed:
+        # 如果测试失败，截图；报告中立即附加原始截图，压缩、去重和落盘在后台完成，不阻塞下一个测试
+        screenshot_path = get_artifact_writer().submit_screenshot(
+            driver.get_screenshot_as_png(), f"{test_name}_failure", attach_name="Failure Screenshot")
+        logger.error("测试失败，截图已提交: %s", screenshot_path)
+        if video:
+            video_path = get_video_recorder().save(video, f"{test_name}_failure", attach_name="Failure Video")
+            logger.error("测试失败，最近 %ss 的录像已提交: %s", get_video_recorder().max_seconds, video_path)
+    if video:
+        video.end_test()
 
-    Logger().info(f"测试执行完成: {test_name}")
+    logger.info("测试执行完成: %s", test_name)
 
 
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
@@ -63,4 +245,147 @@ def pytest_runtest_makereport(item, call):
     """钩子函数，用于捕获测试结果"""
     outcome = yield
     rep = outcome.get_result()
-    setattr(item, "rep_" + rep.when, rep)
\ No newline at end of file
+    setattr(item, "rep_" + rep.when, rep)
+    if record_results:
+        history_store.record(rep)
+
+
+def _is_xdist_controller(config):
+    """pytest-xdist主进程只转发worker的结果，不重复记录"""
+    return not hasattr(config, 'workerinput') and bool(getattr(config.option, 'numprocesses', None))
+
+
+def pytest_configure(config):
+    """注册标记，并标记当前进程是否负责记录原生报告和测试耗时"""
+    global record_results, duration_store, history_store, impact_index
+    config.addinivalue_line("markers", "browserless: 使用不执行JavaScript的HttpDriver运行，无需启动浏览器")
+    config.addinivalue_line("markers", "unit: 框架组件的单元测试，不使用WebDriver会话")
+    config.addinivalue_line("markers", "network_profile(name): 使用指定的网络配置（屏蔽资源、模拟弱网）运行")
+    config.addinivalue_line("markers", "data_rows(path, id_field=None, where=None, source=None): "
+                                       "按DataDriver数据集逐行展开为独立的测试项，配合data_row fixture使用")
+    if not config.pluginmanager.has_plugin(DATA_ROWS_PLUGIN):
+        config.pluginmanager.register(DataRowsPlugin(), DATA_ROWS_PLUGIN)
+    if config.getoption("--page-load-strategy"):
+        # 配置注册表按环境变量覆盖browser.page_load_strategy，pytest-xdist的worker使用相同的命令行参数
+        os.environ['ATHENA_PAGE_LOAD_STRATEGY'] = config.getoption("--page-load-strategy")
+    if config.getoption("--network-profile"):
+        network_profiles = get_network_profiles()
+        network_profiles.default_profile = config.getoption("--network-profile")
+        try:
+            network_profiles.resolve()
+        except ValueError as e:
+            raise pytest.UsageError(str(e))
+    record_results = not _is_xdist_controller(config)
+    duration_store = DurationStore()
+    history_store = HistoryStore()
+    if config.getoption("--history-order") and not config.option.maxfail:
+        # 未指定--maxfail时使用配置的失败数上限，尽早结束已确定失败的构建
+        config.option.maxfail = history_store.max_failures
+    impact_index = ImpactIndex()
+
+
+def pytest_collection_modifyitems(config, items):
+    """先按改动选择受影响的测试，再对结果分片，最后按历史失败优先排序"""
+    _select_changed(config, items)
+    _select_shard(config, items)
+    _order_by_history(config, items)
+
+
+def _deselect(config, items, selected):
+    """只保留选中的测试"""
+    selected_ids = {id(item) for item in selected}
+    deselected = [item for item in items if id(item) not in selected_ids]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+
+def _select_changed(config, items):
+    """按依赖索引只保留受改动影响的测试，索引缺失或过期时保留全部"""
+    base_ref = config.getoption("--changed-since")
+    changed_files = [path for path in (config.getoption("--changed-files") or '').split(',') if path]
+    changed_locators = [key for key in (config.getoption("--changed-locators") or '').split(',') if key]
+    if not (base_ref or changed_files or changed_locators):
+        return
+
+    if base_ref:
+        changed_files += git_changed_files(base_ref, str(config.rootpath))
+    selected_ids, reason = impact_index.select([item.nodeid for item in items], changed_files,
+                                               changed_locators, base_ref)
+    selected_ids = set(selected_ids)
+    _deselect(config, items, [item for item in items if item.nodeid in selected_ids])
+    logger.info("改动选择: %s", reason)
+
+
+def _select_shard(config, items):
+    """按历史耗时做LPT分片，只保留当前分片的测试（参数化的每组数据都是独立的调度单元）"""
+    shard_index = config.getoption("--shard-index")
+    shard_count = config.getoption("--shard-count")
+    if shard_count <= 1:
+        return
+    if not 0 <= shard_index < shard_count:
+        raise pytest.UsageError(f"无效的分片参数: --shard-index={shard_index} --shard-count={shard_count}")
+
+    scheduler = ShardScheduler(duration_store.load(os.environ.get('ATHENA_RUN_ID')),
+                               duration_store.default_duration)
+    assignment, loads = scheduler.assign([item.nodeid for item in items], shard_count)
+
+    selected = [item for item in items if assignment[item.nodeid] == shard_index]
+    _deselect(config, items, selected)
+    logger.info("分片 %s/%s: %s 个测试, 预估 %.1fs (各分片预估: %s)", shard_index + 1, shard_count,
+                len(selected), loads[shard_index], [round(load, 1) for load in loads])
+
+
+def _order_by_history(config, items):
+    """失败优先：最近失败的测试最先运行，其余按单位时间的失败概率降序，构建损坏时在运行开始阶段即可发现"""
+    if not config.getoption("--history-order"):
+        return
+    ordered, stats = history_store.prioritize([item.nodeid for item in items])
+    by_nodeid = {item.nodeid: item for item in items}
+    items[:] = [by_nodeid[nodeid] for nodeid in ordered]
+
+    recently_failed = [nodeid for nodeid in ordered if nodeid in stats and stats[nodeid].last_failed]
+    logger.info("历史排序: %s 个测试, 最近失败 %s 个, 无历史 %s 个, 失败数上限: %s", len(ordered),
+                len(recently_failed), len([nodeid for nodeid in ordered if nodeid not in stats]),
+                config.option.maxfail or '不限')
+    for nodeid in ordered[:5]:
+        entry = stats.get(nodeid)
+        if entry:
+            logger.info("  %s - 失败概率: %s, 不稳定度: %s, 平均耗时: %ss", nodeid, entry.failure_probability,
+                        entry.flakiness, entry.duration)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """记录测试（含fixture）执行期间用到的关键字、页面方法、元素key和数据，写入依赖索引"""
+    if not record_results:
+        yield
+        return
+    dependency_recorder.start()
+    try:
+        yield
+    finally:
+        impact_index.record(item.nodeid, dependency_recorder.stop())
+
+
+def pytest_runtest_logreport(report):
+    """测试结果到达时写入原生报告：call阶段的结果，以及setup/teardown阶段的失败和跳过"""
+    if not record_results:
+        return
+    duration_store.record(report.nodeid, report.duration)
+    if report.when == 'call' or report.failed or (report.when == 'setup' and report.skipped):
+        if report.when != 'call' and report.failed:
+            outcome = 'error'
+        else:
+            outcome = report.outcome
+        message = report.longreprtext if report.failed else None
+        get_report_generator().record_test(report.nodeid, outcome, report.duration, report.when, message)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """写出本worker的汇总并合并生成HTML摘要"""
+    if record_results and not session.config.option.collectonly:
+        duration_store.flush()
+        history_store.flush()
+        impact_index.flush()
+        get_report_generator().finish()
@@ -0,0 +1,130 @@
+# tests/test_async_http_connection.py
+import pytest
+from framework.async_executor import AsyncHttpConnection, AsyncSession
+from utils.element_locator import LOCATE_SCRIPT
+import allure
+import asyncio
+import json
+
+pytestmark = pytest.mark.unit
+
+
+class FakeEndpoint:
+    """
+    本地假WebDriver端点：按plan逐个处理请求并记录收到的请求行。
+    ok 正常响应并保持连接；ok-close 响应后关闭连接（模拟空闲超时）；drop 读完请求后不响应直接关闭
+    """
+
+    def __init__(self, plan):
+        self.plan = list(plan)
+        self.requests = []
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, '127.0.0.1', 0)
+        return f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    if name.strip().lower() == 'content-length':
+                        length = int(value)
+                await reader.readexactly(length)
+                self.requests.append(request_line.decode('latin-1').split()[0])
+
+                action = self.plan.pop(0)
+                if action == 'drop':
+                    return
+                body = json.dumps({'value': len(self.requests)}).encode('utf-8')
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+                await writer.drain()
+                if action == 'ok-close':
+                    return
+        finally:
+            writer.close()
+
+
+def run_against(plan, scenario):
+    """启动假端点并运行scenario(连接, 端点)，返回端点收到的请求方法列表"""
+
+    async def main():
+        endpoint = FakeEndpoint(plan)
+        connection = AsyncHttpConnection(await endpoint.start(), timeout=5)
+        try:
+            await scenario(connection, endpoint)
+        finally:
+            await connection.close()
+            await endpoint.stop()
+        return endpoint.requests
+
+    return asyncio.run(main())
+
+
+@allure.feature("异步执行器")
+class TestAsyncHttpConnection:
+    """复用长连接断开时的重试规则"""
+
+    def test_idle_close_detected_before_write_retries_post(self):
+        """端点关闭空闲连接后，非幂等请求尚未写出，重连后发送一次"""
+
+        async def scenario(connection, endpoint):
+            await connection.request('GET', '/status')
+            await asyncio.sleep(0.05)
+            status, response = await connection.request('POST', '/session/1/element/2/click')
+            assert (status, response) == (200, {'value': 2})
+
+        assert run_against(['ok-close', 'ok'], scenario) == ['GET', 'POST']
+
+    def test_idempotent_request_retried_after_drop(self):
+        async def scenario(connection, endpoint):
+            await connection.request('GET', '/status')
+            status, response = await connection.request('GET', '/session/1/url')
+            assert response == {'value': 3}
+
+        assert run_against(['ok', 'drop', 'ok'], scenario) == ['GET', 'GET', 'GET']
+
+    def test_non_idempotent_request_not_retried_after_write(self):
+        """点击请求已写出后连接断开：端点可能已执行，不重发"""
+
+        async def scenario(connection, endpoint):
+            await connection.request('GET', '/status')
+            with pytest.raises(ConnectionError):
+                await connection.request('POST', '/session/1/element/2/click')
+
+        assert run_against(['ok', 'drop'], scenario) == ['GET', 'POST']
+
+    def test_fresh_connection_not_retried(self):
+        async def scenario(connection, endpoint):
+            with pytest.raises(ConnectionError):
+                await connection.request('GET', '/status')
+
+        assert run_against(['drop'], scenario) == ['GET']
+
+    def test_read_only_script_retried(self):
+        """框架内只读的定位脚本可安全重发，普通脚本不重发"""
+
+        async def scenario(connection, endpoint):
+            session = AsyncSession.__new__(AsyncSession)
+            session.connection = connection
+            session.session_id = '1'
+            session.record_metrics = False
+            await connection.request('GET', '/status')
+            assert await session.execute_script(LOCATE_SCRIPT, [], True) == 3
+            with pytest.raises(ConnectionError):
+                await session.execute_script("document.querySelector('form').submit()")
+
+        assert run_against(['ok', 'drop', 'ok', 'drop'], scenario) == ['GET', 'POST', 'POST', 'POST']
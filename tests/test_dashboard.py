@@ -0,0 +1,36 @@
+# tests/test_dashboard.py
+import pytest
+from pages.dashboard_page import DashboardPage
+import allure
+
+
+@allure.feature("仪表板功能")
+class TestDashboard:
+    """仪表板功能测试（通过恢复登录状态进入，不重复走登录流程）"""
+
+    @allure.story("仪表板加载")
+    def test_dashboard_loaded(self, logged_in_driver):
+        """测试登录后仪表板正确加载"""
+        dashboard_page = DashboardPage(logged_in_driver)
+
+        with allure.step("验证仪表板已加载"):
+            assert dashboard_page.verify_dashboard_loaded(), "仪表板页面未正确加载"
+
+        with allure.step("验证欢迎信息"):
+            welcome_message = dashboard_page.get_welcome_message()
+            assert welcome_message and 'Welcome' in welcome_message, f"欢迎信息不正确: {welcome_message}"
+
+    @allure.story("用户资料")
+    def test_user_profile_info(self, logged_in_driver):
+        """测试仪表板显示用户资料"""
+        dashboard_page = DashboardPage(logged_in_driver)
+
+        with allure.step("获取用户资料信息"):
+            profile_info = dashboard_page.get_user_profile_info()
+
+        with allure.step("验证用户资料"):
+            assert profile_info, "未找到用户资料信息"
+
+
+if __name__ == "__main__":
+    pytest.main(['-v', __file__])
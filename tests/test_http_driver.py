@@ -0,0 +1,182 @@
+# tests/test_http_driver.py
+import pytest
+from urllib.parse import urlsplit, parse_qs
+from selenium.webdriver.common.by import By
+from benchmarks.standin_app import StandinApp
+from config.registry import get_page_elements
+from framework.http_driver import HttpDriver, parse_html, select_css, select_xpath
+import allure
+
+pytestmark = pytest.mark.unit
+
+# 覆盖test_data.yaml中定位器形式的页面片段
+PAGE_SOURCE = """<!DOCTYPE html>
+<html><body>
+<form id="loginForm" method="post" action="/login">
+  <input name="email" type="email">
+  <input name="password" type="password">
+  <button class="login-button primary" type="submit">  Login now </button>
+</form>
+<div class="alert alert-danger">用户名或密码错误</div>
+<div class="alert alert-danger extra">附加样式的提示</div>
+<h1 class="welcome-message">Welcome, admin</h1>
+<a href="/logout">退出</a>
+<a href="/help">Help</a>
+</body></html>
+"""
+
+
+def locator_value(page_name, key, locator_type):
+    """test_data.yaml中元素指定类型的定位值"""
+    return next(locator['value'] for locator in get_page_elements(page_name)[key] if locator['type'] == locator_type)
+
+
+def texts(nodes):
+    return [' '.join(node.text_content().split()) for node in nodes]
+
+
+@pytest.fixture(scope="module")
+def document():
+    return parse_html(PAGE_SOURCE)
+
+
+@pytest.fixture(scope="module")
+def standin_app():
+    """本地替身应用，登录表单直接提交（不走Ajax）"""
+    app = StandinApp(ajax_delay=-1).start()
+    yield app
+    app.stop()
+
+
+@pytest.fixture
+def http_driver():
+    driver = HttpDriver(timeout=5, record_metrics=False)
+    yield driver
+    driver.quit()
+
+
+@allure.feature("无浏览器驱动")
+class TestSelectors:
+    """CSS选择器与XPath子集"""
+
+    def test_css_attribute_selector(self, document):
+        nodes = select_css(document, locator_value('login_page', 'username_input', 'css'))
+        assert [node.attrs['name'] for node in nodes] == ['email']
+
+    def test_css_tag_and_class_selector(self, document):
+        nodes = select_css(document, locator_value('login_page', 'login_button', 'css'))
+        assert texts(nodes) == ['Login now']
+        assert select_css(document, 'button.logout-btn') == []
+
+    def test_xpath_contains_text(self, document):
+        nodes = select_xpath(document, locator_value('login_page', 'login_button', 'xpath'))
+        assert texts(nodes) == ['Login now']
+        nodes = select_xpath(document, locator_value('dashboard_page', 'welcome_message', 'xpath'))
+        assert texts(nodes) == ['Welcome, admin']
+
+    def test_xpath_class_equality_is_exact(self, document):
+        """@class= 比较整个属性值，多出一个类名的元素不匹配"""
+        nodes = select_xpath(document, locator_value('login_page', 'error_message', 'xpath'))
+        assert texts(nodes) == ['用户名或密码错误']
+
+    def test_xpath_or(self, document):
+        nodes = select_xpath(document, locator_value('dashboard_page', 'logout_button', 'xpath'))
+        assert [node.attrs['href'] for node in nodes] == ['/logout']
+        nodes = select_xpath(document, "//a[contains(text(), 'Help') or contains(text(), '退出')]")
+        assert [node.attrs['href'] for node in nodes] == ['/logout', '/help']
+
+    def test_locate_uses_fallback_strategies(self, http_driver):
+        """首选策略不匹配时按顺序回退，返回命中的策略序号"""
+        http_driver.page_source = PAGE_SOURCE
+        http_driver.document = parse_html(PAGE_SOURCE)
+        strategies = [[locator['type'], locator['value']]
+                      for locator in get_page_elements('login_page')['username_input']]
+        index, element = http_driver.locate(strategies, require_visible=True)
+        assert index == 1
+        assert element.get_attribute('name') == 'email'
+
+
+@allure.feature("无浏览器驱动")
+class TestFormsAndCookies:
+    """表单提交与Cookie往返"""
+
+    def test_submit_login_form(self, http_driver, standin_app, data_driver):
+        credentials = data_driver.get_login_test_data('valid_credentials')[0]
+        http_driver.get(f"{standin_app.base_url}/login")
+        http_driver.find_element(By.ID, 'username').send_keys(credentials['username'])
+        http_driver.find_element(By.ID, 'password').send_keys(credentials['password'])
+        http_driver.find_element(By.ID, 'loginBtn').click()
+
+        # POST后303重定向到仪表板
+        assert urlsplit(http_driver.current_url).path == '/dashboard'
+        assert http_driver.find_element(By.CLASS_NAME, 'welcome-message').text == \
+            f"Welcome, {credentials['username']}"
+
+    def test_submit_invalid_login_renders_error(self, http_driver, standin_app):
+        http_driver.get(f"{standin_app.base_url}/login")
+        http_driver.find_element(By.ID, 'username').send_keys('invalid@example.com')
+        http_driver.find_element(By.ID, 'password').send_keys('wrongpass')
+        http_driver.find_element(By.ID, 'loginBtn').click()
+
+        assert http_driver.status_code == 401
+        error = http_driver.find_element(By.CLASS_NAME, 'error-message')
+        assert error.is_displayed()
+        assert error.text == '用户名或密码错误'
+
+    def test_submit_get_form_serializes_controls(self, http_driver, standin_app):
+        """GET表单按文档顺序序列化：未勾选的复选框、禁用控件和未触发的提交按钮不提交"""
+        http_driver.get(f"{standin_app.base_url}/login")
+        http_driver.document = parse_html("""
+            <form action="/search" method="get">
+              <input name="q" value="athena">
+              <input type="checkbox" name="exact" value="1" checked>
+              <input type="checkbox" name="archived" value="1">
+              <input name="disabled" value="x" disabled>
+              <select name="sort"><option value="new">New</option><option value="old" selected>Old</option></select>
+              <textarea name="note">a b</textarea>
+              <button name="go" value="search" type="submit">Search</button>
+              <button name="other" value="reset" type="submit">Other</button>
+            </form>
+        """)
+        http_driver.find_element(By.NAME, 'go').click()
+
+        url = urlsplit(http_driver.current_url)
+        assert url.path == '/search'
+        assert parse_qs(url.query) == {'q': ['athena'], 'exact': ['1'], 'sort': ['old'], 'note': ['a b'],
+                                       'go': ['search']}
+
+    def test_session_cookie_round_trip(self, http_driver, standin_app, data_driver):
+        """登录得到的HttpOnly会话Cookie可以导出并写入另一个会话，清除后访问仪表板重定向到登录页"""
+        credentials = data_driver.get_login_test_data('valid_credentials')[0]
+        http_driver.get(f"{standin_app.base_url}/login")
+        http_driver.find_element(By.ID, 'username').send_keys(credentials['username'])
+        http_driver.find_element(By.ID, 'password').send_keys(credentials['password'])
+        http_driver.find_element(By.ID, 'loginBtn').click()
+
+        cookie = http_driver.get_cookie(StandinApp.SESSION_COOKIE)
+        assert cookie is not None and cookie['httpOnly']
+
+        other = HttpDriver(timeout=5, record_metrics=False)
+        try:
+            other.get(f"{standin_app.base_url}/login")
+            other.add_cookie({'name': cookie['name'], 'value': cookie['value'], 'path': '/', 'httpOnly': True})
+            other.get(f"{standin_app.base_url}/dashboard")
+            assert urlsplit(other.current_url).path == '/dashboard'
+            assert other.get_cookie(StandinApp.SESSION_COOKIE)['value'] == cookie['value']
+
+            other.delete_all_cookies()
+            other.get(f"{standin_app.base_url}/dashboard")
+            assert urlsplit(other.current_url).path == '/login'
+        finally:
+            other.quit()
+
+    def test_logout_expires_session_cookie(self, http_driver, standin_app, data_driver):
+        credentials = data_driver.get_login_test_data('valid_credentials')[0]
+        http_driver.get(f"{standin_app.base_url}/login")
+        http_driver.find_element(By.ID, 'username').send_keys(credentials['username'])
+        http_driver.find_element(By.ID, 'password').send_keys(credentials['password'])
+        http_driver.find_element(By.ID, 'loginBtn').click()
+
+        http_driver.find_element(By.ID, 'logout').click()
+        assert urlsplit(http_driver.current_url).path == '/login'
+        assert http_driver.get_cookie(StandinApp.SESSION_COOKIE) is None
@@ -24,16 +24,12 @@ class TestLogin:
         with allure.step("验证登录成功"):
             keyword_engine.execute_keyword('verify_login_success', {'expected_text': 'Welcome'})
 
-    @pytest.mark.parametrize("credentials", [
-        {"username": "invalid@example.com", "password": "wrongpass", "expected_result": "failure"},
-        {"username": "", "password": "", "expected_result": "failure"},
-        {"username": "nonexistent@user.com", "password": "anypassword", "expected_result": "failure"}
-    ])
+    @pytest.mark.data_rows(path='login_test_data.invalid_credentials', id_field='username')
     @allure.story("无效登录凭据")
-    def test_invalid_login(self, keyword_engine, data_driver, credentials):
-        """测试无效凭据登录"""
-        username = credentials['username']
-        password = credentials['password']
+    def test_invalid_login(self, keyword_engine, data_row):
+        """测试无效凭据登录，invalid_credentials的每行数据是一个测试项"""
+        username = data_row['username']
+        password = data_row['password']
 
         with allure.step(f"使用无效凭据登录: {username}"):
             keyword_engine.execute_keyword('open_login_page', {'url': '/login'})
@@ -46,6 +42,24 @@ class TestLogin:
             # 具体实现取决于应用的错误处理方式
             pass
 
+    @pytest.mark.browserless
+    @allure.story("无效登录凭据")
+    def test_invalid_login_error_message(self, keyword_engine, data_driver):
+        """测试无效凭据登录后显示错误信息（服务端渲染的校验信息，无需浏览器）"""
+        credentials = data_driver.get_login_test_data('invalid_credentials')[0]
+
+        with allure.step(f"使用无效凭据登录: {credentials['username']}"):
+            keyword_engine.execute_keyword('open_login_page', {'url': '/login'})
+            keyword_engine.execute_keyword('fill_form', {'fields': {
+                'username_input': credentials['username'],
+                'password_input': credentials['password']
+            }})
+            keyword_engine.execute_keyword('click_login', {})
+
+        with allure.step("验证错误信息"):
+            error_message = keyword_engine.login_page.get_error_message()
+            assert error_message, "未显示登录错误信息"
+
     @allure.story("登录流程完整场景")
     def test_login_logout_scenario(self, keyword_engine, data_driver):
         """测试完整的登录-使用-退出场景"""
@@ -67,30 +81,24 @@ class TestLogin:
         with allure.step("执行退出登录"):
             keyword_engine.execute_keyword('click_logout', {})
 
+    @pytest.mark.data_rows(path='login_test_data.valid_credentials', id_field='username')
     @allure.story("数据驱动登录测试")
-    def test_data_driven_login(self, keyword_engine, data_driver):
-        """数据驱动的登录测试"""
-        valid_logins = data_driver.get_login_test_data('valid_credentials')
-
-        for i, credentials in enumerate(valid_logins):
-            with allure.step(f"数据驱动测试 - 案例 {i + 1}"):
-                username = credentials['username']
-                password = credentials['password']
-
-                # 打开登录页面
-                keyword_engine.execute_keyword('open_login_page', {'url': '/login'})
-
-                # 输入凭据并登录
-                keyword_engine.execute_keyword('fill_username', {'value': username})
-                keyword_engine.execute_keyword('fill_password', {'value': password})
-                keyword_engine.execute_keyword('click_login', {})
+    def test_data_driven_login(self, keyword_engine, data_row):
+        """数据驱动的登录测试，valid_credentials的每行数据是一个测试项，可单独选择、重试并分发到不同worker"""
+        with allure.step(f"数据驱动测试 - {data_row['username']}"):
+            # 打开登录页面
+            keyword_engine.execute_keyword('open_login_page', {'url': '/login'})
 
-                # 验证登录成功
-                keyword_engine.execute_keyword('verify_login_success', {'expected_text': 'Welcome'})
+            # 输入凭据并登录
+            keyword_engine.execute_keyword('fill_username', {'value': data_row['username']})
+            keyword_engine.execute_keyword('fill_password', {'value': data_row['password']})
+            keyword_engine.execute_keyword('click_login', {})
 
-                # 退出登录以便下一次测试
-                keyword_engine.execute_keyword('click_logout', {})
+            # 验证登录成功
+            keyword_engine.execute_keyword('verify_login_success', {'expected_text': 'Welcome'})
 
+            # 退出登录
+            keyword_engine.execute_keyword('click_logout', {})
 
 if __name__ == "__main__":
     pytest.main(['-v', __file__])
\ No newline at end of file
@@ -0,0 +1,138 @@
+# utils/adaptive_wait.py
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+from contextlib import contextmanager
+from contextvars import ContextVar
+from config.registry import load_config
+import time
+
+
+# 当前关键字的等待预算，关键字内的全部等待共用
+current_budget = ContextVar('current_wait_budget', default=None)
+
+
+class PollSchedule:
+    """自适应退避轮询间隔：条件通常很快满足，开始时密集轮询，之后逐渐放慢以减少命令往返"""
+
+    def __init__(self, config_path="config/config.yaml"):
+        config = load_config(config_path)
+        wait_config = config.get('wait_engine') or {}
+        self.initial = wait_config.get('initial_poll_interval', 0.05)
+        self.backoff = wait_config.get('poll_backoff', 1.5)
+        # 最大轮询间隔取元素定位配置的轮询频率
+        self.maximum = max(self.initial, (config.get('element_locator') or {}).get('polling_frequency', 0.5))
+
+    def intervals(self):
+        """依次产生轮询间隔"""
+        interval = self.initial
+        while True:
+            yield interval
+            interval = min(interval * self.backoff, self.maximum)
+
+
+_poll_schedule = None
+
+
+def get_poll_schedule():
+    """获取进程内共享的轮询间隔配置"""
+    global _poll_schedule
+    if _poll_schedule is None:
+        _poll_schedule = PollSchedule()
+    return _poll_schedule
+
+
+class WaitBudget:
+    """关键字的等待预算：关键字内的定位、可点击、完成条件等等待共用一个截止时间，不再逐个叠加超时"""
+
+    def __init__(self, keyword, seconds):
+        self.keyword = keyword
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+
+    def remaining(self):
+        """剩余时间（秒）"""
+        return max(0.0, self.deadline - time.monotonic())
+
+
+def budget_for(keyword, config_path="config/config.yaml"):
+    """关键字的等待预算（秒），未单独配置时取默认预算"""
+    wait_config = load_config(config_path).get('wait_engine') or {}
+    return (wait_config.get('keyword_budgets') or {}).get(keyword, wait_config.get('default_budget', 20))
+
+
+@contextmanager
+def wait_budget(keyword):
+    """在关键字执行期间启用等待预算，嵌套执行的关键字共用最外层的预算"""
+    if current_budget.get() is not None:
+        yield current_budget.get()
+        return
+    budget = WaitBudget(keyword, budget_for(keyword))
+    token = current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        current_budget.reset(token)
+
+
+def budgeted_timeout(timeout):
+    """等待超时时间不超过当前关键字剩余的预算"""
+    budget = current_budget.get()
+    return timeout if budget is None else min(timeout, budget.remaining())
+
+
+class AdaptiveWait(WebDriverWait):
+    """
+    统一的显式等待：按自适应退避间隔轮询，超时时间不超过当前关键字剩余的等待预算。
+    隐式等待固定为0，等待时间只由这里决定
+    """
+
+    def __init__(self, driver, timeout, ignored_exceptions=None):
+        super().__init__(driver, timeout, ignored_exceptions=ignored_exceptions)
+        # 最近一次until的条件检查次数
+        self.polls = 0
+
+    def until(self, method, message=''):
+        """轮询条件直到返回真值，超时抛出TimeoutException"""
+        screen = None
+        stacktrace = None
+        timeout = budgeted_timeout(self._timeout)
+        end_time = time.monotonic() + timeout
+        self.polls = 0
+
+        for interval in get_poll_schedule().intervals():
+            self.polls += 1
+            try:
+                value = method(self._driver)
+                if value:
+                    return value
+            except self._ignored_exceptions as exc:
+                screen = getattr(exc, 'screen', None)
+                stacktrace = getattr(exc, 'stacktrace', None)
+            remaining = end_time - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+
+        budget = current_budget.get()
+        if budget is not None and timeout < self._timeout:
+            message = message or f"关键字 {budget.keyword} 的等待预算 {budget.seconds}s 已用完"
+        raise TimeoutException(message, screen, stacktrace)
+
+    def until_not(self, method, message=''):
+        """轮询条件直到返回假值，条件抛出被忽略的异常也视为满足（与WebDriverWait一致）"""
+        end_time = time.monotonic() + budgeted_timeout(self._timeout)
+        self.polls = 0
+
+        for interval in get_poll_schedule().intervals():
+            self.polls += 1
+            try:
+                value = method(self._driver)
+                if not value:
+                    return value
+            except self._ignored_exceptions:
+                return True
+            remaining = end_time - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+        raise TimeoutException(message)
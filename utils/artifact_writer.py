@@ -0,0 +1,325 @@
+# utils/artifact_writer.py
+from utils.logger import get_logger
+from config.registry import load_config
+import allure
+import threading
+import zipfile
+import hashlib
+import pathlib
+import shutil
+import atexit
+import queue
+import io
+import os
+import re
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow为可选依赖，未安装时保留原始PNG，只做精确去重
+    Image = None
+
+
+class ArtifactWriter:
+    """
+    失败产物后台写入器：测试线程只负责取截图字节并立即附加到Allure报告（截图附加原始PNG，录像附加文件引用），
+    压缩编码、去重和落盘都在后台线程完成，并受单次运行的磁盘预算约束，测试线程从不等待后台写入
+    """
+
+    # Pillow可用时支持的输出格式 -> Pillow格式名
+    FORMATS = {
+        'png': 'PNG',
+        'jpg': 'JPEG'
+    }
+
+    def __init__(self, config_path="config/config.yaml"):
+        self.logger = get_logger()
+        config = load_config(config_path)
+        artifact_config = config.get('artifacts') or {}
+
+        self.output_dir = artifact_config.get('path') or (config.get('environment') or {}).get(
+            'screenshot_path', "reports/screenshots/")
+        self.max_bytes = int(artifact_config.get('max_disk_mb', 200) * 1024 * 1024)
+        self.max_width = artifact_config.get('max_width', 1280)
+        self.quality = artifact_config.get('quality', 75)
+        self.near_duplicate_distance = artifact_config.get('near_duplicate_distance', 4)
+
+        image_format = artifact_config.get('format', 'jpg') if Image else 'png'
+        self.extension = image_format if image_format in self.FORMATS else 'png'
+        self.pillow_format = self.FORMATS[self.extension]
+
+        self.bytes_written = 0
+        self.stats = {'submitted': 0, 'written': 0, 'duplicates': 0, 'near_duplicates': 0, 'dropped': 0,
+                      'videos': 0}
+
+        self._lock = threading.Lock()
+        self._hashes = {}
+        self._fingerprints = []
+        self._budget_exhausted = False
+        self._queue = queue.Queue(maxsize=artifact_config.get('queue_size', 100))
+        self._worker = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def submit_screenshot(self, png_bytes, name, attach_name=None):
+        """
+        提交一张截图（在测试线程调用，立即返回）
+        :param png_bytes: driver.get_screenshot_as_png() 返回的原始字节
+        :param name: 文件名（不含扩展名）
+        :param attach_name: Allure附件名称，为None时不附加到报告
+        :return: 截图文件路径（后台写入完成后可用；与已有截图相同时返回已有文件）
+        """
+        name = re.sub(r'[^\w.-]', '_', name)
+        digest = hashlib.sha256(png_bytes).hexdigest()
+
+        with self._lock:
+            self.stats['submitted'] += 1
+            original = self._hashes.get(digest)
+            budget_exhausted = self._budget_exhausted
+
+        # 完全相同的截图不再编码和落盘，报告中只记录指向已有截图的说明
+        if original:
+            with self._lock:
+                self.stats['duplicates'] += 1
+            self._attach_note(attach_name, f"与已保存截图完全相同: {original}")
+            return original
+
+        if budget_exhausted:
+            with self._lock:
+                self.stats['dropped'] += 1
+            self._attach_note(attach_name, "截图已丢弃: 超出本次运行的磁盘预算")
+            return None
+
+        if attach_name:
+            # 报告中直接附加已在内存中的原始PNG，不等待后台编码
+            allure.attach(png_bytes, name=attach_name, attachment_type=allure.attachment_type.PNG)
+            with self._lock:
+                self.bytes_written += len(png_bytes)
+
+        filepath = os.path.join(self.output_dir, f"{name}.{self.extension}")
+        try:
+            self._queue.put_nowait((self._write, (png_bytes, digest, filepath)))
+        except queue.Full:
+            with self._lock:
+                self.stats['dropped'] += 1
+            self.logger.warning("产物写入队列已满，丢弃截图: %s", name)
+            return None
+
+        with self._lock:
+            self._hashes[digest] = filepath
+        return filepath
+
+    def submit_video(self, frames, name, attach_name=None):
+        """
+        提交失败录像的帧（在测试线程调用，立即返回），编码在后台线程完成
+        :param frames: [(时间, 图像字节), ...]，从旧到新
+        :param name: 文件名（不含扩展名）
+        :param attach_name: Allure附件名称，为None时不附加到报告
+        :return: 录像文件路径（后台写入完成后可用）
+        """
+        name = re.sub(r'[^\w.-]', '_', name)
+        extension = 'gif' if Image else 'zip'
+        if self._budget_exhausted:
+            with self._lock:
+                self.stats['dropped'] += 1
+            self._attach_note(attach_name, "录像已丢弃: 超出本次运行的磁盘预算")
+            return None
+
+        filepath = os.path.join(self.output_dir, f"{name}.{extension}")
+        try:
+            self._queue.put_nowait((self._write_video, (frames, filepath)))
+        except queue.Full:
+            with self._lock:
+                self.stats['dropped'] += 1
+            self.logger.warning("产物写入队列已满，丢弃录像: %s", name)
+            self._attach_note(attach_name, "录像已丢弃: 产物写入队列已满")
+            return None
+
+        if attach_name:
+            # GIF编码耗时较长，报告中附加指向后台写出文件的引用
+            allure.attach(pathlib.Path(filepath).resolve().as_uri(), name=attach_name,
+                          attachment_type=allure.attachment_type.URI_LIST)
+        return filepath
+
+    def flush(self):
+        """等待队列中的产物全部写入"""
+        self._queue.join()
+
+    def close(self):
+        """写完剩余产物并停止后台线程"""
+        if self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join()
+            self.logger.info("失败产物统计: %s, 写入 %.1fMB", self.stats, self.bytes_written / 1024 / 1024)
+
+    def _run(self):
+        """后台线程：逐个处理队列中的截图和录像"""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                handler, args = item
+                handler(*args)
+            except Exception as e:
+                self.logger.error("写入失败产物异常: %s", str(e))
+            finally:
+                self._queue.task_done()
+
+    def _write(self, png_bytes, digest, filepath):
+        """编码压缩、近似去重并落盘"""
+        data, fingerprint = self._encode(png_bytes)
+
+        similar = self._find_similar(fingerprint)
+        if similar:
+            # 近似重复帧（如级联失败停留在同一页面）复用已有文件，不额外占用磁盘
+            with self._lock:
+                self.stats['near_duplicates'] += 1
+                self._hashes[digest] = similar
+            self._link(similar, filepath)
+            return
+
+        size = len(data)
+        with self._lock:
+            if self.bytes_written + size > self.max_bytes:
+                self._budget_exhausted = True
+                self.stats['dropped'] += 1
+                self._hashes.pop(digest, None)
+                data = None
+            else:
+                self.bytes_written += size
+                self.stats['written'] += 1
+
+        if data is None:
+            self.logger.warning("超出失败产物磁盘预算 %.0fMB，丢弃截图: %s", self.max_bytes / 1024 / 1024, filepath)
+            return
+
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        temp_path = f"{filepath}.tmp"
+        with open(temp_path, 'wb') as file:
+            file.write(data)
+        os.replace(temp_path, filepath)
+        if fingerprint is not None:
+            self._fingerprints.append((fingerprint, filepath))
+        self.logger.info("截图已保存: %s", filepath)
+
+    def _write_video(self, frames, filepath):
+        """编码失败录像并落盘，与截图共用本次运行的磁盘预算"""
+        data = self._encode_video(frames) if Image else self._zip_frames(frames)
+
+        size = len(data)
+        with self._lock:
+            if self.bytes_written + size > self.max_bytes:
+                self._budget_exhausted = True
+                self.stats['dropped'] += 1
+                data = None
+            else:
+                self.bytes_written += size
+                self.stats['videos'] += 1
+
+        if data is None:
+            self.logger.warning("超出失败产物磁盘预算 %.0fMB，丢弃录像: %s", self.max_bytes / 1024 / 1024, filepath)
+            return
+
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        temp_path = f"{filepath}.tmp"
+        with open(temp_path, 'wb') as file:
+            file.write(data)
+        os.replace(temp_path, filepath)
+        self.logger.info("失败录像已保存: %s, %s 帧", filepath, len(frames))
+
+    def _encode_video(self, frames):
+        """按帧间实际间隔编码为循环播放的GIF，帧宽度不超过max_width"""
+        images = []
+        for _, data in frames:
+            image = Image.open(io.BytesIO(data)).convert('RGB')
+            if self.max_width and image.width > self.max_width:
+                image = image.resize((self.max_width, round(image.height * self.max_width / image.width)))
+            images.append(image.quantize(colors=256))
+        # 最后一帧停留1秒
+        durations = [max(20, round((later[0] - earlier[0]) * 1000)) for earlier, later in zip(frames, frames[1:])]
+        durations.append(1000)
+
+        output = io.BytesIO()
+        images[0].save(output, 'GIF', save_all=True, append_images=images[1:], duration=durations, loop=0)
+        return output.getvalue()
+
+    @staticmethod
+    def _zip_frames(frames):
+        """未安装Pillow时把原始帧按序号和相对时间（毫秒）打包，帧已是压缩图像，不再压缩"""
+        output = io.BytesIO()
+        started = frames[0][0]
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED) as archive:
+            for index, (timestamp, data) in enumerate(frames):
+                extension = 'png' if data.startswith(b'\x89PNG') else 'jpg'
+                archive.writestr(f"frame_{index:04d}_{round((timestamp - started) * 1000)}ms.{extension}", data)
+        return output.getvalue()
+
+    def _encode(self, png_bytes):
+        """
+        缩放并按配置格式重新编码，同时计算差异哈希（dHash）用于近似去重
+        :return: (编码后的字节, 64位指纹)；未安装Pillow时为 (原始PNG, None)
+        """
+        if Image is None:
+            return png_bytes, None
+
+        try:
+            image = Image.open(io.BytesIO(png_bytes))
+            image.load()
+        except Exception as e:
+            self.logger.warning("截图解码失败，保留原始数据: %s", str(e))
+            return png_bytes, None
+
+        # 差异哈希：缩成9x8灰度图，比较相邻像素明暗
+        pixels = image.convert('L').resize((9, 8)).tobytes()
+        fingerprint = 0
+        for row in range(8):
+            for col in range(8):
+                fingerprint = (fingerprint << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+
+        if self.max_width and image.width > self.max_width:
+            image = image.resize((self.max_width, round(image.height * self.max_width / image.width)))
+
+        output = io.BytesIO()
+        if self.pillow_format == 'JPEG':
+            image.convert('RGB').save(output, 'JPEG', quality=self.quality, optimize=True)
+        else:
+            image.save(output, 'PNG', optimize=True)
+        return output.getvalue(), fingerprint
+
+    def _find_similar(self, fingerprint):
+        """查找与指纹汉明距离不超过阈值的已保存截图"""
+        if fingerprint is None:
+            return None
+        for existing, path in self._fingerprints:
+            if bin(existing ^ fingerprint).count('1') <= self.near_duplicate_distance:
+                return path
+        return None
+
+    def _link(self, source, filepath):
+        """为重复截图创建硬链接，文件系统不支持时复制"""
+        if source == filepath:
+            return
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        try:
+            if os.path.exists(filepath):
+                os.remove(filepath)
+            os.link(source, filepath)
+        except OSError:
+            shutil.copyfile(source, filepath)
+
+    @staticmethod
+    def _attach_note(attach_name, note):
+        """附加一条文本说明代替截图（未通过 --alluredir 启用Allure时不产生任何输出）"""
+        if attach_name:
+            allure.attach(note, name=attach_name, attachment_type=allure.attachment_type.TEXT)
+
+
+_artifact_writer = None
+
+
+def get_artifact_writer():
+    """获取进程内共享的失败产物写入器"""
+    global _artifact_writer
+    if _artifact_writer is None:
+        _artifact_writer = ArtifactWriter()
+    return _artifact_writer
@@ -0,0 +1,175 @@
+# utils/command_metrics.py
+from contextlib import contextmanager
+from contextvars import ContextVar
+from array import array
+from utils.impact_analysis import dependency_recorder
+import functools
+import threading
+import math
+import json
+import time
+import os
+
+
+# 当前正在执行的关键字、页面方法和元素key，用于把WebDriver命令归属到调用方
+current_keyword = ContextVar('current_keyword', default=None)
+current_page_method = ContextVar('current_page_method', default=None)
+current_locator_key = ContextVar('current_locator_key', default=None)
+
+
+@contextmanager
+def keyword_scope(keyword):
+    """在关键字执行期间标记命令归属"""
+    token = current_keyword.set(keyword)
+    dependency_recorder.note('keywords', keyword)
+    try:
+        yield
+    finally:
+        current_keyword.reset(token)
+
+
+@contextmanager
+def page_scope(page_method, locator_key=None):
+    """
+    在页面方法执行期间标记命令归属：页面方法取最外层（如LoginPage.enter_username），
+    元素key取最内层非空值
+    """
+    method_token = current_page_method.set(current_page_method.get() or page_method)
+    key_token = current_locator_key.set(locator_key or current_locator_key.get())
+    try:
+        yield
+    finally:
+        current_locator_key.reset(key_token)
+        current_page_method.reset(method_token)
+
+
+def track_page_method(method):
+    """页面方法装饰器：第一个参数为元素key时同时记录元素key"""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        locator_key = args[0] if args and isinstance(args[0], str) and args[0] in self.page_elements else None
+        if dependency_recorder.active is not None:
+            dependency_recorder.note('functions', f"{method.__module__}:{method.__qualname__}")
+            if locator_key:
+                dependency_recorder.note('locators', f"{self.page_name}.{locator_key}")
+        with page_scope(f"{type(self).__name__}.{method.__name__}", locator_key):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _percentile(sorted_values, percent):
+    """最近秩法计算百分位数"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(percent / 100.0 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class CommandMetrics:
+    """WebDriver命令级指标：按关键字、页面方法、元素key统计命令次数与往返耗时"""
+
+    DIMENSIONS = ('keyword', 'page_method', 'locator_key')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._commands = {}
+            self._dimensions = {dimension: {} for dimension in self.DIMENSIONS}
+
+    def instrument(self, driver):
+        """
+        包装driver的命令执行器，记录每条WebDriver HTTP命令
+        :param driver: WebDriver实例
+        :return: driver
+        """
+        executor = driver.command_executor
+        if getattr(executor, '_athena_instrumented', False):
+            return driver
+
+        original_execute = executor.execute
+
+        def execute(command, params):
+            started = time.perf_counter()
+            try:
+                return original_execute(command, params)
+            finally:
+                self.record(command, time.perf_counter() - started)
+
+        executor.execute = execute
+        executor._athena_instrumented = True
+        return driver
+
+    def record(self, command, duration):
+        """记录一条命令，并归属到当前关键字、页面方法和元素key"""
+        attribution = {
+            'keyword': current_keyword.get(),
+            'page_method': current_page_method.get(),
+            'locator_key': current_locator_key.get()
+        }
+        with self._lock:
+            self._commands.setdefault(command, array('d')).append(duration)
+            for dimension, name in attribution.items():
+                if name is None:
+                    continue
+                stats = self._dimensions[dimension].setdefault(name, {'durations': array('d'), 'commands': {}})
+                stats['durations'].append(duration)
+                stats['commands'][command] = stats['commands'].get(command, 0) + 1
+
+    def summary(self):
+        """
+        汇总指标
+        :return: 命令总数、各命令延迟分布及各归属维度的命令统计
+        """
+        with self._lock:
+            commands = {name: self._histogram(durations) for name, durations in self._commands.items()}
+            dimensions = {}
+            for dimension, entries in self._dimensions.items():
+                dimensions[dimension] = {}
+                for name, stats in entries.items():
+                    histogram = self._histogram(stats['durations'])
+                    histogram['commands'] = dict(stats['commands'])
+                    dimensions[dimension][name] = histogram
+
+        return {
+            'total_commands': sum(stats['count'] for stats in commands.values()),
+            'total_seconds': round(sum(stats['total_seconds'] for stats in commands.values()), 3),
+            'commands': commands,
+            'keywords': dimensions['keyword'],
+            'page_methods': dimensions['page_method'],
+            'locators': dimensions['locator_key']
+        }
+
+    def _histogram(self, durations):
+        """计算次数、总耗时和p50/p95/p99（毫秒）"""
+        values = sorted(durations)
+        return {
+            'count': len(values),
+            'total_seconds': round(sum(values), 3),
+            'p50_ms': round(_percentile(values, 50) * 1000, 2),
+            'p95_ms': round(_percentile(values, 95) * 1000, 2),
+            'p99_ms': round(_percentile(values, 99) * 1000, 2)
+        }
+
+    def chattiest(self, dimension='keyword', limit=10):
+        """按命令次数排序的前N个关键字/页面方法/元素key"""
+        entries = self.summary()[{'keyword': 'keywords', 'page_method': 'page_methods',
+                                  'locator_key': 'locators'}[dimension]]
+        return sorted(entries.items(), key=lambda item: item[1]['count'], reverse=True)[:limit]
+
+    def write(self, path):
+        """写出JSON指标文件"""
+        summary = self.summary()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(summary, file, ensure_ascii=False, indent=2)
+        return summary
+
+
+# 运行级指标实例，所有会话共享
+command_metrics = CommandMetrics()
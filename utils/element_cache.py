@@ -0,0 +1,219 @@
+# utils/element_cache.py
+from selenium.common.exceptions import StaleElementReferenceException, JavascriptException
+from selenium.webdriver.remote.command import Command
+from utils.element_locator import LOCATOR_JS_FUNCTIONS, LOCATE_SCRIPT
+from utils.wait_engine import DOCUMENT_STATE_SCRIPT, PAGE_STATE_SCRIPT, NO_PENDING_REQUESTS_SCRIPT
+from utils.logger import get_logger
+from config.registry import load_config
+import threading
+import json
+import os
+
+
+# 校验缓存元素：是否仍在当前文档中、是否可见，并返回当前URL
+VALIDATE_SCRIPT = LOCATOR_JS_FUNCTIONS + """
+var el = arguments[0], attached = el.isConnected && el.ownerDocument === document;
+return [attached, attached && isVisible(el), window.location.href];
+"""
+
+# 替换当前文档或切换浏览上下文的命令：之后缓存的全部元素作废
+NAVIGATION_COMMANDS = frozenset({
+    Command.GET, Command.GO_BACK, Command.GO_FORWARD, Command.REFRESH, Command.NEW_WINDOW, Command.CLOSE,
+    Command.SWITCH_TO_WINDOW, Command.SWITCH_TO_FRAME, Command.SWITCH_TO_PARENT_FRAME
+})
+
+# 可能改变页面的命令（点击可能触发跳转或前端路由、脚本可能修改DOM）：之后命中缓存前先在页面内校验
+MUTATING_COMMANDS = frozenset({
+    Command.CLICK_ELEMENT, Command.SEND_KEYS_TO_ELEMENT, Command.CLEAR_ELEMENT, Command.W3C_ACTIONS,
+    Command.W3C_EXECUTE_SCRIPT, Command.W3C_EXECUTE_SCRIPT_ASYNC
+})
+
+# 框架内只读的页面脚本（定位、等待条件），执行后无需校验缓存
+READ_ONLY_SCRIPTS = frozenset({
+    LOCATE_SCRIPT, VALIDATE_SCRIPT, DOCUMENT_STATE_SCRIPT, PAGE_STATE_SCRIPT, NO_PENDING_REQUESTS_SCRIPT
+})
+
+
+class PageState:
+    """会话的页面状态：导航代数、可能改变页面的命令计数和最近一次观察到的URL"""
+
+    __slots__ = ('epoch', 'mutations', 'url')
+
+    def __init__(self):
+        self.epoch = 0
+        self.mutations = 0
+        self.url = None
+
+    def navigated(self):
+        """当前文档被替换，之前缓存的元素全部作废"""
+        self.epoch += 1
+        self.url = None
+
+    def observe_url(self, url):
+        """记录观察到的URL，与上次不同时视为页面已变化（包括前端路由）"""
+        if self.url is not None and url != self.url:
+            self.epoch += 1
+        self.url = url
+
+
+def track_page_state(driver):
+    """
+    获取会话的页面状态，首次调用时包装命令执行器以跟踪导航、URL变化和可能改变页面的命令。
+    不经过命令执行器的驱动（HttpDriver）不跟踪，文档变化后其元素自身会抛出StaleElementReferenceException
+    :param driver: WebDriver实例
+    :return: PageState
+    """
+    state = getattr(driver, '_athena_page_state', None)
+    if state is not None:
+        return state
+
+    state = PageState()
+    executor = getattr(driver, 'command_executor', None)
+    if executor is not None:
+        original_execute = executor.execute
+
+        def execute(command, params):
+            response = original_execute(command, params)
+            if command in NAVIGATION_COMMANDS:
+                state.navigated()
+            elif command == Command.GET_CURRENT_URL:
+                state.observe_url((response or {}).get('value'))
+            elif command in MUTATING_COMMANDS and (params or {}).get('script') not in READ_ONLY_SCRIPTS:
+                state.mutations += 1
+            return response
+
+        executor.execute = execute
+    driver._athena_page_state = state
+    return state
+
+
+class ElementCacheStats:
+    """运行级元素缓存统计：各元素key的命中、未命中、失效次数，以及节省的定位命令数"""
+
+    COUNTERS = ('hits', 'validated_hits', 'misses', 're_resolved')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._elements = {}
+
+    def record(self, page, key, counter, reason=None):
+        """
+        记录一次缓存事件
+        :param counter: hits（未经校验直接命中）/ validated_hits（页面可能变化，校验后命中）/ misses / re_resolved（使用时失效并重新定位）
+        :param reason: 未命中的失效原因 navigation / url_change / detached / hidden
+        """
+        with self._lock:
+            stats = self._elements.setdefault(f"{page}.{key}", dict.fromkeys(self.COUNTERS, 0))
+            stats[counter] += 1
+            if reason:
+                invalidations = stats.setdefault('invalidations', {})
+                invalidations[reason] = invalidations.get(reason, 0) + 1
+
+    def summary(self):
+        """
+        汇总统计
+        :return: 总命中率，节省的定位命令数（直接命中时不发送任何定位命令）及各元素key明细
+        """
+        with self._lock:
+            elements = json.loads(json.dumps(self._elements))
+        totals = {counter: sum(stats[counter] for stats in elements.values()) for counter in self.COUNTERS}
+        lookups = totals['hits'] + totals['validated_hits'] + totals['misses']
+        return dict(totals, **{
+            'hit_rate': round((totals['hits'] + totals['validated_hits']) / lookups, 3) if lookups else 0.0,
+            'saved_find_commands': totals['hits'],
+            'elements': elements
+        })
+
+    def write(self, path):
+        """写出JSON统计文件"""
+        summary = self.summary()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(summary, file, ensure_ascii=False, indent=2)
+        return summary
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._elements = {}
+
+
+# 运行级统计实例
+element_cache_stats = ElementCacheStats()
+
+
+class ElementCache:
+    """
+    页面级元素句柄缓存：按元素key缓存已定位的元素，同一页面连续操作同一元素时不再重复定位。
+    导航、URL变化或文档变化后自动失效；页面可能被点击或脚本改变时，命中前用一次脚本校验元素仍在当前文档中
+    """
+
+    def __init__(self, driver, page_name, config_path="config/config.yaml"):
+        self.logger = get_logger()
+        self.driver = driver
+        self.page_name = page_name
+        self.enabled = (load_config(config_path).get('element_cache') or {}).get('enabled', True)
+        self.state = track_page_state(driver) if self.enabled else None
+        self._entries = {}
+
+    def get(self, key, visible=False):
+        """
+        取缓存的元素
+        :param key: 元素key
+        :param visible: 是否要求元素可见（需在页面内校验）
+        :return: WebElement，未命中时返回None
+        """
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            element_cache_stats.record(self.page_name, key, 'misses')
+            return None
+
+        element, epoch, mutations = entry
+        if epoch != self.state.epoch:
+            return self._miss(key, 'navigation')
+        if mutations == self.state.mutations and not visible:
+            element_cache_stats.record(self.page_name, key, 'hits')
+            return element
+
+        try:
+            if getattr(self.driver, 'supports_javascript', True):
+                attached, displayed, url = self.driver.execute_script(VALIDATE_SCRIPT, element)
+                self.state.observe_url(url)
+            else:
+                attached, displayed = True, element.is_displayed()
+        except (StaleElementReferenceException, JavascriptException):
+            return self._miss(key, 'detached')
+
+        if epoch != self.state.epoch:
+            return self._miss(key, 'url_change')
+        if not attached:
+            return self._miss(key, 'detached')
+        if visible and not displayed:
+            return self._miss(key, 'hidden')
+
+        self._entries[key] = (element, epoch, self.state.mutations)
+        element_cache_stats.record(self.page_name, key, 'validated_hits')
+        return element
+
+    def put(self, key, element):
+        """缓存刚定位到的元素"""
+        if self.enabled:
+            self._entries[key] = (element, self.state.epoch, self.state.mutations)
+
+    def invalidate(self, key):
+        """使用时发现元素已失效：移除缓存，由调用方重新定位"""
+        if self._entries.pop(key, None) is not None:
+            element_cache_stats.record(self.page_name, key, 're_resolved')
+            self.logger.debug("缓存元素已失效，重新定位: %s.%s", self.page_name, key)
+
+    def clear(self):
+        """清空本页面的缓存"""
+        self._entries = {}
+
+    def _miss(self, key, reason):
+        """移除失效的条目并记录未命中"""
+        del self._entries[key]
+        element_cache_stats.record(self.page_name, key, 'misses', reason)
+        return None
@@ -1,27 +1,84 @@
 # utils/element_locator.py
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-from utils.logger import Logger
+from selenium.common.exceptions import TimeoutException, JavascriptException
+from config.registry import LOCATOR_TYPES
+from utils.locator_cache import get_locator_cache
+from utils.adaptive_wait import AdaptiveWait
+from utils.logger import get_logger
 import time
 
 
+# 页面内定位函数：locate(strategies, requireVisible) 按顺序尝试全部定位策略，
+# 返回 [策略序号, 元素] 或 null，strategies 为 [[type, value], ...]
+LOCATOR_JS_FUNCTIONS = """
+function toArray(list) { return Array.prototype.slice.call(list); }
+function isVisible(el) {
+    if (!el.isConnected) { return false; }
+    var style = window.getComputedStyle(el);
+    if (style.display === 'none' || style.visibility === 'hidden' || style.opacity === '0') { return false; }
+    return el.getClientRects().length > 0;
+}
+function linkText(el) { return (el.innerText || el.textContent || '').trim(); }
+function query(type, value) {
+    switch (type) {
+        case 'id': var el = document.getElementById(value); return el ? [el] : [];
+        case 'name': return toArray(document.getElementsByName(value));
+        case 'css': return toArray(document.querySelectorAll(value));
+        case 'class': return toArray(document.getElementsByClassName(value));
+        case 'tag': return toArray(document.getElementsByTagName(value));
+        case 'xpath':
+            var snapshot = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var nodes = [];
+            for (var k = 0; k < snapshot.snapshotLength; k++) { nodes.push(snapshot.snapshotItem(k)); }
+            return nodes;
+        case 'link_text':
+            return toArray(document.getElementsByTagName('a')).filter(function (a) { return linkText(a) === value; });
+        case 'partial_link_text':
+            return toArray(document.getElementsByTagName('a')).filter(function (a) { return linkText(a).indexOf(value) !== -1; });
+    }
+    return [];
+}
+function locate(strategies, requireVisible) {
+    for (var i = 0; i < strategies.length; i++) {
+        var elements;
+        try { elements = query(strategies[i][0], strategies[i][1]); } catch (e) { continue; }
+        for (var j = 0; j < elements.length; j++) {
+            if (elements[j].nodeType === 1 && (!requireVisible || isVisible(elements[j]))) { return [i, elements[j]]; }
+        }
+    }
+    return null;
+}
+"""
+
+# 页面内定位脚本  arguments[0]: [[type, value], ...]  arguments[1]: 是否要求元素可见
+LOCATE_SCRIPT = LOCATOR_JS_FUNCTIONS + "return locate(arguments[0], arguments[1]);"
+
+
+def locate_in_page(driver, strategies, visible=False):
+    """
+    在当前页面中按顺序尝试全部定位策略；不支持JavaScript的驱动（HttpDriver）使用其原生实现
+    :param driver: WebDriver实例
+    :param strategies: [[type, value], ...]
+    :param visible: 是否要求元素可见
+    :return: [策略序号, 元素] 或 None
+    """
+    if getattr(driver, 'supports_javascript', True):
+        return driver.execute_script(LOCATE_SCRIPT, strategies, visible)
+    return driver.locate(strategies, visible)
+
+
 class ElementLocator:
     """动态元素定位工具类"""
 
+    # 竞速模式：每次轮询在页面内用一次脚本同时检查全部定位策略
+    RACE_STRATEGIES = True
+
     def __init__(self):
-        self.logger = Logger()
-        self.locator_mapping = {
-            'id': By.ID,
-            'name': By.NAME,
-            'xpath': By.XPATH,
-            'css': By.CSS_SELECTOR,
-            'class': By.CLASS_NAME,
-            'tag': By.TAG_NAME,
-            'link_text': By.LINK_TEXT,
-            'partial_link_text': By.PARTIAL_LINK_TEXT
-        }
+        self.logger = get_logger()
+        # 最近一次竞速定位命中的策略 {'index', 'locator', 'elapsed'}
+        self.last_match = None
+        self.locator_mapping = LOCATOR_TYPES
 
     def get_selenium_locator(self, locator_data):
         """
@@ -29,9 +86,17 @@ class ElementLocator:
         :param locator_data: 定位数据（可以是单个字典或字典列表）
         :return: Selenium定位器元组 (By, value)
         """
+        # 注册表中预编译的定位策略直接返回定位元组
+        compiled = getattr(locator_data, 'selenium', None)
+        if compiled:
+            return compiled
+
         if isinstance(locator_data, list):
             # 如果是列表，取第一个有效的定位器
             for locator in locator_data:
+                compiled = getattr(locator, 'selenium', None)
+                if compiled:
+                    return compiled
                 if isinstance(locator, dict) and 'type' in locator and 'value' in locator:
                     locator_type = locator['type']
                     locator_value = locator['value']
@@ -46,37 +111,138 @@ class ElementLocator:
 
         raise ValueError(f"无效的定位数据: {locator_data}")
 
-    def find_element(self, driver, locator_data, timeout=10):
+    def script_candidates(self, locator_data):
+        """
+        过滤出页面内定位脚本支持的定位策略，脚本返回的命中序号对应该列表（而非原始定位数据）
+        :param locator_data: 定位数据（可以是单个字典或字典列表）
+        :return: 定位策略字典列表
+        """
+        if not isinstance(locator_data, list):
+            locator_data = [locator_data]
+
+        candidates = [
+            locator for locator in locator_data
+            if isinstance(locator, dict) and locator.get('type') in self.locator_mapping
+        ]
+        if not candidates:
+            raise ValueError(f"无效的定位数据: {locator_data}")
+        return candidates
+
+    def get_script_strategies(self, locator_data):
+        """
+        将定位数据转换为页面内定位脚本使用的 [[type, value], ...] 列表
+        :param locator_data: 定位数据（可以是单个字典或字典列表），通常为script_candidates的结果
+        :return: 策略列表
+        """
+        return [[locator['type'], locator['value']] for locator in self.script_candidates(locator_data)]
+
+    def find_element(self, driver, locator_data, timeout=10, race=None, cache_key=None):
         """
         智能查找元素，支持多重定位策略
         :param driver: WebDriver实例
         :param locator_data: 定位数据列表
         :param timeout: 超时时间
+        :param race: 是否使用竞速模式，默认取RACE_STRATEGIES
+        :param cache_key: (页面名称, 元素key)，提供时按历史命中情况重排策略并记录结果
         :return: WebElement对象
         """
         if not isinstance(locator_data, list):
             locator_data = [locator_data]
 
-        wait = WebDriverWait(driver, timeout)
+        race = self.RACE_STRATEGIES if race is None else race
+        if race and len(locator_data) > 1:
+            return self.race_find_element(driver, locator_data, timeout, cache_key=cache_key)
+
+        if cache_key:
+            locator_data = get_locator_cache().order(cache_key[0], cache_key[1], locator_data)
+
+        wait = AdaptiveWait(driver, timeout)
 
         for i, locator in enumerate(locator_data):
+            started = time.time()
             try:
                 selenium_locator = self.get_selenium_locator(locator)
                 element = wait.until(
                     EC.presence_of_element_located(selenium_locator)
                 )
-                self.logger.info(f"使用定位策略 {i + 1}/{len(locator_data)} 成功找到元素: {locator}")
+                self.record_strategy(cache_key, locator, True, time.time() - started)
+                self.logger.info("使用定位策略 %s/%s 成功找到元素: %s", i + 1, len(locator_data), locator)
                 return element
             except TimeoutException:
+                self.record_strategy(cache_key, locator, False, time.time() - started)
                 if i == len(locator_data) - 1:  # 如果是最后一个策略
-                    self.logger.error(f"所有定位策略均失败: {locator_data}")
+                    self.logger.error("所有定位策略均失败: %s", locator_data)
                     raise TimeoutException(f"无法找到元素: {locator_data}")
                 else:
-                    self.logger.warning(f"定位策略 {i + 1} 失败，尝试下一个: {locator}")
+                    self.logger.warning("定位策略 %s 失败，尝试下一个: %s", i + 1, locator)
                     continue
 
         raise TimeoutException(f"无法找到元素: {locator_data}")
 
+    def race_find_element(self, driver, locator_data, timeout=10, visible=False, cache_key=None):
+        """
+        竞速查找元素：每次轮询在页面内执行一次脚本同时检查全部定位策略，
+        按声明顺序返回第一个命中的策略。最坏耗时为一个timeout，与策略数量无关，
+        且execute_script不受隐式等待影响。
+        :param driver: WebDriver实例
+        :param locator_data: 定位数据列表
+        :param timeout: 超时时间
+        :param visible: 是否要求元素可见
+        :param cache_key: (页面名称, 元素key)，提供时按历史命中情况重排策略并记录命中结果
+        :return: WebElement对象
+        """
+        if not isinstance(locator_data, list):
+            locator_data = [locator_data]
+        if cache_key:
+            locator_data = get_locator_cache().order(cache_key[0], cache_key[1], locator_data)
+
+        candidates = self.script_candidates(locator_data)
+        strategies = self.get_script_strategies(candidates)
+        wait = AdaptiveWait(driver, timeout, ignored_exceptions=(JavascriptException,))
+        check = {'elapsed': 0.0}
+
+        def located(d):
+            # 单独计时每次页面内检查，命中策略的耗时不包含等待页面加载的时间
+            check_started = time.time()
+            try:
+                return locate_in_page(d, strategies, visible)
+            finally:
+                check['elapsed'] = time.time() - check_started
+
+        started = time.time()
+        try:
+            index, element = wait.until(located)
+        except TimeoutException:
+            self.logger.error("竞速定位所有策略均失败: %s", locator_data)
+            raise TimeoutException(f"无法找到元素: {locator_data}")
+
+        elapsed = time.time() - started
+        self.last_match = {'index': index, 'locator': candidates[index], 'elapsed': elapsed}
+        self.record_race(cache_key, candidates, index, check['elapsed'])
+        self.logger.info("竞速定位命中策略 %s/%s: %s, 耗时 %.2fs",
+                         index + 1, len(candidates), candidates[index], elapsed)
+        return element
+
+    def record_strategy(self, cache_key, locator, success, elapsed):
+        """记录定位策略命中结果到共享缓存"""
+        if cache_key and isinstance(locator, dict):
+            get_locator_cache().record(cache_key[0], cache_key[1], locator, success, elapsed)
+
+    def record_race(self, cache_key, candidates, index, elapsed):
+        """
+        记录一次页面内竞速定位的结果：脚本按顺序返回第一个命中的策略，
+        排在它之前的策略在同一次检查中均未匹配，记为未命中
+        :param cache_key: (页面名称, 元素key)
+        :param candidates: script_candidates返回的候选策略
+        :param index: 命中的候选序号
+        :param elapsed: 命中那次页面内检查的耗时（秒）
+        """
+        if not cache_key:
+            return
+        for locator in candidates[:index]:
+            self.record_strategy(cache_key, locator, False, 0.0)
+        self.record_strategy(cache_key, candidates[index], True, elapsed)
+
     def find_elements(self, driver, locator_data, timeout=10):
         """
         智能查找多个元素
@@ -86,31 +252,31 @@ class ElementLocator:
         :return: WebElement对象列表
         """
         selenium_locator = self.get_selenium_locator(locator_data)
-        wait = WebDriverWait(driver, timeout)
+        wait = AdaptiveWait(driver, timeout)
 
         try:
             elements = wait.until(
                 EC.presence_of_all_elements_located(selenium_locator)
             )
-            self.logger.info(f"找到 {len(elements)} 个元素: {locator_data}")
+            self.logger.info("找到 %s 个元素: %s", len(elements), locator_data)
             return elements
         except TimeoutException:
-            self.logger.error(f"无法找到元素列表: {locator_data}")
+            self.logger.error("无法找到元素列表: %s", locator_data)
             raise
 
     def wait_for_element_clickable(self, driver, locator_data, timeout=10):
         """等待元素可点击"""
         selenium_locator = self.get_selenium_locator(locator_data)
-        wait = WebDriverWait(driver, timeout)
+        wait = AdaptiveWait(driver, timeout)
 
         try:
             element = wait.until(
                 EC.element_to_be_clickable(selenium_locator)
             )
-            self.logger.info(f"元素可点击: {locator_data}")
+            self.logger.info("元素可点击: %s", locator_data)
             return element
         except TimeoutException:
-            self.logger.error(f"元素不可点击: {locator_data}")
+            self.logger.error("元素不可点击: %s", locator_data)
             raise
 
     def smart_find_and_interact(self, driver, locator_data, interaction_type='click', timeout=10):
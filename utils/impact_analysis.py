@@ -0,0 +1,379 @@
+# utils/impact_analysis.py
+from utils.locator_cache import _FileLock
+from utils.logger import get_logger
+import subprocess
+import argparse
+import fnmatch
+import hashlib
+import glob
+import json
+import time
+import ast
+import os
+import re
+import yaml
+
+
+# 依赖类别：调用的关键字、执行过的页面/框架函数、读取的元素key、读取的数据路径
+DEPENDENCY_KINDS = ('keywords', 'functions', 'locators', 'data')
+
+# 纳入依赖索引的源码与数据文件
+TRACKED_PATTERNS = ('pages/*.py', 'framework/*.py', 'utils/*.py', 'config/*.py', 'config/*.yaml')
+
+# 改动后不影响任何测试的文件
+IGNORED_PATTERNS = ('*.md', 'LICENSE', 'requirements.txt', 'jenkins/*', 'reports/*', 'benchmarks/*',
+                    'requests.jsonl', '.gitignore')
+
+# 改动后必须运行全量测试的文件
+GLOBAL_PATTERNS = ('tests/conftest.py', 'config/config.yaml', 'config/registry.py', 'pytest.ini', 'setup.cfg')
+
+KEYWORD_ENGINE_FILE = 'framework/keyword_engine.py'
+KEYWORD_ENGINE_MODULE = 'framework.keyword_engine'
+
+
+class DependencyRecorder:
+    """运行时依赖记录器：测试执行期间由关键字、页面方法和数据驱动引擎上报用到的对象"""
+
+    def __init__(self):
+        self.active = None
+
+    def start(self):
+        """开始记录一个测试"""
+        self.active = {kind: set() for kind in DEPENDENCY_KINDS}
+
+    def stop(self):
+        """
+        结束记录
+        :return: {类别: 排序后的列表}
+        """
+        active, self.active = self.active, None
+        return {kind: sorted(values) for kind, values in (active or {}).items()}
+
+    def note(self, kind, name):
+        """上报一个依赖（未在记录时几乎无开销）"""
+        if self.active is not None:
+            self.active[kind].add(name)
+
+    def note_locator(self, locator_data):
+        """上报定位数据对应的元素key：注册表中的定位器列表带有 页面.元素key，直接传入的定位数据不记录"""
+        if self.active is not None:
+            key = getattr(locator_data, 'key', None)
+            if key:
+                self.active['locators'].add(key)
+
+
+# 进程内共享的依赖记录器
+dependency_recorder = DependencyRecorder()
+
+
+class ImpactIndex:
+    """
+    测试依赖索引：记录每个测试的关键字、函数、元素key和数据路径，以及记录时各源码文件的哈希；
+    根据改动的文件/元素key选出受影响的测试，索引与当前代码不一致时退回全量
+    """
+
+    # 版本2起在定位器解析处记录元素key（含fill_form字段和等待条件），旧索引的元素依赖不完整，不再使用
+    VERSION = 2
+
+    def __init__(self, path="reports/.cache/impact_index.json", max_age_days=14, root='.'):
+        self.logger = get_logger()
+        self.path = path
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.root = root
+        self._pending = {}
+
+    def record(self, nodeid, dependencies):
+        """记录一个测试的依赖"""
+        self._pending[nodeid] = dependencies
+
+    def flush(self):
+        """将本次运行记录的依赖与源码哈希合并写入索引"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        try:
+            with _FileLock(f"{self.path}.lock", 10):
+                index = self.load() or {'tests': {}}
+                index['tests'].update(pending)
+                index.update(version=self.VERSION, updated=time.time(), files=self.file_hashes())
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                temp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as file:
+                    json.dump(index, file, ensure_ascii=False)
+                os.replace(temp_path, self.path)
+        except OSError as e:
+            self.logger.warning("依赖索引写入失败: %s", str(e))
+
+    def load(self):
+        """读取索引，不存在或版本不符时返回None"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                index = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None
+        return index if index.get('version') == self.VERSION else None
+
+    def file_hashes(self):
+        """当前各被跟踪文件的内容哈希"""
+        hashes = {}
+        for pattern in TRACKED_PATTERNS:
+            for path in glob.glob(os.path.join(self.root, pattern)):
+                with open(path, 'rb') as file:
+                    hashes[os.path.relpath(path, self.root).replace(os.sep, '/')] = hashlib.sha256(
+                        file.read()).hexdigest()
+        return hashes
+
+    def select(self, nodeids, changed_files=(), changed_locators=(), base_ref=None):
+        """
+        选出受改动影响的测试
+        :param nodeids: 本次收集到的全部测试节点ID
+        :param changed_files: 改动的文件（相对仓库根目录）
+        :param changed_locators: 改动的元素key，格式为 页面.元素key
+        :param base_ref: git基线，提供时按改动的行精确到函数，并对比测试数据YAML的改动路径
+        :return: (选中的节点ID列表, 原因)；需要全量时返回全部节点ID
+        """
+        index = self.load()
+        if index is None:
+            return list(nodeids), "依赖索引不存在"
+        if time.time() - index.get('updated', 0) > self.max_age_seconds:
+            return list(nodeids), "依赖索引已过期"
+
+        changed_files = [path.replace(os.sep, '/') for path in changed_files]
+        current_hashes = self.file_hashes()
+        recorded_hashes = index.get('files', {})
+        for path in set(current_hashes) | set(recorded_hashes):
+            if path not in changed_files and current_hashes.get(path) != recorded_hashes.get(path):
+                return list(nodeids), f"依赖索引与当前代码不一致: {path}"
+
+        impact = Impact(changed_locators)
+        for path in changed_files:
+            reason = self._classify(path, impact, base_ref)
+            if reason:
+                return list(nodeids), reason
+
+        tests = index['tests']
+        reason = self._resolve_unrecorded(impact, tests)
+        if reason:
+            return list(nodeids), reason
+
+        selected = []
+        for nodeid in nodeids:
+            dependencies = tests.get(nodeid)
+            # 索引中没有的新测试总是运行
+            if dependencies is None or impact.affects(nodeid, dependencies):
+                selected.append(nodeid)
+        return selected, f"按改动选出 {len(selected)}/{len(nodeids)} 个测试"
+
+    def _resolve_unrecorded(self, impact, tests):
+        """
+        改动的函数没有被任何测试记录过时（如未装饰的辅助方法）按整个模块处理；
+        整个模块或改动的元素key都没有被记录过时无法判断影响范围，返回全量原因
+        """
+        recorded_functions = set()
+        recorded_keywords = set()
+        recorded_locators = set()
+        for dependencies in tests.values():
+            recorded_functions.update(dependencies.get('functions', ()))
+            recorded_keywords.update(dependencies.get('keywords', ()))
+            recorded_locators.update(dependencies.get('locators', ()))
+        recorded_modules = {function.split(':', 1)[0] for function in recorded_functions}
+        if recorded_keywords:
+            recorded_modules.add(KEYWORD_ENGINE_MODULE)
+
+        for function in list(impact.functions):
+            module, _, name = function.partition(':')
+            keyword = name.split('.', 1)[1] if name.startswith('KeywordEngine.') else None
+            if function not in recorded_functions and keyword not in recorded_keywords:
+                impact.functions.discard(function)
+                impact.modules.add(module)
+
+        for module in impact.modules:
+            if module not in recorded_modules:
+                return f"改动的模块未被任何测试记录，无法判断影响范围: {module}"
+        # 没有任何测试记录过的元素key可能通过未跟踪的路径使用，保守地运行全量
+        for locator in impact.locators:
+            if locator not in recorded_locators:
+                return f"改动的元素key未被任何测试记录，无法判断影响范围: {locator}"
+        return None
+
+    def _classify(self, path, impact, base_ref):
+        """把一个改动文件归类为受影响的测试文件/函数/模块/元素key/数据路径，需要全量时返回原因"""
+        if any(fnmatch.fnmatch(path, pattern) for pattern in GLOBAL_PATTERNS):
+            return f"全局文件改动: {path}"
+        if any(fnmatch.fnmatch(path, pattern) for pattern in IGNORED_PATTERNS):
+            return None
+        if path.startswith('tests/') and path.endswith('.py'):
+            impact.test_files.add(path)
+            return None
+        if path.endswith(('.yaml', '.yml')):
+            return self._classify_data_file(path, impact, base_ref)
+        if path.endswith('.py'):
+            module = path[:-3].replace('/', '.')
+            functions = changed_functions(path, base_ref, self.root) if base_ref else None
+            if functions is None:
+                impact.modules.add(module)
+            else:
+                impact.functions.update(f"{module}:{name}" for name in functions)
+                if path == KEYWORD_ENGINE_FILE:
+                    impact.keywords.update(name.split('.', 1)[1] for name in functions
+                                           if name.startswith('KeywordEngine.'))
+            return None
+        return f"无法判断影响范围的文件改动: {path}"
+
+    def _classify_data_file(self, path, impact, base_ref):
+        """测试数据改动：精确到元素key和顶层数据路径，无法对比时按整个文件处理"""
+        changes = changed_data_paths(path, base_ref, self.root) if base_ref else None
+        if changes is None:
+            impact.data_files.add(path)
+            return None
+        locators, data_paths = changes
+        impact.locators.update(locators)
+        impact.data_paths.update((path, data_path) for data_path in data_paths)
+        return None
+
+
+class Impact:
+    """一次改动的影响范围"""
+
+    def __init__(self, changed_locators=()):
+        self.test_files = set()
+        self.modules = set()
+        self.functions = set()
+        self.keywords = set()
+        self.locators = set(changed_locators)
+        self.data_files = set()
+        self.data_paths = set()
+
+    def affects(self, nodeid, dependencies):
+        """测试是否受影响"""
+        if nodeid.split('::', 1)[0] in self.test_files:
+            return True
+        functions = dependencies.get('functions', ())
+        if self.functions.intersection(functions) or self.keywords.intersection(dependencies.get('keywords', ())):
+            return True
+        if self.modules and any(function.split(':', 1)[0] in self.modules for function in functions):
+            return True
+        if KEYWORD_ENGINE_MODULE in self.modules and dependencies.get('keywords'):
+            return True
+        if self.locators.intersection(dependencies.get('locators', ())):
+            return True
+        for data in dependencies.get('data', ()):
+            source, _, data_path = data.partition(':')
+            if source in self.data_files:
+                return True
+            if any(source == path and (data_path + '.').startswith(changed + '.')
+                   for path, changed in self.data_paths):
+                return True
+        return False
+
+
+def git_changed_files(base_ref, root='.'):
+    """基线之后（含工作区未提交）改动的文件"""
+    output = subprocess.run(['git', 'diff', '--name-only', base_ref], cwd=root, check=True,
+                            capture_output=True, text=True).stdout
+    return [line for line in output.splitlines() if line]
+
+
+def changed_functions(path, base_ref, root='.'):
+    """
+    按git diff的改动行找出被修改的函数（类名.方法名）
+    :return: 函数名集合；改动涉及函数以外的模块级代码或文件已删除时返回None，表示按整个模块处理
+    """
+    full_path = os.path.join(root, path)
+    if not os.path.exists(full_path):
+        return None
+    diff = subprocess.run(['git', 'diff', '-U0', base_ref, '--', path], cwd=root, check=True,
+                          capture_output=True, text=True).stdout
+    lines = set()
+    for start, count in re.findall(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@', diff, re.M):
+        start, count = int(start), int(count) if count else 1
+        # 纯删除的改动记在删除位置所在行
+        lines.update(range(start, start + count) if count else [max(start, 1)])
+
+    with open(full_path, 'r', encoding='utf-8') as file:
+        tree = ast.parse(file.read())
+    ranges = []
+
+    def visit(node, prefix):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                start = min([child.lineno] + [decorator.lineno for decorator in child.decorator_list])
+                ranges.append((start, child.end_lineno, prefix + child.name))
+            elif isinstance(child, ast.ClassDef):
+                visit(child, prefix + child.name + '.')
+
+    visit(tree, '')
+    functions = set()
+    for line in lines:
+        names = [name for start, end, name in ranges if start <= line <= end]
+        if not names:
+            return None
+        functions.update(names)
+    return functions
+
+
+def changed_data_paths(path, base_ref, root='.'):
+    """
+    对比测试数据YAML基线与当前版本
+    :return: (改动的元素key集合 页面.元素key, 改动的其他数据路径集合)；无法对比时返回None
+    """
+    try:
+        old_content = subprocess.run(['git', 'show', f"{base_ref}:{path}"], cwd=root, check=True,
+                                     capture_output=True, text=True).stdout
+        old = yaml.safe_load(old_content) or {}
+        with open(os.path.join(root, path), 'r', encoding='utf-8') as file:
+            new = yaml.safe_load(file) or {}
+    except (subprocess.CalledProcessError, OSError, yaml.YAMLError):
+        return None
+
+    locators = set()
+    old_pages, new_pages = old.get('page_elements') or {}, new.get('page_elements') or {}
+    for page in set(old_pages) | set(new_pages):
+        old_elements, new_elements = old_pages.get(page) or {}, new_pages.get(page) or {}
+        for key in set(old_elements) | set(new_elements):
+            if old_elements.get(key) != new_elements.get(key):
+                locators.add(f"{page}.{key}")
+
+    data_paths = set()
+    for section in (set(old) | set(new)) - {'page_elements'}:
+        old_section, new_section = old.get(section), new.get(section)
+        if isinstance(old_section, dict) and isinstance(new_section, dict):
+            data_paths.update(f"{section}.{key}" for key in set(old_section) | set(new_section)
+                              if old_section.get(key) != new_section.get(key))
+        elif old_section != new_section:
+            data_paths.add(section)
+    return locators, data_paths
+
+
+def main():
+    """命令行入口: python -m utils.impact_analysis select --since origin/main"""
+    parser = argparse.ArgumentParser(description="按改动选择受影响的测试")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    select_parser = subparsers.add_parser('select', help="输出受影响测试的节点ID")
+    select_parser.add_argument('--since', help="git基线，如 origin/main")
+    select_parser.add_argument('--changed-files', nargs='*', default=[], help="改动的文件")
+    select_parser.add_argument('--changed-locators', nargs='*', default=[], help="改动的元素key，如 login_page.username_input")
+    subparsers.add_parser('show', help="查看依赖索引")
+
+    args = parser.parse_args()
+    index = ImpactIndex()
+
+    if args.command == 'show':
+        for nodeid, dependencies in sorted(((index.load() or {}).get('tests') or {}).items()):
+            print(nodeid)
+            for kind in DEPENDENCY_KINDS:
+                print(f"    {kind}: {', '.join(dependencies.get(kind, []))}")
+        return
+
+    changed_files = list(args.changed_files)
+    if args.since:
+        changed_files += git_changed_files(args.since)
+    tests = (index.load() or {}).get('tests') or {}
+    selected, reason = index.select(sorted(tests), changed_files, args.changed_locators, args.since)
+    print(reason)
+    for nodeid in selected:
+        print(nodeid)
+
+
+if __name__ == "__main__":
+    main()
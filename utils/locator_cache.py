@@ -0,0 +1,295 @@
+# utils/locator_cache.py
+from utils.logger import get_logger
+import argparse
+import atexit
+import threading
+import json
+import time
+import os
+from config.registry import load_config
+
+
+class LocatorCache:
+    """
+    定位策略命中缓存：按 (页面, 元素key, 应用版本) 记录各定位策略的命中次数与耗时，
+    持久化到本地文件供多次运行和多个worker共享，后续查找优先尝试历史上最快的成功策略
+    """
+
+    VERSION = 1
+    # 累计多少条记录后合并写入一次文件
+    FLUSH_EVERY = 20
+    # 锁文件超过该时间视为残留，强制清理（秒）
+    STALE_LOCK_SECONDS = 10
+
+    def __init__(self, config_path="config/config.yaml"):
+        self.logger = get_logger()
+        config = self._load_config(config_path)
+        cache_config = (config.get('element_locator') or {}).get('strategy_cache') or {}
+
+        self.enabled = cache_config.get('enabled', True)
+        self.path = cache_config.get('path', "reports/.cache/locator_cache.json")
+        self.ttl_seconds = cache_config.get('ttl_days', 7) * 24 * 3600
+        self.max_entries = cache_config.get('max_entries', 5000)
+        self.app_build = os.environ.get('APP_BUILD') or str(
+            (config.get('environment') or {}).get('app_build', 'unknown')
+        )
+
+        self._lock = threading.Lock()
+        self._entries = None
+        self._pending = {}
+        self._pending_count = 0
+        atexit.register(self.flush)
+
+    def _load_config(self, config_path):
+        """加载配置文件"""
+        try:
+            return load_config(config_path)
+        except FileNotFoundError:
+            return {}
+
+    @staticmethod
+    def strategy_id(locator):
+        """定位策略的唯一标识"""
+        return f"{locator['type']}={locator['value']}"
+
+    def entry_key(self, page, element_key, app_build=None):
+        """缓存条目key"""
+        return f"{page}|{element_key}|{app_build or self.app_build}"
+
+    def order(self, page, element_key, locator_data):
+        """
+        按历史表现重排定位策略：有成功记录的按命中率降序、平均耗时升序排在前面，
+        无记录的保持声明顺序，只失败过的排在最后
+        :param page: 页面名称
+        :param element_key: 元素key
+        :param locator_data: 定位数据列表
+        :return: 重排后的定位数据列表
+        """
+        if not self.enabled:
+            return locator_data
+
+        with self._lock:
+            entry = self._load().get(self.entry_key(page, element_key))
+            strategies = dict(entry['strategies']) if entry else {}
+
+        if not strategies:
+            return locator_data
+
+        def rank(item):
+            index, locator = item
+            stats = strategies.get(self.strategy_id(locator))
+            if not stats:
+                return (1, 0, 0, index)
+            if not stats['hits']:
+                return (2, 0, 0, index)
+            hit_rate = stats['hits'] / (stats['hits'] + stats['misses'])
+            return (0, -hit_rate, stats['total_time'] / stats['hits'], index)
+
+        return [locator for _, locator in sorted(enumerate(locator_data), key=rank)]
+
+    def record(self, page, element_key, locator, success, elapsed):
+        """
+        记录一次定位结果
+        :param page: 页面名称
+        :param element_key: 元素key
+        :param locator: 定位策略字典
+        :param success: 是否命中
+        :param elapsed: 耗时（秒）
+        """
+        if not self.enabled:
+            return
+
+        key = self.entry_key(page, element_key)
+        strategy = self.strategy_id(locator)
+        now = time.time()
+
+        with self._lock:
+            entries = self._load()
+            for target in (entries, self._pending):
+                entry = target.setdefault(key, {'strategies': {}, 'last_seen': now})
+                entry['last_seen'] = now
+                stats = entry['strategies'].setdefault(
+                    strategy, {'hits': 0, 'misses': 0, 'total_time': 0.0, 'last_seen': now}
+                )
+                stats['last_seen'] = now
+                if success:
+                    stats['hits'] += 1
+                    stats['total_time'] += elapsed
+                else:
+                    stats['misses'] += 1
+
+            self._pending_count += 1
+            should_flush = self._pending_count >= self.FLUSH_EVERY
+
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        """将本进程累计的记录合并写入缓存文件"""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending, self._pending_count = self._pending, {}, 0
+
+        try:
+            with self._file_lock():
+                entries = self._read_file()
+                for key, delta in pending.items():
+                    entry = entries.setdefault(key, {'strategies': {}, 'last_seen': delta['last_seen']})
+                    entry['last_seen'] = max(entry['last_seen'], delta['last_seen'])
+                    for strategy, stats in delta['strategies'].items():
+                        merged = entry['strategies'].setdefault(
+                            strategy, {'hits': 0, 'misses': 0, 'total_time': 0.0, 'last_seen': 0}
+                        )
+                        merged['hits'] += stats['hits']
+                        merged['misses'] += stats['misses']
+                        merged['total_time'] += stats['total_time']
+                        merged['last_seen'] = max(merged['last_seen'], stats['last_seen'])
+                entries = self._evict(entries)
+                self._write_file(entries)
+        except OSError as e:
+            self.logger.warning("定位策略缓存写入失败: %s", str(e))
+            return
+
+        with self._lock:
+            self._entries = entries
+
+    def invalidate(self, page=None, app_build=None):
+        """
+        清除缓存条目
+        :param page: 只清除该页面的条目，默认全部
+        :param app_build: 只清除该应用版本的条目，默认全部
+        :return: 清除的条目数
+        """
+        with self._file_lock():
+            entries = self._read_file()
+            kept = {
+                key: entry for key, entry in entries.items()
+                if not self._matches(key, page, app_build)
+            }
+            self._write_file(kept)
+
+        with self._lock:
+            self._entries = None
+            self._pending = {
+                key: entry for key, entry in self._pending.items()
+                if not self._matches(key, page, app_build)
+            }
+
+        removed = len(entries) - len(kept)
+        self.logger.info("定位策略缓存已清除 %s 条, 页面: %s, 版本: %s",
+                         removed, page or '全部', app_build or '全部')
+        return removed
+
+    def _matches(self, key, page, app_build):
+        """缓存key是否匹配清除条件"""
+        entry_page, _, entry_build = key.split('|', 2)
+        return (page is None or entry_page == page) and (app_build is None or entry_build == app_build)
+
+    def _load(self):
+        """首次使用时从文件加载缓存（调用方持有self._lock）"""
+        if self._entries is None:
+            self._entries = self._evict(self._read_file())
+        return self._entries
+
+    def _evict(self, entries):
+        """淘汰过期条目，并按最近使用时间保留max_entries条"""
+        deadline = time.time() - self.ttl_seconds
+        entries = {key: entry for key, entry in entries.items() if entry['last_seen'] >= deadline}
+        if len(entries) > self.max_entries:
+            recent = sorted(entries.items(), key=lambda item: item[1]['last_seen'], reverse=True)
+            entries = dict(recent[:self.max_entries])
+        return entries
+
+    def _read_file(self):
+        """读取缓存文件，文件不存在或版本不符时返回空缓存"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+        if data.get('version') != self.VERSION:
+            return {}
+        return data.get('entries', {})
+
+    def _write_file(self, entries):
+        """原子写入缓存文件"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({'version': self.VERSION, 'entries': entries}, file, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+    def _file_lock(self):
+        """跨进程文件锁，保证多个worker合并写入时不互相覆盖"""
+        return _FileLock(f"{self.path}.lock", self.STALE_LOCK_SECONDS)
+
+
+class _FileLock:
+    """基于O_EXCL创建锁文件的简单跨进程锁"""
+
+    def __init__(self, path, stale_seconds):
+        self.path = path
+        self.stale_seconds = stale_seconds
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                return self
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.path) > self.stale_seconds:
+                        os.remove(self.path)
+                        continue
+                except OSError:
+                    continue
+                time.sleep(0.05)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+_locator_cache = None
+
+
+def get_locator_cache():
+    """获取进程内共享的定位策略缓存"""
+    global _locator_cache
+    if _locator_cache is None:
+        _locator_cache = LocatorCache()
+    return _locator_cache
+
+
+def main():
+    """命令行入口: python -m utils.locator_cache clear|show"""
+    parser = argparse.ArgumentParser(description="定位策略命中缓存管理")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    clear_parser = subparsers.add_parser('clear', help="清除缓存条目")
+    clear_parser.add_argument('--page', help="只清除指定页面")
+    clear_parser.add_argument('--build', help="只清除指定应用版本")
+
+    subparsers.add_parser('show', help="查看缓存内容")
+
+    args = parser.parse_args()
+    cache = LocatorCache()
+
+    if args.command == 'clear':
+        removed = cache.invalidate(page=args.page, app_build=args.build)
+        print(f"已清除 {removed} 条缓存")
+    else:
+        for key, entry in sorted(cache._read_file().items()):
+            print(key)
+            for strategy, stats in entry['strategies'].items():
+                average = stats['total_time'] / stats['hits'] if stats['hits'] else 0
+                print(f"    {strategy}: 命中 {stats['hits']}, 失败 {stats['misses']}, 平均耗时 {average:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
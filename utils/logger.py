@@ -1,58 +1,149 @@
 # utils/logger.py
+from logging.handlers import QueueHandler, QueueListener
 import logging
+import threading
+import atexit
+import queue
+import json
 import os
+from config.registry import load_config
 from datetime import datetime
 
 
+class _LazyQueueHandler(QueueHandler):
+    """
+    将日志记录原样放入队列：消息格式化推迟到后台写线程执行，
+    调用方只付出级别判断和入队的开销
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """紧凑的JSON Lines格式，适合大批量运行后用工具检索"""
+
+    def format(self, record):
+        data = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'worker': _worker_id(),
+            'msg': record.getMessage()
+        }
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+def _worker_id():
+    """当前worker标识，pytest-xdist下为gw0/gw1...，否则为main"""
+    return os.environ.get('PYTEST_XDIST_WORKER', 'main')
+
+
+def _load_log_config(config_path="config/config.yaml"):
+    """读取日志级别和格式配置"""
+    try:
+        config = load_config(config_path)
+    except FileNotFoundError:
+        config = {}
+    environment = config.get('environment') or {}
+    return {
+        'level': os.environ.get('ATHENA_LOG_LEVEL') or environment.get('log_level', 'INFO'),
+        'format': os.environ.get('ATHENA_LOG_FORMAT') or environment.get('log_format', 'text'),
+        'log_dir': environment.get('log_path', "reports/logs/")
+    }
+
+
 class Logger:
-    """日志工具类"""
+    """日志工具类：同一进程内共享一个日志器，记录经队列交给后台线程写入文件和控制台"""
+
+    _lock = threading.Lock()
+    _listener = None
 
-    def __init__(self, name="WebAutomation", level=logging.INFO):
+    def __init__(self, name="WebAutomation", level=None):
         self.logger = logging.getLogger(name)
-        self.logger.setLevel(level)
 
         # 避免重复添加handler
-        if not self.logger.handlers:
-            self._setup_handlers()
+        with Logger._lock:
+            if not self.logger.handlers:
+                self._setup_handlers(level)
+
+    def _setup_handlers(self, level):
+        """设置日志处理器：调用方只入队，后台线程负责格式化和写入"""
+        log_config = _load_log_config()
+        level = level or getattr(logging, str(log_config['level']).upper(), logging.INFO)
+        self.logger.setLevel(level)
+        self.logger.propagate = False
 
-    def _setup_handlers(self):
-        """设置日志处理器"""
         # 创建logs目录
-        log_dir = "reports/logs/"
+        log_dir = log_config['log_dir']
         os.makedirs(log_dir, exist_ok=True)
 
-        # 文件处理器
-        log_filename = os.path.join(log_dir, f"test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+        # 文件名包含worker和进程号，并行worker在同一秒启动也不会写到同一文件
+        structured = log_config['format'] == 'jsonl'
+        log_filename = os.path.join(log_dir, "test_{}_{}_{}.{}".format(
+            datetime.now().strftime('%Y%m%d_%H%M%S'), _worker_id(), os.getpid(),
+            'jsonl' if structured else 'log'
+        ))
         file_handler = logging.FileHandler(log_filename, encoding='utf-8')
-        file_handler.setLevel(logging.INFO)
 
         # 控制台处理器
         console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
 
         # 格式化器
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
+        if structured:
+            file_handler.setFormatter(JsonLinesFormatter())
+        else:
+            file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        console_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+        log_queue = queue.SimpleQueue()
+        Logger._listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+        Logger._listener.start()
+        atexit.register(Logger.shutdown)
+
+        self.logger.addHandler(_LazyQueueHandler(log_queue))
 
-        # 添加处理器到logger
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+    @classmethod
+    def shutdown(cls):
+        """停止后台写线程，确保队列中的日志全部落盘"""
+        with cls._lock:
+            if cls._listener is not None:
+                cls._listener.stop()
+                cls._listener = None
 
-    def info(self, message):
-        """信息日志"""
-        self.logger.info(message)
+    def is_enabled(self, level):
+        """级别判断，用于构造开销较大的日志参数之前"""
+        return self.logger.isEnabledFor(level)
 
-    def warning(self, message):
+    def info(self, message, *args):
+        """信息日志，参数在后台线程按%格式化"""
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(message, *args)
+
+    def warning(self, message, *args):
         """警告日志"""
-        self.logger.warning(message)
+        if self.logger.isEnabledFor(logging.WARNING):
+            self.logger.warning(message, *args)
 
-    def error(self, message):
+    def error(self, message, *args):
         """错误日志"""
-        self.logger.error(message)
+        if self.logger.isEnabledFor(logging.ERROR):
+            self.logger.error(message, *args)
 
-    def debug(self, message):
+    def debug(self, message, *args):
         """调试日志"""
-        self.logger.debug(message)
\ No newline at end of file
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(message, *args)
+
+
+_run_logger = None
+
+
+def get_logger():
+    """获取运行级共享日志器"""
+    global _run_logger
+    if _run_logger is None:
+        _run_logger = Logger()
+    return _run_logger
@@ -0,0 +1,385 @@
+# utils/report_generator.py
+from utils.locator_cache import _FileLock
+from utils.logger import get_logger
+from config.registry import load_config
+from datetime import datetime
+import argparse
+import threading
+import heapq
+import atexit
+import html
+import json
+import math
+import uuid
+import glob
+import time
+import os
+
+
+# 耗时直方图：1ms起按1.25倍递增的对数分桶，固定内存下估算分位数，且各worker可直接相加合并
+HISTOGRAM_BASE_MS = 1.0
+HISTOGRAM_RATIO = 1.25
+HISTOGRAM_BUCKETS = 80
+
+OUTCOMES = ('passed', 'failed', 'skipped', 'error')
+
+
+def _bucket(duration):
+    """耗时（秒）所在的直方图分桶"""
+    ms = duration * 1000
+    if ms <= HISTOGRAM_BASE_MS:
+        return 0
+    return min(int(math.log(ms / HISTOGRAM_BASE_MS, HISTOGRAM_RATIO)) + 1, HISTOGRAM_BUCKETS - 1)
+
+
+def _new_timing():
+    """耗时统计：次数、失败数、总耗时、最大耗时、直方图"""
+    return {'count': 0, 'failed': 0, 'total': 0.0, 'max': 0.0, 'histogram': [0] * HISTOGRAM_BUCKETS}
+
+
+def _add_timing(timing, duration, failed):
+    """累加一次耗时"""
+    timing['count'] += 1
+    timing['failed'] += 1 if failed else 0
+    timing['total'] += duration
+    timing['max'] = max(timing['max'], duration)
+    timing['histogram'][_bucket(duration)] += 1
+
+
+def _merge_timing(target, source):
+    """合并两份耗时统计"""
+    target['count'] += source['count']
+    target['failed'] += source['failed']
+    target['total'] += source['total']
+    target['max'] = max(target['max'], source['max'])
+    target['histogram'] = [a + b for a, b in zip(target['histogram'], source['histogram'])]
+
+
+def percentile(timing, percent):
+    """
+    按直方图估算分位数
+    :param timing: 耗时统计
+    :param percent: 百分位，如95
+    :return: 该分桶上界（毫秒）
+    """
+    if not timing['count']:
+        return 0.0
+    rank = math.ceil(timing['count'] * percent / 100)
+    seen = 0
+    for index, count in enumerate(timing['histogram']):
+        seen += count
+        if seen >= rank:
+            upper = HISTOGRAM_BASE_MS * HISTOGRAM_RATIO ** index
+            return round(min(upper, timing['max'] * 1000), 1)
+    return round(timing['max'] * 1000, 1)
+
+
+class RunAggregates:
+    """运行级汇总：大小只与关键字、测试文件数量和固定的Top N有关，与结果条数无关"""
+
+    def __init__(self, top_n=50, data=None):
+        self.top_n = top_n
+        self.data = data or {
+            'outcomes': {outcome: 0 for outcome in OUTCOMES},
+            'tests': _new_timing(),
+            'files': {},
+            'keywords': {},
+            'scenarios': {},
+            'slowest': [],
+            'failures': [],
+            'started': time.time(),
+            'finished': time.time()
+        }
+
+    def add_test(self, nodeid, outcome, duration, message=None):
+        """累加一条测试结果"""
+        data = self.data
+        failed = outcome in ('failed', 'error')
+        data['outcomes'][outcome] += 1
+        _add_timing(data['tests'], duration, failed)
+
+        file_stats = data['files'].setdefault(nodeid.split('::', 1)[0], {outcome: 0 for outcome in OUTCOMES})
+        file_stats[outcome] += 1
+
+        # 最慢的N个测试用最小堆维护
+        entry = [round(duration, 3), nodeid]
+        if len(data['slowest']) < self.top_n:
+            heapq.heappush(data['slowest'], entry)
+        elif entry > data['slowest'][0]:
+            heapq.heapreplace(data['slowest'], entry)
+
+        # 只保留前N条失败详情，完整信息见JSONL
+        if failed and len(data['failures']) < self.top_n:
+            data['failures'].append({'nodeid': nodeid, 'outcome': outcome, 'message': message})
+        data['finished'] = time.time()
+
+    def add_step(self, scenario, keyword, duration, failed):
+        """累加一条关键字步骤结果"""
+        _add_timing(self.data['keywords'].setdefault(keyword, _new_timing()), duration, failed)
+        _add_timing(self.data['scenarios'].setdefault(scenario, _new_timing()), duration, failed)
+        self.data['finished'] = time.time()
+
+    def merge(self, other):
+        """合并另一个worker的汇总"""
+        data, source = self.data, other.data
+        for outcome in OUTCOMES:
+            data['outcomes'][outcome] += source['outcomes'][outcome]
+        _merge_timing(data['tests'], source['tests'])
+
+        for name, stats in source['files'].items():
+            target = data['files'].setdefault(name, {outcome: 0 for outcome in OUTCOMES})
+            for outcome in OUTCOMES:
+                target[outcome] += stats[outcome]
+        for section in ('keywords', 'scenarios'):
+            for name, timing in source[section].items():
+                _merge_timing(data[section].setdefault(name, _new_timing()), timing)
+
+        data['slowest'] = heapq.nlargest(self.top_n, data['slowest'] + source['slowest'])
+        heapq.heapify(data['slowest'])
+        data['failures'] = (data['failures'] + source['failures'])[:self.top_n]
+        data['started'] = min(data['started'], source['started'])
+        data['finished'] = max(data['finished'], source['finished'])
+
+
+class ReportGenerator:
+    """
+    原生报告生成器：测试和步骤结果到达时即追加写入本worker的JSONL，同时更新运行级汇总；
+    结束时各worker写出汇总快照，最后完成的worker在文件锁内合并全部快照并生成静态HTML摘要
+    """
+
+    # 累计多少条记录后刷新一次JSONL缓冲
+    FLUSH_EVERY = 100
+
+    def __init__(self, config_path="config/config.yaml", run_id=None):
+        self.logger = get_logger()
+        config = load_config(config_path)
+        report_config = (config.get('report') or {}).get('native') or {}
+
+        self.enabled = report_config.get('enabled', True)
+        self.output_dir = report_config.get('output_dir', "reports/native/")
+        self.top_n = report_config.get('top_n', 50)
+        self.max_message_length = report_config.get('max_message_length', 500)
+
+        # 同一次运行的所有worker共享run_id：pytest-xdist自带，分片运行时由ATHENA_RUN_ID指定
+        self.run_id = run_id or os.environ.get('ATHENA_RUN_ID') or os.environ.get(
+            'PYTEST_XDIST_TESTRUNUID') or datetime.now().strftime('%Y%m%d_%H%M%S_') + uuid.uuid4().hex[:6]
+        self.worker = os.environ.get('PYTEST_XDIST_WORKER', 'main')
+        self.run_dir = os.path.join(self.output_dir, self.run_id)
+
+        self.aggregates = RunAggregates(self.top_n)
+        self._lock = threading.Lock()
+        self._file = None
+        self._pending = 0
+        self._finished = False
+        atexit.register(self.close)
+
+    def record_test(self, nodeid, outcome, duration, when='call', message=None):
+        """
+        记录一条测试结果
+        :param nodeid: pytest节点ID
+        :param outcome: passed/failed/skipped/error
+        :param duration: 耗时（秒）
+        :param when: setup/call/teardown
+        :param message: 失败信息
+        """
+        if not self.enabled:
+            return
+        message = message[:self.max_message_length] if message else None
+        with self._lock:
+            self.aggregates.add_test(nodeid, outcome, duration, message)
+            self._append({'type': 'test', 'nodeid': nodeid, 'outcome': outcome, 'when': when,
+                          'duration': round(duration, 3), 'message': message})
+
+    def record_step(self, scenario, keyword, status, duration, row_id=None, error=None):
+        """
+        记录一个关键字步骤结果
+        :param scenario: 场景名称
+        :param keyword: 关键字
+        :param status: PASS/FAIL
+        :param duration: 耗时（秒）
+        :param row_id: 数据行标识
+        :param error: 错误信息
+        """
+        if not self.enabled:
+            return
+        error = error[:self.max_message_length] if error else None
+        with self._lock:
+            self.aggregates.add_step(scenario, keyword, duration, status != 'PASS')
+            self._append({'type': 'step', 'scenario': scenario, 'keyword': keyword, 'row': row_id,
+                          'status': status, 'duration': round(duration, 3), 'error': error})
+
+    def finish(self):
+        """
+        写出本worker的汇总快照，合并当前已完成的全部worker并生成HTML摘要
+        :return: HTML摘要路径
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._finished:
+                return None
+            self._finished = True
+            if self._file:
+                self._file.close()
+                self._file = None
+            snapshot = json.dumps(self.aggregates.data)
+
+        os.makedirs(self.run_dir, exist_ok=True)
+        snapshot_path = os.path.join(self.run_dir, f"aggregate_{self.worker}_{os.getpid()}.json")
+        with open(f"{snapshot_path}.tmp", 'w', encoding='utf-8') as file:
+            file.write(snapshot)
+        os.replace(f"{snapshot_path}.tmp", snapshot_path)
+
+        with _FileLock(os.path.join(self.run_dir, "merge.lock"), 30):
+            html_path = render_run(self.run_dir, self.output_dir, self.top_n)
+        self.logger.info("原生报告已生成: %s", html_path)
+        return html_path
+
+    def close(self):
+        """关闭JSONL文件（进程退出时调用）"""
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def _append(self, record):
+        """追加一行JSONL（调用方持有self._lock）"""
+        if self._file is None:
+            os.makedirs(self.run_dir, exist_ok=True)
+            path = os.path.join(self.run_dir, f"results_{self.worker}_{os.getpid()}.jsonl")
+            self._file = open(path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._pending += 1
+        if self._pending >= self.FLUSH_EVERY or record.get('outcome') in ('failed', 'error'):
+            self._file.flush()
+            self._pending = 0
+
+
+def render_run(run_dir, output_dir=None, top_n=50):
+    """
+    合并一次运行目录下的全部汇总快照并生成 summary.json 与 index.html
+    :param run_dir: 运行目录
+    :param output_dir: 额外复制一份index.html到该目录，指向最近一次运行
+    :param top_n: Top N条数
+    :return: HTML摘要路径
+    """
+    merged = None
+    workers = 0
+    for snapshot_path in sorted(glob.glob(os.path.join(run_dir, "aggregate_*.json"))):
+        with open(snapshot_path, 'r', encoding='utf-8') as file:
+            aggregates = RunAggregates(top_n, json.load(file))
+        workers += 1
+        if merged is None:
+            merged = aggregates
+        else:
+            merged.merge(aggregates)
+    merged = merged or RunAggregates(top_n)
+
+    summary = dict(merged.data, workers=workers, run_id=os.path.basename(os.path.normpath(run_dir)))
+    with open(os.path.join(run_dir, "summary.json"), 'w', encoding='utf-8') as file:
+        json.dump(summary, file, ensure_ascii=False)
+
+    content = _render_html(summary)
+    html_path = os.path.join(run_dir, "index.html")
+    for path in [html_path] + ([os.path.join(output_dir, "index.html")] if output_dir else []):
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as file:
+            file.write(content)
+        os.replace(f"{path}.tmp", path)
+    return html_path
+
+
+def _timing_row(name, timing):
+    """耗时统计的表格行"""
+    average = timing['total'] / timing['count'] * 1000 if timing['count'] else 0
+    return (f"<tr><td>{html.escape(name)}</td><td>{timing['count']}</td><td>{timing['failed']}</td>"
+            f"<td>{average:.1f}</td><td>{percentile(timing, 50)}</td><td>{percentile(timing, 95)}</td>"
+            f"<td>{percentile(timing, 99)}</td><td>{timing['max'] * 1000:.1f}</td></tr>")
+
+
+def _render_html(summary):
+    """由汇总数据生成静态HTML（内容大小与结果条数无关）"""
+    outcomes = summary['outcomes']
+    total = sum(outcomes.values())
+    pass_rate = outcomes['passed'] / total * 100 if total else 0
+    elapsed = summary['finished'] - summary['started']
+    timing_header = ("<tr><th>名称</th><th>次数</th><th>失败</th><th>平均(ms)</th>"
+                     "<th>p50(ms)</th><th>p95(ms)</th><th>p99(ms)</th><th>最大(ms)</th></tr>")
+
+    file_rows = "".join(
+        f"<tr><td>{html.escape(name)}</td>" + "".join(f"<td>{stats[outcome]}</td>" for outcome in OUTCOMES) + "</tr>"
+        for name, stats in sorted(summary['files'].items())
+    )
+    keyword_rows = "".join(_timing_row(name, timing) for name, timing in sorted(summary['keywords'].items()))
+    scenario_rows = "".join(_timing_row(name, timing) for name, timing in sorted(summary['scenarios'].items()))
+    slowest_rows = "".join(
+        f"<tr><td>{html.escape(nodeid)}</td><td>{duration:.3f}</td></tr>"
+        for duration, nodeid in sorted(summary['slowest'], reverse=True)
+    )
+    failure_rows = "".join(
+        f"<tr><td>{html.escape(failure['nodeid'])}</td><td>{failure['outcome']}</td>"
+        f"<td><pre>{html.escape(failure['message'] or '')}</pre></td></tr>"
+        for failure in summary['failures']
+    )
+
+    return f"""<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>测试报告 {html.escape(summary['run_id'])}</title>
+<style>
+body {{ font-family: sans-serif; margin: 24px; color: #222; }}
+table {{ border-collapse: collapse; margin-bottom: 24px; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 8px; text-align: left; vertical-align: top; }}
+th {{ background: #f3f3f3; }}
+pre {{ margin: 0; white-space: pre-wrap; max-width: 900px; }}
+.passed {{ color: #2e7d32; }} .failed {{ color: #c62828; }}
+</style>
+</head>
+<body>
+<h1>测试报告</h1>
+<p>运行: {html.escape(summary['run_id'])} | worker数: {summary['workers']} |
+开始: {datetime.fromtimestamp(summary['started']):%Y-%m-%d %H:%M:%S} | 耗时: {elapsed:.1f}s</p>
+<p>总数: {total} | <span class="passed">通过: {outcomes['passed']}</span> |
+<span class="failed">失败: {outcomes['failed']}</span> | 错误: {outcomes['error']} |
+跳过: {outcomes['skipped']} | 通过率: {pass_rate:.1f}%</p>
+<h2>测试耗时</h2>
+<table>{timing_header}{_timing_row('全部测试', summary['tests'])}</table>
+<h2>测试文件</h2>
+<table><tr><th>文件</th>{''.join(f'<th>{outcome}</th>' for outcome in OUTCOMES)}</tr>{file_rows}</table>
+<h2>关键字</h2>
+<table>{timing_header}{keyword_rows}</table>
+<h2>场景步骤</h2>
+<table>{timing_header}{scenario_rows}</table>
+<h2>最慢的测试</h2>
+<table><tr><th>测试</th><th>耗时(s)</th></tr>{slowest_rows}</table>
+<h2>失败详情（前 {len(summary['failures'])} 条，完整记录见 results_*.jsonl）</h2>
+<table><tr><th>测试</th><th>结果</th><th>信息</th></tr>{failure_rows}</table>
+</body>
+</html>
+"""
+
+
+_report_generator = None
+
+
+def get_report_generator():
+    """获取进程内共享的报告生成器"""
+    global _report_generator
+    if _report_generator is None:
+        _report_generator = ReportGenerator()
+    return _report_generator
+
+
+def main():
+    """命令行入口: python -m utils.report_generator render <运行目录>"""
+    parser = argparse.ArgumentParser(description="原生测试报告")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    render_parser = subparsers.add_parser('render', help="重新合并汇总快照并生成HTML")
+    render_parser.add_argument('run_dir', help="运行目录，如 reports/native/<run_id>")
+
+    args = parser.parse_args()
+    print(render_run(args.run_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+# utils/video_recorder.py
+from selenium.common.exceptions import InvalidSessionIdException, WebDriverException
+from utils.artifact_writer import get_artifact_writer
+from utils.logger import get_logger
+from config.registry import load_config
+from collections import deque
+import threading
+import base64
+import json
+import time
+import urllib.request
+
+try:
+    import websocket
+except ImportError:  # websocket-client为可选依赖，未安装时退回定时截图
+    websocket = None
+
+
+class FrameRingBuffer:
+    """有界的内存帧缓冲：只保留最近max_seconds秒的帧，总字节数不超过max_bytes，超出时丢弃最旧的帧"""
+
+    def __init__(self, max_seconds, max_bytes):
+        self.max_seconds = max_seconds
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._frames = deque()
+        self._lock = threading.Lock()
+
+    def append(self, timestamp, data):
+        """
+        追加一帧
+        :param timestamp: 帧时间（秒）
+        :param data: 编码后的图像字节（JPEG/PNG）
+        """
+        with self._lock:
+            self._frames.append((timestamp, data))
+            self.bytes += len(data)
+            while self._frames and (self.bytes > self.max_bytes or
+                                    self._frames[0][0] < timestamp - self.max_seconds):
+                self.bytes -= len(self._frames.popleft()[1])
+
+    def snapshot(self):
+        """当前缓冲中的帧 [(时间, 字节), ...]，从旧到新"""
+        with self._lock:
+            return list(self._frames)
+
+    def clear(self):
+        """丢弃全部帧"""
+        with self._lock:
+            self._frames.clear()
+            self.bytes = 0
+
+
+class SessionRecorder:
+    """
+    单个会话的帧采集：Chromium优先通过DevTools screencast接收页面变化时推送的帧，
+    不可用时在后台定时截图；帧只进入内存环形缓冲，测试通过时不产生任何磁盘写入
+    """
+
+    def __init__(self, driver, recorder):
+        self.logger = get_logger()
+        self.driver = driver
+        self.recorder = recorder
+        self.buffer = FrameRingBuffer(recorder.max_seconds, recorder.max_bytes)
+        self.mode = None
+        self._paused = True
+        self._stopped = threading.Event()
+        self._socket = None
+        self._thread = None
+
+    def start(self):
+        """开始采集，screencast无法建立时退回定时截图"""
+        url = self._devtools_url() if websocket is not None else None
+        if url:
+            try:
+                self._socket = websocket.create_connection(url, timeout=10, suppress_origin=True)
+                self._socket.send(json.dumps({'id': 1, 'method': 'Page.startScreencast', 'params': {
+                    'format': 'jpeg', 'quality': self.recorder.quality, 'maxWidth': self.recorder.max_width,
+                    'maxHeight': self.recorder.max_height, 'everyNthFrame': self.recorder.every_nth_frame
+                }}))
+                self._socket.settimeout(None)
+                self.mode = 'screencast'
+                target = self._receive_screencast
+            except Exception as e:
+                self.logger.debug("DevTools screencast不可用，改用定时截图: %s", str(e))
+                self._socket = None
+        if self._socket is None:
+            self.mode = 'screenshot'
+            target = self._capture_screenshots
+
+        self._thread = threading.Thread(target=target, name=f"video-{self.mode}", daemon=True)
+        self._thread.start()
+        return self
+
+    def begin_test(self):
+        """测试开始：丢弃之前测试的帧并恢复采集"""
+        self.buffer.clear()
+        self._paused = False
+
+    def end_test(self):
+        """测试结束：暂停采集（screencast仍确认帧，但不再缓冲；定时截图不再发送命令）"""
+        self._paused = True
+
+    def frames(self):
+        """当前缓冲中的帧"""
+        return self.buffer.snapshot()
+
+    def stop(self):
+        """停止采集并释放缓冲"""
+        self._stopped.set()
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except Exception:
+                pass
+        self.buffer.clear()
+
+    def _devtools_url(self):
+        """当前窗口对应页面的DevTools WebSocket地址（chromedriver的窗口句柄即页面的target id）"""
+        capabilities = getattr(self.driver, 'capabilities', None) or {}
+        options = capabilities.get('goog:chromeOptions') or capabilities.get('ms:edgeOptions') or {}
+        address = options.get('debuggerAddress')
+        if not address:
+            return None
+        try:
+            with urllib.request.urlopen(f"http://{address}/json/list", timeout=5) as response:
+                targets = [target for target in json.load(response) if target.get('type') == 'page']
+            handle = self.driver.current_window_handle
+        except Exception as e:
+            self.logger.debug("读取DevTools页面列表失败: %s", str(e))
+            return None
+        for target in targets:
+            if target.get('id') == handle:
+                return target.get('webSocketDebuggerUrl')
+        return targets[0].get('webSocketDebuggerUrl') if targets else None
+
+    def _receive_screencast(self):
+        """后台线程：接收screencast帧并逐帧确认（不确认时浏览器停止推送）"""
+        while not self._stopped.is_set():
+            try:
+                message = json.loads(self._socket.recv())
+            except Exception:
+                # 连接关闭（会话退出或停止采集）
+                return
+            if message.get('method') != 'Page.screencastFrame':
+                continue
+            params = message['params']
+            try:
+                self._socket.send(json.dumps({'id': 2, 'method': 'Page.screencastFrameAck',
+                                              'params': {'sessionId': params['sessionId']}}))
+            except Exception:
+                return
+            if not self._paused:
+                timestamp = (params.get('metadata') or {}).get('timestamp') or time.time()
+                self.buffer.append(timestamp, base64.b64decode(params['data']))
+
+    def _capture_screenshots(self):
+        """后台线程：测试执行期间按固定间隔截图"""
+        while not self._stopped.wait(self.recorder.screenshot_interval):
+            if self._paused:
+                continue
+            try:
+                self.buffer.append(time.time(), self.driver.get_screenshot_as_png())
+            except InvalidSessionIdException:
+                return
+            except WebDriverException as e:
+                self.logger.debug("定时截图失败: %s", str(e))
+
+
+class VideoRecorder:
+    """失败录像：每个会话在内存中保留最近N秒的帧，只有测试失败时才编码写出（GIF，未安装Pillow时为帧序列zip）"""
+
+    def __init__(self, config_path="config/config.yaml"):
+        self.logger = get_logger()
+        report_config = load_config(config_path).get('report') or {}
+        video_config = report_config.get('video') or {}
+
+        self.enabled = report_config.get('enable_video', False)
+        self.max_seconds = video_config.get('seconds', 10)
+        self.max_bytes = int(video_config.get('max_mb_per_session', 16) * 1024 * 1024)
+        self.quality = video_config.get('quality', 50)
+        self.max_width = video_config.get('max_width', 1024)
+        self.max_height = video_config.get('max_height', 768)
+        self.every_nth_frame = video_config.get('every_nth_frame', 1)
+        self.screenshot_interval = video_config.get('screenshot_interval', 1.0)
+
+    def attach(self, driver):
+        """
+        获取会话的帧采集器，首次调用时启动采集；会话池复用会话时采集器随会话保留
+        :param driver: WebDriver实例
+        :return: SessionRecorder，未启用录像时为None
+        """
+        if not self.enabled:
+            return None
+        session = getattr(driver, '_athena_video', None)
+        if session is None:
+            session = SessionRecorder(driver, self).start()
+            driver._athena_video = session
+            self.logger.info("失败录像已启用: %s, 保留最近 %ss, 每会话内存上限 %.0fMB", session.mode,
+                             self.max_seconds, self.max_bytes / 1024 / 1024)
+        return session
+
+    def save(self, session, name, attach_name=None):
+        """
+        测试失败时提交缓冲中的帧，编码和落盘在产物写入器的后台线程完成
+        :param session: SessionRecorder
+        :param name: 文件名（不含扩展名）
+        :param attach_name: Allure附件名称
+        :return: 录像文件路径，缓冲为空时为None
+        """
+        frames = session.frames()
+        if not frames:
+            return None
+        return get_artifact_writer().submit_video(frames, name, attach_name)
+
+    @staticmethod
+    def detach(driver):
+        """会话退出前停止采集"""
+        session = getattr(driver, '_athena_video', None)
+        if session is not None:
+            session.stop()
+            driver._athena_video = None
+
+
+_video_recorder = None
+
+
+def get_video_recorder():
+    """获取进程内共享的失败录像器"""
+    global _video_recorder
+    if _video_recorder is None:
+        _video_recorder = VideoRecorder()
+    return _video_recorder
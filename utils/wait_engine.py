@@ -0,0 +1,266 @@
+# utils/wait_engine.py
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import (
+    TimeoutException, JavascriptException, NoSuchElementException, StaleElementReferenceException
+)
+from utils.element_locator import ElementLocator, locate_in_page
+from utils.adaptive_wait import AdaptiveWait, budgeted_timeout
+from utils.impact_analysis import dependency_recorder
+from utils.logger import get_logger
+import threading
+import json
+import time
+import os
+from config.registry import load_config
+
+
+# 请求追踪脚本：统计页面中未完成的XHR/fetch请求数
+REQUEST_TRACKER_SCRIPT = """
+(function () {
+    if (window.__athenaPendingRequests !== undefined) { return; }
+    window.__athenaPendingRequests = 0;
+    function done() { window.__athenaPendingRequests = Math.max(0, window.__athenaPendingRequests - 1); }
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        window.__athenaPendingRequests++;
+        this.addEventListener('loadend', done);
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            window.__athenaPendingRequests++;
+            return originalFetch.apply(this, arguments).then(
+                function (response) { done(); return response; },
+                function (error) { done(); throw error; }
+            );
+        };
+    }
+})();
+"""
+
+
+# 读取文档加载状态
+DOCUMENT_STATE_SCRIPT = "return document.readyState"
+
+# 新文档（没有导航前打的__athenaNavigating标记）的加载状态，旧文档返回false
+PAGE_STATE_SCRIPT = "return window.__athenaNavigating === undefined && document.readyState"
+
+# 页面加载完成且没有未完成的XHR/fetch请求
+NO_PENDING_REQUESTS_SCRIPT = (
+    REQUEST_TRACKER_SCRIPT +
+    "return document.readyState === 'complete'"
+    " && window.__athenaPendingRequests === 0"
+    " && !(window.jQuery && window.jQuery.active);"
+)
+
+# 各页面加载策略对应的document.readyState就绪状态
+PAGE_READY_STATES = {
+    'normal': ('complete',),
+    'eager': ('interactive', 'complete'),
+    'none': ('loading', 'interactive', 'complete')
+}
+
+
+class WaitConditions:
+    """关键字完成条件，均为可传入AdaptiveWait.until的可调用对象"""
+
+    @staticmethod
+    def url_changes(old_url):
+        """URL发生变化"""
+        return EC.url_changes(old_url)
+
+    @staticmethod
+    def url_contains(fragment):
+        """URL包含指定片段"""
+        return EC.url_contains(fragment)
+
+    @staticmethod
+    def element_visible(locator_data):
+        """任一定位策略匹配到可见元素（页面内一次脚本调用完成，不受隐式等待影响）"""
+        dependency_recorder.note_locator(locator_data)
+        strategies = ElementLocator().get_script_strategies(locator_data)
+
+        def condition(driver):
+            match = locate_in_page(driver, strategies, True)
+            return match[1] if match else False
+
+        return condition
+
+    @staticmethod
+    def element_gone(locator_data):
+        """所有定位策略均匹配不到可见元素"""
+        dependency_recorder.note_locator(locator_data)
+        strategies = ElementLocator().get_script_strategies(locator_data)
+
+        def condition(driver):
+            return locate_in_page(driver, strategies, True) is None
+
+        return condition
+
+    @staticmethod
+    def document_ready(state='complete'):
+        """document.readyState达到指定状态（interactive 或 complete）"""
+        accepted = ('interactive', 'complete') if state == 'interactive' else ('complete',)
+
+        def condition(driver):
+            # 无浏览器驱动在get返回时页面已完整解析
+            if not getattr(driver, 'supports_javascript', True):
+                return True
+            return driver.execute_script(DOCUMENT_STATE_SCRIPT) in accepted
+
+        return condition
+
+    @staticmethod
+    def page_loaded(strategy='normal'):
+        """
+        新文档达到页面加载策略对应的就绪状态：normal为complete，eager为interactive，none只要求新文档已开始加载。
+        none策略的会话导航前在旧页面上打的__athenaNavigating标记在新文档中不存在，旧页面不会被误判为就绪
+        """
+        accepted = PAGE_READY_STATES[strategy]
+
+        def condition(driver):
+            if not getattr(driver, 'supports_javascript', True):
+                return True
+            return driver.execute_script(PAGE_STATE_SCRIPT) in accepted
+
+        return condition
+
+    @staticmethod
+    def no_pending_requests():
+        """页面加载完成且没有未完成的XHR/fetch请求"""
+
+        def condition(driver):
+            if not getattr(driver, 'supports_javascript', True):
+                return True
+            return driver.execute_script(NO_PENDING_REQUESTS_SCRIPT)
+
+        return condition
+
+    @staticmethod
+    def any_of(*conditions):
+        """任一条件满足"""
+        return EC.any_of(*conditions)
+
+    @staticmethod
+    def all_of(*conditions):
+        """全部条件满足"""
+        return EC.all_of(*conditions)
+
+
+class WaitStats:
+    """运行级等待统计：记录各关键字实际等待时间，并与替换前的固定sleep对比"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keywords = {}
+
+    def record(self, keyword, elapsed, legacy_sleep, satisfied, polls=0):
+        """记录一次等待，polls为条件检查次数（每次通常是一次WebDriver命令）"""
+        with self._lock:
+            stats = self._keywords.setdefault(keyword, {
+                'count': 0,
+                'timeouts': 0,
+                'polls': 0,
+                'waited_seconds': 0.0,
+                'legacy_seconds': 0.0,
+                'max_wait_seconds': 0.0
+            })
+            stats['count'] += 1
+            stats['polls'] += polls
+            stats['waited_seconds'] += elapsed
+            stats['legacy_seconds'] += legacy_sleep
+            stats['max_wait_seconds'] = max(stats['max_wait_seconds'], elapsed)
+            if not satisfied:
+                stats['timeouts'] += 1
+
+    def summary(self):
+        """
+        汇总等待统计
+        :return: 包含各关键字明细与总节省时间的字典
+        """
+        with self._lock:
+            keywords = {}
+            for keyword, stats in self._keywords.items():
+                keywords[keyword] = dict(stats)
+                keywords[keyword]['saved_seconds'] = round(stats['legacy_seconds'] - stats['waited_seconds'], 3)
+                keywords[keyword]['waited_seconds'] = round(stats['waited_seconds'], 3)
+                keywords[keyword]['max_wait_seconds'] = round(stats['max_wait_seconds'], 3)
+
+        waited = sum(stats['waited_seconds'] for stats in keywords.values())
+        legacy = sum(stats['legacy_seconds'] for stats in keywords.values())
+        return {
+            'total_waited_seconds': round(waited, 3),
+            'total_legacy_seconds': round(legacy, 3),
+            'total_polls': sum(stats['polls'] for stats in keywords.values()),
+            'total_saved_seconds': round(legacy - waited, 3),
+            'keywords': keywords
+        }
+
+    def write(self, path):
+        """写出JSON统计文件"""
+        summary = self.summary()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(summary, file, ensure_ascii=False, indent=2)
+        return summary
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._keywords = {}
+
+
+# 运行级统计实例，所有WaitEngine共享
+wait_stats = WaitStats()
+
+
+class WaitEngine:
+    """条件驱动的等待引擎：条件满足立即返回，超时时间按关键字从config.yaml读取"""
+
+    # 条件轮询期间忽略的瞬时异常（页面跳转中脚本执行失败、元素失效等）
+    IGNORED_EXCEPTIONS = (JavascriptException, NoSuchElementException, StaleElementReferenceException)
+
+    def __init__(self, driver, config_path="config/config.yaml"):
+        self.driver = driver
+        self.logger = get_logger()
+        self.config = self._load_config(config_path)
+
+    def _load_config(self, config_path):
+        """加载等待引擎配置"""
+        return load_config(config_path).get('wait_engine') or {}
+
+    def timeout_for(self, keyword):
+        """获取关键字的超时时间"""
+        keyword_timeouts = self.config.get('keyword_timeouts') or {}
+        return keyword_timeouts.get(keyword, self.config.get('default_timeout', 10))
+
+    def wait_for(self, keyword, condition, timeout=None, raise_on_timeout=True):
+        """
+        等待关键字的完成条件满足
+        :param keyword: 关键字名称（用于读取超时配置和统计）
+        :param condition: 完成条件，WaitConditions中的可调用对象
+        :param timeout: 超时时间，默认按关键字读取配置
+        :param raise_on_timeout: 超时时是否抛出TimeoutException
+        :return: 条件返回值，超时且不抛异常时返回None
+        """
+        timeout = budgeted_timeout(timeout if timeout is not None else self.timeout_for(keyword))
+        legacy_sleep = (self.config.get('legacy_sleeps') or {}).get(keyword, 0)
+        wait = AdaptiveWait(self.driver, timeout, ignored_exceptions=self.IGNORED_EXCEPTIONS)
+
+        started = time.time()
+        try:
+            result = wait.until(condition)
+        except TimeoutException:
+            elapsed = time.time() - started
+            wait_stats.record(keyword, elapsed, legacy_sleep, False, wait.polls)
+            self.logger.warning("等待完成条件超时: %s, 超时时间: %.1fs", keyword, timeout)
+            if raise_on_timeout:
+                raise TimeoutException(f"关键字完成条件在 {timeout:.1f}s 内未满足: {keyword}")
+            return None
+
+        elapsed = time.time() - started
+        wait_stats.record(keyword, elapsed, legacy_sleep, True, wait.polls)
+        self.logger.info("完成条件已满足: %s, 等待 %.2fs, 轮询 %s 次 (原固定等待 %ss)",
+                         keyword, elapsed, wait.polls, legacy_sleep)
+        return result